@@ -0,0 +1,105 @@
+"""
+Command line interface of the benchmark suite.
+
+Run from the repository root:
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+
+``compare`` exits with status 1 when a metric regressed beyond the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.models import SHAPES
+from benchmarks.suite import build_cases, compare_results, run_suite
+
+
+def print_result(name, metrics):
+    print(
+        f"{name:<36} {metrics['ops_per_sec']:>14,.0f} ops/s"
+        f"  p50 {metrics['p50_us']:>10.2f} us"
+        f"  p99 {metrics['p99_us']:>10.2f} us"
+        f"  peak {metrics['peak_memory_bytes']:>10,} B"
+    )
+
+
+def run(args):
+    cases = build_cases(args.shapes)
+    results = run_suite(cases, args.min_time, args.filter, print_result)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current) as current_file:
+        current = json.load(current_file)
+
+    rows = compare_results(baseline, current, args.threshold)
+    regressions = 0
+    for name, metric, before, after, change, regressed in rows:
+        if regressed:
+            regressions += 1
+        if regressed or args.verbose:
+            flag = "REGRESSION" if regressed else "ok"
+            print(
+                f"{flag:<10} {name:<36} {metric:<18}"
+                f" {before:>14,.2f} -> {after:>14,.2f} ({change:+.1%})"
+            )
+    print(f"{regressions} regression(s) over {len(rows)} compared metrics")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--output", help="Write the results to a JSON file")
+    run_parser.add_argument(
+        "--shape",
+        dest="shapes",
+        action="append",
+        choices=sorted(SHAPES),
+        help="Only benchmark this model shape (repeatable)",
+    )
+    run_parser.add_argument(
+        "--filter", help="Only run benchmarks whose name contains this string"
+    )
+    run_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="Minimum measuring time per benchmark in seconds",
+    )
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare results against a baseline"
+    )
+    compare_parser.add_argument("baseline", help="Baseline results JSON file")
+    compare_parser.add_argument("current", help="Current results JSON file")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change flagged as a regression (default: 0.1)",
+    )
+    compare_parser.add_argument(
+        "--verbose", action="store_true", help="Also print metrics within threshold"
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Compares plain JSONB with per-message zlib and trained-dictionary compression
+on synthetic 200-800 byte messages, and the compressed NDJSON stream with gzip.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compression
+"""
+
+import gzip
+import io
+import random
+import time
+import zlib
+from typing import List, Optional
+
+from transmutate.base_model import BaseModel
+from transmutate.compression import DEFAULT_LEVEL, DictionaryCompressor
+
+MESSAGES = 50_000
+SAMPLES = 500
+
+COUNTRIES = ["NL", "DE", "FR", "BE", "US", "GB"]
+STATUSES = ["pending", "paid", "shipped", "delivered", "cancelled"]
+PRODUCTS = ["keyboard", "mouse", "monitor", "laptop stand", "usb-c cable", "webcam"]
+
+
+class OrderLine(BaseModel):
+    product: str
+    quantity: int
+    unit_price: float
+
+
+class Order(BaseModel):
+    order_id: int
+    customer_email: str
+    status: str
+    country: str
+    currency: str
+    lines: List[OrderLine]
+    gift_message: Optional[str] = None
+
+
+def make_orders(count: int, seed: int) -> List[Order]:
+    rng = random.Random(seed)
+    return [
+        Order(
+            order_id=100_000 + index,
+            customer_email=f"customer{rng.randrange(10_000)}@example.com",
+            status=rng.choice(STATUSES),
+            country=rng.choice(COUNTRIES),
+            currency="EUR",
+            lines=[
+                OrderLine(
+                    product=rng.choice(PRODUCTS),
+                    quantity=rng.randint(1, 5),
+                    unit_price=round(rng.uniform(5, 300), 2),
+                )
+                for _ in range(rng.randint(1, 8))
+            ],
+            gift_message="Happy birthday!" if rng.random() < 0.1 else None,
+        )
+        for index in range(count)
+    ]
+
+
+def measure(label: str, plain_size: int, func, items) -> list:
+    start = time.perf_counter()
+    results = [func(item) for item in items]
+    seconds = time.perf_counter() - start
+    if isinstance(results[0], bytes):
+        size = sum(map(len, results))
+        ratio = f"{size / plain_size:6.1%} of plain"
+    else:
+        ratio = " " * 14
+    print(
+        f"{label:<28} {ratio}  {len(items) / seconds:>10,.0f} messages/s  "
+        f"{plain_size / 1e6 / seconds:>7,.1f} MB/s"
+    )
+    return results
+
+
+def main():
+    orders = make_orders(MESSAGES, seed=1)
+    compressor = DictionaryCompressor(Order)
+    start = time.perf_counter()
+    compressor.train(make_orders(SAMPLES, seed=2))
+    print(f"Trained on {SAMPLES} samples in {time.perf_counter() - start:.2f} s")
+
+    plain = [order.to_jsonb_bytes() for order in orders]
+    plain_size = sum(map(len, plain))
+    print(f"{MESSAGES:,} messages, {plain_size / MESSAGES:.0f} bytes on average\n")
+
+    measure("to_jsonb_bytes", plain_size, Order.to_jsonb_bytes, orders)
+    measure("zlib.compress per message", plain_size, zlib.compress, plain)
+    encoded = measure(
+        "DictionaryCompressor.encode", plain_size, compressor.encode, orders
+    )
+    measure("from_jsonb", plain_size, Order.from_jsonb, plain)
+    measure("DictionaryCompressor.decode", plain_size, compressor.decode, encoded)
+
+    print()
+    ndjson = b"".join(data + b"\n" for data in plain)
+    start = time.perf_counter()
+    gzipped = gzip.compress(ndjson, compresslevel=DEFAULT_LEVEL)
+    gzip_seconds = time.perf_counter() - start
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    compressor.write_ndjson(buffer, orders)
+    stream_seconds = time.perf_counter() - start
+    print(
+        f"NDJSON gzip: {len(gzipped) / len(ndjson):.1%} of plain, "
+        f"{len(ndjson) / 1e6 / gzip_seconds:,.1f} MB/s (compression only)"
+    )
+    print(
+        f"NDJSON write_ndjson: {len(buffer.getvalue()) / len(ndjson):.1%} of plain, "
+        f"{len(ndjson) / 1e6 / stream_seconds:,.1f} MB/s (encoding included)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the compiled per-class encoder with the generic recursive walk.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_encoders
+"""
+
+import json
+import timeit
+
+from tests.test_classes import Address, Customer, Person
+
+
+def legacy_serialize(obj):
+    # The generic walk BaseModel.to_jsonb used before per-class plans existed
+    if hasattr(obj, "__dict__"):
+        return {key: legacy_serialize(value) for key, value in obj.__dict__.items()}
+    elif isinstance(obj, list):
+        return [legacy_serialize(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: legacy_serialize(value) for key, value in obj.items()}
+    else:
+        return obj
+
+
+def legacy_to_jsonb(obj):
+    return json.dumps(legacy_serialize(obj), separators=(",", ":"))
+
+
+def make_customer():
+    person = Person(
+        name="John Doe",
+        age=30,
+        email="john.doe@example.com",
+        phone_numbers=["123-456-7890", "555-000-1111"],
+    )
+    addresses = [
+        Address(street=f"{n} Main St", city="Anytown", zip_code="12345")
+        for n in range(3)
+    ]
+    return Customer(
+        person=person,
+        addresses=addresses,
+        labels={"tier": "gold"},
+        billing_address=None,
+    )
+
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<28} {number / seconds:>12,.0f} ops/s")
+    return seconds
+
+
+def main(number=20000):
+    person = make_customer().person
+    customer = make_customer()
+    assert legacy_to_jsonb(customer) == customer.to_jsonb()
+
+    for name, obj in (("Person", person), ("Customer", customer)):
+        plan = type(obj)._get_plan()
+        legacy = bench(f"{name} generic walk", lambda: legacy_serialize(obj), number)
+        compiled = bench(f"{name} compiled walk", lambda: plan.encode(obj), number)
+        print(f"{name} walk speedup: {legacy / compiled:.2f}x")
+        legacy = bench(f"{name} legacy to_jsonb", lambda: legacy_to_jsonb(obj), number)
+        compiled = bench(f"{name} to_jsonb", obj.to_jsonb, number)
+        print(f"{name} to_jsonb speedup: {legacy / compiled:.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures the memory held per model instance with and without ``slots=True``,
+and per row of a columnar ``ModelBatch``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+"""
+
+import gc
+import tracemalloc
+
+from tests.test_classes import Person, SlottedPerson
+from transmutate import ModelBatch
+
+
+def bytes_per_instance(model_cls, count):
+    # The attribute values are shared so only the instances themselves count
+    phone_numbers = ["123-456-7890"]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [
+        model_cls(
+            name="John Doe",
+            age=30,
+            email="john.doe@example.com",
+            phone_numbers=phone_numbers,
+        )
+        for _ in range(count)
+    ]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Exclude the list holding the instances
+    size = after - before - instances.__sizeof__()
+    return size / count
+
+
+def bytes_per_row(model_cls, count):
+    record = {
+        "name": "John Doe",
+        "age": 30,
+        "email": "john.doe@example.com",
+        "phone_numbers": ["123-456-7890"],
+    }
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    batch = ModelBatch[model_cls].from_dicts((record for _ in range(count)))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(batch) == count
+    return (after - before) / count
+
+
+def main(count=100000):
+    regular = bytes_per_instance(Person, count)
+    slotted = bytes_per_instance(SlottedPerson, count)
+    batch = bytes_per_row(Person, count)
+    print(f"{'Person':<28} {regular:>8.1f} bytes/instance")
+    print(f"{'Person (slots=True)':<28} {slotted:>8.1f} bytes/instance")
+    print(f"{'ModelBatch[Person]':<28} {batch:>8.1f} bytes/row")
+    print(f"Memory saved by slots: {1 - slotted / regular:.0%}")
+    print(f"Memory saved by ModelBatch: {1 - batch / regular:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares serial and process-pool bulk conversion of 200,000 records.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel
+"""
+
+from typing import List
+
+from transmutate.base_model import BaseModel
+from transmutate.parallel import ParallelConverter
+
+RECORDS = 200_000
+
+
+class Record(BaseModel):
+    id: int
+    name: str
+    score: float
+    active: bool
+    tags: List[str]
+
+
+def make_records():
+    return [
+        Record(
+            id=index,
+            name=f"record-{index}",
+            score=index / 7,
+            active=index % 2 == 0,
+            tags=["alpha", "beta", str(index)],
+        )
+        for index in range(RECORDS)
+    ]
+
+
+def main():
+    records = make_records()
+    encoded = [record.to_jsonb_bytes() for record in records]
+    for processes in (1, None):
+        label = "serial" if processes == 1 else "process pool"
+        with ParallelConverter(processes) as converter:
+            for _ in converter.encode(records):
+                pass
+            print(f"encode ({label}): {converter.throughput}")
+        with ParallelConverter(processes) as converter:
+            for _ in converter.decode(Record, encoded):
+                pass
+            print(f"decode ({label}): {converter.throughput}")
+
+
+if __name__ == "__main__":
+    main()
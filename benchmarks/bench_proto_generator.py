@@ -0,0 +1,113 @@
+"""
+Times ProtoGenerator builds on a synthetic tree of 1,000 messages.
+
+The tree is split in packages, one proto file each. Cold builds write every
+file, no-op builds skip them all and a single model change rewrites one file.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_proto_generator
+"""
+
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from transmutate import ProtoGenerator, RpcType, Service
+from transmutate.base_model import BaseModel
+
+PACKAGES = 20
+MESSAGES_PER_PACKAGE = 50
+BRANCHING = 3
+
+
+def make_message(name, children):
+    annotations = {
+        "id": int,
+        "name": str,
+        "score": float,
+        "active": bool,
+        "tags": List[str],
+        "labels": Dict[str, str],
+    }
+    for index, child in enumerate(children):
+        annotations[f"child_{index}"] = Optional[child]
+        annotations[f"children_{index}"] = List[child]
+    # Registered in this module so that worker processes can unpickle them
+    message = type(name, (BaseModel,), {"__annotations__": annotations})
+    message.__module__ = __name__
+    globals()[name] = message
+    return message
+
+
+def make_package(package):
+    # Messages are created leaves first so parents can reference their children
+    messages = []
+    for index in reversed(range(MESSAGES_PER_PACKAGE)):
+        first_child = index * BRANCHING + 1
+        children = [
+            messages[MESSAGES_PER_PACKAGE - 1 - child]
+            for child in range(first_child, first_child + BRANCHING)
+            if child < MESSAGES_PER_PACKAGE
+        ]
+        messages.append(make_message(f"Package{package}Message{index}", children))
+    return messages[-1]
+
+
+ROOTS = [make_package(package) for package in range(PACKAGES)]
+
+
+def make_generators(output_dir):
+    return [
+        ProtoGenerator(
+            service_name=f"Package{package}",
+            services=[
+                Service(
+                    name=f"Package{package}Service",
+                    types=[RpcType.UNARY, RpcType.SERVER_STREAMING],
+                    method_names=["Get", "List"],
+                    request_dataclass=root,
+                    response_dataclass=root,
+                )
+            ],
+            output_dir=output_dir,
+        )
+        for package, root in enumerate(ROOTS)
+    ]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    report = func()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<36} {elapsed * 1000:>9.1f} ms  "
+        f"written={len(report.written)} skipped={len(report.skipped)}"
+    )
+    return report
+
+
+def main():
+    for processes in (1, None):
+        label = "serial" if processes == 1 else "process pool"
+        with tempfile.TemporaryDirectory() as output_dir:
+            generators = make_generators(output_dir)
+            timed(
+                f"cold build ({label})",
+                lambda: ProtoGenerator.build(generators, processes),
+            )
+            timed(
+                f"no-op build ({label})",
+                lambda: ProtoGenerator.build(generators, processes),
+            )
+            # Adding a field to one leaf message only changes its package
+            leaf = globals()[f"Package0Message{MESSAGES_PER_PACKAGE - 1}"]
+            leaf.__annotations__ = {**leaf.__annotations__, f"extra_{label[0]}": int}
+            timed(
+                f"one model changed ({label})",
+                lambda: ProtoGenerator.build(generators, processes),
+            )
+
+
+if __name__ == "__main__":
+    main()
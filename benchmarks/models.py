@@ -0,0 +1,112 @@
+"""
+Synthetic model generators used by the benchmark suite.
+
+Every generator returns a model class and an instance populated with
+deterministic data, so results are comparable between runs.
+"""
+
+from typing import Dict, List, Optional, Tuple, Type
+
+from transmutate.base_model import BaseModel
+
+SCALAR_TYPES = (int, str, float, bool)
+
+
+def _scalar_value(field_type, index):
+    if field_type is int:
+        return index * 7
+    elif field_type is str:
+        return f"value-{index}"
+    elif field_type is float:
+        return index / 3
+    return index % 2 == 0
+
+
+def _validate_positive(self):
+    if self.field_0 < 0:
+        raise ValueError("field_0 must be positive.")
+
+
+def make_model_class(name: str, annotations: dict, namespace=None) -> Type[BaseModel]:
+    namespace = dict(namespace or {}, __annotations__=annotations)
+    model_cls = type(name, (BaseModel,), namespace)
+    # Registered in this module so results can be pickled by worker processes
+    model_cls.__module__ = __name__
+    globals()[name] = model_cls
+    return model_cls
+
+
+def make_scalar_model(name: str, field_count: int) -> Tuple[Type[BaseModel], dict]:
+    annotations = {
+        f"field_{index}": SCALAR_TYPES[index % len(SCALAR_TYPES)]
+        for index in range(field_count)
+    }
+    model_cls = make_model_class(
+        name, annotations, {"validation_field_0": _validate_positive}
+    )
+    values = {
+        field_name: _scalar_value(field_type, index)
+        for index, (field_name, field_type) in enumerate(annotations.items())
+    }
+    return model_cls, values
+
+
+def make_flat() -> Tuple[Type[BaseModel], BaseModel]:
+    """Ten scalar fields, the typical small record."""
+    model_cls, values = make_scalar_model("FlatModel", 10)
+    return model_cls, model_cls(**values)
+
+
+def make_wide() -> Tuple[Type[BaseModel], BaseModel]:
+    """Two hundred scalar fields."""
+    model_cls, values = make_scalar_model("WideModel", 200)
+    return model_cls, model_cls(**values)
+
+
+def make_nested(depth: int = 10) -> Tuple[Type[BaseModel], BaseModel]:
+    """A chain of ``depth`` models, each holding the next one."""
+    leaf_cls, values = make_scalar_model(f"NestedLevel{depth}", 5)
+    model_cls, obj = leaf_cls, leaf_cls(**values)
+    for level in reversed(range(depth)):
+        model_cls = make_model_class(
+            f"NestedLevel{level}",
+            {
+                "name": str,
+                "level": int,
+                "tags": List[str],
+                "child": Optional[model_cls],
+            },
+        )
+        obj = model_cls(name=f"level-{level}", level=level, tags=["a", "b"], child=obj)
+    return model_cls, obj
+
+
+def make_list_heavy(items: int = 100) -> Tuple[Type[BaseModel], BaseModel]:
+    """Lists of nested models and scalars, plus a map of models."""
+    item_cls, values = make_scalar_model("ListItem", 5)
+    model_cls = make_model_class(
+        "ListHeavyModel",
+        {
+            "name": str,
+            "items": List[item_cls],
+            "scores": List[int],
+            "index": Dict[str, item_cls],
+        },
+    )
+    item_list = [item_cls(**values) for _ in range(items)]
+    obj = model_cls(
+        name="list-heavy",
+        items=item_list,
+        scores=list(range(items * 10)),
+        index={f"item-{n}": item for n, item in enumerate(item_list[:10])},
+    )
+    return model_cls, obj
+
+
+# Shape name -> generator
+SHAPES = {
+    "flat": make_flat,
+    "wide": make_wide,
+    "nested": make_nested,
+    "list_heavy": make_list_heavy,
+}
@@ -0,0 +1,249 @@
+"""
+Benchmark suite covering the serialization, parsing, validation and schema paths.
+
+Results are plain dictionaries so they can be stored as JSON and compared
+against a baseline with ``compare_results``.
+"""
+
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.models import SHAPES
+from transmutate import JSONHandler, ProtoGenerator, ProtoHandler, RpcType, Service
+from transmutate.base_model import ModelMeta
+from transmutate.json_backends import get_backend
+from transmutate.schema_registry import SchemaRegistry
+
+RESULTS_FORMAT_VERSION = 1
+
+# Metrics compared by compare_results, and whether higher values are better
+COMPARED_METRICS = {
+    "ops_per_sec": True,
+    "p99_us": False,
+    "peak_memory_bytes": False,
+}
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    func: Callable[[], object]
+
+
+def _cold_schema(obj):
+    # Invalidates the cached schemas so the full compilation is measured
+    def generate():
+        ModelMeta.generation += 1
+        return ProtoHandler(obj).generate_proto()
+
+    return generate
+
+
+def build_cases(shapes: Optional[List[str]] = None) -> List[BenchmarkCase]:
+    """
+    Builds the benchmark cases, named ``<shape>.<operation>``.
+
+    :param shapes: Names from ``benchmarks.models.SHAPES``, None for all.
+    """
+    cases = []
+    services = []
+    for shape in shapes or SHAPES:
+        model_cls, obj = SHAPES[shape]()
+        data = json.loads(obj.to_jsonb())
+        json_data = obj.to_json()
+        jsonb_data = obj.to_jsonb()
+        proto_data = obj.to_proto_bytes()
+        handler = JSONHandler(obj)
+        # Same-version translation, to compare with from_dict
+        registry = SchemaRegistry()
+        translation = registry.translation(registry.register(model_cls), model_cls)
+        services.append(
+            Service(
+                name=f"{model_cls.__name__}Service",
+                types=[RpcType.UNARY],
+                method_names=["Get"],
+                request_dataclass=model_cls,
+                response_dataclass=model_cls,
+            )
+        )
+        cases += [
+            BenchmarkCase(
+                f"{shape}.serialize_obj", lambda h=handler, o=obj: h.serialize_obj(o)
+            ),
+            BenchmarkCase(f"{shape}.to_json", obj.to_json),
+            BenchmarkCase(f"{shape}.to_jsonb", obj.to_jsonb),
+            BenchmarkCase(f"{shape}.to_proto_bytes", obj.to_proto_bytes),
+            BenchmarkCase(
+                f"{shape}.from_dict", lambda m=model_cls, d=data: m.from_dict(d)
+            ),
+            BenchmarkCase(
+                f"{shape}.from_dict_projected",
+                lambda m=model_cls, d=data, f=[next(iter(data))]: m.from_dict(
+                    d, fields=f
+                ),
+            ),
+            BenchmarkCase(
+                f"{shape}.from_dict_translated",
+                lambda t=translation, d=data: t.decode(d),
+            ),
+            BenchmarkCase(
+                f"{shape}.from_json", lambda m=model_cls, d=json_data: m.from_json(d)
+            ),
+            BenchmarkCase(
+                f"{shape}.from_jsonb",
+                lambda m=model_cls, d=jsonb_data: m.from_jsonb(d),
+            ),
+            BenchmarkCase(
+                f"{shape}.from_jsonb_lazy",
+                lambda m=model_cls, d=jsonb_data, f=next(iter(data)): getattr(
+                    m.from_jsonb_lazy(d), f
+                ),
+            ),
+            BenchmarkCase(
+                f"{shape}.from_proto_bytes",
+                lambda m=model_cls, d=proto_data: m.from_proto_bytes(d),
+            ),
+            BenchmarkCase(f"{shape}.run_validations", obj.run_validations),
+            BenchmarkCase(
+                f"{shape}.generate_proto",
+                lambda o=obj: ProtoHandler(o).generate_proto(),
+            ),
+            BenchmarkCase(f"{shape}.generate_proto_cold", _cold_schema(obj)),
+        ]
+
+    generator = ProtoGenerator(service_name="BenchmarkService", services=services)
+    cases.append(
+        BenchmarkCase("proto_generator.content", generator.generate_proto_content)
+    )
+    return cases
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_case(
+    case: BenchmarkCase, min_time: float = 0.5, min_samples: int = 20
+) -> Dict[str, float]:
+    """
+    Measures one case.
+
+    Calls are timed in samples of ``number`` calls, sized to last about a
+    millisecond, until ``min_time`` seconds and ``min_samples`` samples are
+    reached. Latency percentiles are computed over the per-call time of the
+    samples.
+
+    :return: ops_per_sec, p50_us, p90_us, p99_us and peak_memory_bytes.
+    """
+    func = case.func
+    func()  # Warm up caches and compiled plans
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= 0.001 or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    total_time = 0.0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while total_time < min_time or len(samples) < min_samples:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            total_time += elapsed
+            samples.append(elapsed / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "ops_per_sec": len(samples) * number / total_time,
+        "p50_us": _percentile(samples, 50) * 1e6,
+        "p90_us": _percentile(samples, 90) * 1e6,
+        "p99_us": _percentile(samples, 99) * 1e6,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_suite(
+    cases: List[BenchmarkCase],
+    min_time: float = 0.5,
+    pattern: Optional[str] = None,
+    progress: Optional[Callable[[str, Dict[str, float]], None]] = None,
+) -> dict:
+    """
+    Runs benchmark cases and returns the results document.
+
+    :param pattern: Only run cases whose name contains this string.
+    :param progress: Called with the name and results of every finished case.
+    """
+    results = {}
+    for case in cases:
+        if pattern and pattern not in case.name:
+            continue
+        results[case.name] = run_case(case, min_time)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {
+        "version": RESULTS_FORMAT_VERSION,
+        "metadata": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "json_backend": get_backend().name,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    Compares two results documents.
+
+    :param threshold: Relative change tolerated before a metric is flagged,
+        e.g. 0.1 flags ops/sec dropping by more than 10%.
+    :return: (case, metric, baseline value, current value, relative change,
+        regressed) tuples for every case present in both documents.
+    """
+    rows = []
+    for name, baseline_metrics in baseline["results"].items():
+        current_metrics = current["results"].get(name)
+        if current_metrics is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before = baseline_metrics.get(metric)
+            after = current_metrics.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if higher_is_better:
+                regressed = change < -threshold
+            else:
+                regressed = change > threshold
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
@@ -1,6 +1,7 @@
 import unittest
 from transmutate import BaseModel, Service, RpcType
 from typing import List
+from tests.test_classes import Customer
 
 
 class TestMessage(BaseModel):
@@ -107,6 +108,16 @@ class TestService(unittest.TestCase):
             service_definition.strip(), expected_service_definition.strip()
         )
 
+    def test_message_generation_with_required_fields(self):
+        service = Service(
+            name="CustomerService",
+            types=[RpcType.UNARY],
+            method_names=["GetCustomer"],
+            request_dataclass=Customer,
+        )
+        self.assertEqual(service.get_request_message(), Customer.proto_schema())
+        self.assertIn("message Person {", service.get_request_message())
+
 
 if __name__ == "__main__":
     unittest.main()
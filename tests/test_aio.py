@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tests.test_classes import Person
+from transmutate import aio
+
+
+class MemoryWriter:
+    """Collects the data written by write_models, like a StreamWriter."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.write_calls = 0
+        self.drain_calls = 0
+
+    def write(self, data):
+        self.write_calls += 1
+        self.data += data
+
+    async def drain(self):
+        self.drain_calls += 1
+
+
+def make_reader(data, limit=2**16):
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+class TestAio(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.people = [
+            Person(name=f"Person {n}", age=n, email=None, phone_numbers=[str(n)])
+            for n in range(50)
+        ]
+
+    async def read_all(self, data, **kwargs):
+        return [
+            person
+            async for person in aio.read_models(make_reader(data), Person, **kwargs)
+        ]
+
+    async def round_trip(self, **kwargs):
+        writer = MemoryWriter()
+        count = await aio.write_models(writer, self.people, **kwargs)
+        self.assertEqual(count, len(self.people))
+        kwargs.pop("buffer_size", None)
+        decoded = await self.read_all(bytes(writer.data), **kwargs)
+        self.assertEqual(
+            [person.to_dict() for person in decoded],
+            [person.to_dict() for person in self.people],
+        )
+        return writer
+
+    async def test_ndjson_round_trip(self):
+        writer = await self.round_trip()
+        self.assertEqual(
+            bytes(writer.data).split(b"\n")[0], self.people[0].to_jsonb_bytes()
+        )
+
+    async def test_length_prefixed_round_trip(self):
+        writer = await self.round_trip(framing="length")
+        payload = self.people[0].to_jsonb_bytes()
+        self.assertEqual(bytes(writer.data[: len(payload) + 1])[1:], payload)
+        self.assertEqual(writer.data[0], len(payload))
+
+    async def test_length_prefixed_proto_round_trip(self):
+        writer = await self.round_trip(framing="length", payload="proto")
+        payload = self.people[0].to_proto_bytes()
+        self.assertEqual(
+            bytes(writer.data[: len(payload) + 1]), bytes([len(payload)]) + payload
+        )
+
+    async def test_backpressure(self):
+        writer = await self.round_trip(buffer_size=256)
+        self.assertGreater(writer.drain_calls, 1)
+        self.assertEqual(writer.drain_calls, writer.write_calls)
+
+    async def test_async_iterable_input(self):
+        async def generate():
+            for person in self.people[:3]:
+                yield person
+
+        writer = MemoryWriter()
+        self.assertEqual(await aio.write_models(writer, generate()), 3)
+        self.assertEqual(len(await self.read_all(bytes(writer.data))), 3)
+
+    async def test_long_lines(self):
+        person = Person(name="x" * 1000, age=1, phone_numbers=[])
+        data = person.to_jsonb_bytes() + b"\n\n" + person.to_jsonb_bytes()
+        reader = make_reader(data, limit=64)
+        decoded = [p async for p in aio.read_models(reader, Person)]
+        self.assertEqual([p.name for p in decoded], ["x" * 1000] * 2)
+
+    async def test_offload_to_executor(self):
+        writer = MemoryWriter()
+        await aio.write_models(writer, self.people)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            decoded = await self.read_all(
+                bytes(writer.data), executor=executor, offload_threshold=0
+            )
+        self.assertEqual(len(decoded), len(self.people))
+
+    async def test_validation(self):
+        data = b'{"name": "Jane", "age": 150, "phone_numbers": []}\n'
+        with self.assertRaises(ValueError):
+            await self.read_all(data)
+        self.assertEqual((await self.read_all(data, validate=False))[0].age, 150)
+
+    async def test_truncated_frames(self):
+        payload = self.people[3].to_jsonb_bytes()
+        with self.assertRaises(ValueError):
+            await self.read_all(bytes([len(payload)]) + payload[:-1], framing="length")
+        with self.assertRaises(ValueError):
+            await self.read_all(b"\x80", framing="length")
+
+    async def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            await aio.write_models(MemoryWriter(), [], framing="xml")
+        with self.assertRaises(ValueError):
+            await self.read_all(b"", payload="proto")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,11 @@
+from abc import ABC, abstractmethod
+import mmap
+import pickle
+import tempfile
 import unittest
-from tests.test_classes import Person, Address
+from dataclasses import dataclass
+from tests.test_classes import Person, Address, SlottedAddress, SlottedPerson
+from transmutate import BaseModel, ValidationError
 
 
 class TestBaseModel(unittest.TestCase):
@@ -48,6 +54,247 @@ class TestBaseModel(unittest.TestCase):
         # Verify the generated content
         self.assertEqual(proto_content.strip(), expected_proto_content.strip())
 
+    def test_validators_resolved_per_class(self):
+        self.assertEqual(
+            [field_name for field_name, _ in Person._validators], ["age", "email"]
+        )
+        self.assertEqual(
+            [field_name for field_name, _ in Address._validators], ["zip_code"]
+        )
+
+    def test_validators_honor_inheritance_and_overrides(self):
+        class Employee(Person):
+            employee_id: str
+
+            def validation_age(self):
+                if self.age < 18:
+                    raise ValueError("Employees must be adults.")
+
+            def validation_employee_id(self):
+                if not self.employee_id.startswith("E"):
+                    raise ValueError("Invalid employee id.")
+
+        self.assertEqual(
+            [field_name for field_name, _ in Employee._validators],
+            ["age", "email", "employee_id"],
+        )
+        employee = Employee(name="Kid", age=12, phone_numbers=[], employee_id="E1")
+        with self.assertRaisesRegex(ValueError, "Employees must be adults."):
+            employee.run_validations()
+
+    def test_static_and_class_method_validators(self):
+        class Limits(BaseModel):
+            low: int
+            high: int
+
+            @staticmethod
+            def validation_low():
+                raise ValueError("Static validator called.")
+
+            @classmethod
+            def validation_high(cls):
+                if cls is not Limits:
+                    raise ValueError("Bound to the wrong class.")
+
+        limits = Limits(low=1, high=2)
+        with self.assertRaisesRegex(ValueError, "Static validator called."):
+            limits.run_validations()
+        with self.assertRaisesRegex(ValueError, "Static validator called."):
+            Limits.from_dict({"low": 1, "high": 2})
+        Limits._validators[1][1](limits)  # The classmethod alone passes
+
+    def test_abstract_base_classes(self):
+        class Shape(BaseModel, ABC):
+            name: str
+
+            @abstractmethod
+            def area(self) -> float: ...
+
+        class Square(Shape, slots=True):
+            side: float
+
+            def area(self) -> float:
+                return self.side**2
+
+        with self.assertRaises(TypeError):
+            Shape(name="shape")
+        square = Square.from_jsonb('{"name": "sq", "side": 3.0}')
+        self.assertIsInstance(square, Shape)
+        self.assertEqual(square.area(), 9.0)
+        self.assertEqual(Square.from_jsonb(square.to_jsonb()).name, "sq")
+
+    def test_run_validations(self):
+        self.person.run_validations()
+        self.person.age = 150
+        with self.assertRaisesRegex(ValueError, "Age must be between 0 and 120."):
+            self.person.run_validations()
+
+    def test_run_validations_collect_errors(self):
+        self.person.age = 150
+        self.person.email = "invalid"
+        with self.assertRaises(ValidationError) as context:
+            self.person.run_validations(collect_errors=True)
+        self.assertEqual(
+            [field_name for field_name, _ in context.exception.errors],
+            ["age", "email"],
+        )
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_from_dict_validates(self):
+        data = {"name": "John Doe", "age": 150, "phone_numbers": []}
+        with self.assertRaises(ValueError):
+            Person.from_dict(data)
+        self.assertEqual(Person.from_dict(data, validate=False).age, 150)
+
+    def test_from_dict_validate_false_skips_post_init(self):
+        @dataclass
+        class ZipCode(BaseModel):
+            zip_code: str
+
+            def validation_zip_code(self):
+                if not self.zip_code.isdigit():
+                    raise ValueError("Zip code must be numeric.")
+
+        data = {"zip_code": "bad"}
+        with self.assertRaises(ValueError):
+            ZipCode.from_dict(data)
+        self.assertEqual(ZipCode.from_dict(data, validate=False).zip_code, "bad")
+
+    def test_to_jsonb_many(self):
+        people = [self.person, Person(name="Jane", age=41, phone_numbers=[])]
+        self.assertEqual(
+            Person.to_jsonb_many(people),
+            "[" + ",".join(person.to_jsonb() for person in people) + "]",
+        )
+        self.assertEqual(Person.to_jsonb_many([]), "[]")
+
+    def test_from_jsonb_many(self):
+        people = [self.person, Person(name="Jane", age=41, phone_numbers=[])]
+        decoded = Person.from_jsonb_many(Person.to_jsonb_many(people))
+        self.assertEqual(len(decoded), 2)
+        self.assertIsInstance(decoded[1], Person)
+        self.assertEqual(decoded[1].name, "Jane")
+        self.assertIsNone(decoded[1].email)
+
+    def test_from_jsonb_many_validates(self):
+        jsonb_data = '[{"name":"Old","age":150,"phone_numbers":[]}]'
+        with self.assertRaises(ValueError):
+            Person.from_jsonb_many(jsonb_data)
+        self.assertEqual(Person.from_jsonb_many(jsonb_data, validate=False)[0].age, 150)
+
+    def test_from_jsonb_many_requires_array(self):
+        with self.assertRaises(ValueError):
+            Person.from_jsonb_many(self.person.to_jsonb())
+
+    def test_to_jsonb_bytes(self):
+        self.assertEqual(
+            self.person.to_jsonb_bytes(), self.person.to_jsonb().encode("utf-8")
+        )
+
+    def test_write_into(self):
+        buffer = bytearray(b"[")
+        written = self.person.write_into(buffer)
+        self.assertEqual(written, len(self.person.to_jsonb()))
+        self.address.write_into(buffer)
+        self.assertEqual(
+            bytes(buffer),
+            b"[" + self.person.to_jsonb_bytes() + self.address.to_jsonb_bytes(),
+        )
+
+    def test_from_jsonb_bytes_like(self):
+        jsonb_data = self.person.to_jsonb_bytes()
+        for buffer in (jsonb_data, bytearray(jsonb_data), memoryview(jsonb_data)):
+            self.assertEqual(Person.from_jsonb(buffer).name, "John Doe")
+
+    def test_from_jsonb_mmap(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(self.address.to_jsonb_bytes())
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(Address.from_jsonb(mapped).city, "Anytown")
+
+
+class TestSlottedModel(unittest.TestCase):
+    def setUp(self):
+        self.person = SlottedPerson(
+            name="John Doe",
+            age=30,
+            phone_numbers=["123-456-7890"],
+            address=SlottedAddress(street="123 Main St", city="Anytown"),
+        )
+
+    def test_slots_generated_from_annotations(self):
+        self.assertEqual(
+            SlottedPerson.__slots__,
+            ("name", "age", "email", "phone_numbers", "address"),
+        )
+        self.assertFalse(hasattr(self.person, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.person.nickname = "Johnny"
+
+    def test_defaults(self):
+        self.assertIsNone(self.person.email)
+        self.assertEqual(self.person.address.zip_code, "00000")
+        self.assertEqual(SlottedPerson._slot_defaults, {"email": None, "address": None})
+
+    def test_json_round_trip(self):
+        person = Person(
+            name="John Doe", age=30, email=None, phone_numbers=["123-456-7890"]
+        )
+        self.assertTrue(
+            self.person.to_jsonb().startswith(person.to_jsonb()[:-1] + ',"address"')
+        )
+        decoded = SlottedPerson.from_jsonb(self.person.to_jsonb())
+        self.assertIsInstance(decoded.address, SlottedAddress)
+        self.assertEqual(decoded.to_jsonb(), self.person.to_jsonb())
+        self.assertEqual(
+            SlottedPerson.from_json(self.person.to_json()).to_dict()["name"],
+            "John Doe",
+        )
+
+    def test_from_dict_validation(self):
+        data = {"name": "Jane", "age": 150, "phone_numbers": []}
+        with self.assertRaises(ValueError):
+            SlottedPerson.from_dict(data)
+        self.assertEqual(SlottedPerson.from_dict(data, validate=False).age, 150)
+        with self.assertRaises(ValueError):
+            SlottedAddress.from_dict(
+                {"street": "1 Main St", "city": "X", "zip_code": "1"}
+            )
+
+    def test_proto(self):
+        self.assertIn("SlottedAddress address = 5;", self.person.to_proto())
+        decoded = SlottedPerson.from_proto_bytes(self.person.to_proto_bytes())
+        self.assertEqual(
+            decoded.to_dict(), SlottedPerson.from_dict(decoded.to_dict()).to_dict()
+        )
+        self.assertEqual(decoded.address.city, "Anytown")
+
+    def test_to_dict_and_repr(self):
+        self.assertEqual(
+            list(self.person.to_dict()),
+            ["name", "age", "email", "phone_numbers", "address"],
+        )
+        self.assertTrue(repr(self.person).startswith("SlottedPerson(name=John Doe"))
+
+    def test_unset_fields_are_omitted(self):
+        person = SlottedPerson(name="Jane")
+        self.assertEqual(set(person.to_dict()), {"name", "email", "address"})
+
+    def test_slotted_subclass(self):
+        class Employee(SlottedPerson, slots=True):
+            employee_id: int = 0
+
+        employee = Employee(name="Jane", age=40, phone_numbers=[])
+        self.assertEqual(Employee.__slots__, ("employee_id",))
+        self.assertFalse(hasattr(employee, "__dict__"))
+        decoded = Employee.from_jsonb(employee.to_jsonb())
+        self.assertEqual((decoded.name, decoded.employee_id), ("Jane", 0))
+
+    def test_pickle(self):
+        restored = pickle.loads(pickle.dumps(self.person))
+        self.assertEqual(restored.to_jsonb(), self.person.to_jsonb())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from benchmarks.models import SHAPES
+from benchmarks.suite import BenchmarkCase, build_cases, compare_results, run_case
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_shapes_round_trip(self):
+        for make_shape in SHAPES.values():
+            model_cls, obj = make_shape()
+            self.assertEqual(
+                model_cls.from_jsonb(obj.to_jsonb()).to_jsonb(), obj.to_jsonb()
+            )
+
+    def test_build_cases(self):
+        names = [case.name for case in build_cases(["flat"])]
+        self.assertIn("flat.serialize_obj", names)
+        self.assertIn("flat.from_dict", names)
+        self.assertIn("proto_generator.content", names)
+        for case in build_cases(["nested"]):
+            case.func()
+
+    def test_run_case(self):
+        metrics = run_case(BenchmarkCase("noop", lambda: None), min_time=0.001)
+        self.assertGreater(metrics["ops_per_sec"], 0)
+        self.assertLessEqual(metrics["p50_us"], metrics["p99_us"])
+        self.assertGreaterEqual(metrics["peak_memory_bytes"], 0)
+
+    def test_compare_results(self):
+        baseline = {
+            "results": {
+                "a": {"ops_per_sec": 1000, "p99_us": 10.0, "peak_memory_bytes": 100},
+                "b": {"ops_per_sec": 1000, "p99_us": 10.0, "peak_memory_bytes": 100},
+                "removed": {"ops_per_sec": 1000},
+            }
+        }
+        current = {
+            "results": {
+                "a": {"ops_per_sec": 950, "p99_us": 10.5, "peak_memory_bytes": 100},
+                "b": {"ops_per_sec": 500, "p99_us": 30.0, "peak_memory_bytes": 0},
+            }
+        }
+        regressions = [
+            (name, metric)
+            for name, metric, _, _, _, regressed in compare_results(
+                baseline, current, threshold=0.1
+            )
+            if regressed
+        ]
+        self.assertEqual(regressions, [("b", "ops_per_sec"), ("b", "p99_us")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from transmutate.base_model import BaseModel
 
 
@@ -25,3 +25,50 @@ class Person(BaseModel):
     def validation_email(self):
         if self.email and "@" not in self.email:
             raise ValueError("Invalid email address.")
+
+
+def make_people(count, first=0):
+    return [
+        Person(
+            name=f"Person {index}",
+            age=index % 100,
+            email=f"person{index}@example.com",
+            phone_numbers=[f"+31 6 {index:08d}"],
+        )
+        for index in range(first, first + count)
+    ]
+
+
+class Customer(BaseModel):
+    person: Person
+    addresses: List[Address]
+    labels: Dict[str, str]
+    billing_address: Optional[Address] = None
+
+
+class Directory(BaseModel):
+    owners: Dict[str, Person]
+    teams: Dict[str, List[Person]]
+    name: str = "default"
+
+
+class SlottedAddress(BaseModel, slots=True):
+    street: str
+    city: str
+    zip_code: str = "00000"
+
+    def validation_zip_code(self):
+        if not self.zip_code.isdigit() or len(self.zip_code) != 5:
+            raise ValueError("Zip code must be a 5-digit number.")
+
+
+class SlottedPerson(BaseModel, slots=True):
+    name: str
+    age: int
+    email: Optional[str] = None
+    phone_numbers: List[str]
+    address: Optional[SlottedAddress] = None
+
+    def validation_age(self):
+        if not (0 <= self.age <= 120):
+            raise ValueError("Age must be between 0 and 120.")
@@ -0,0 +1,185 @@
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from tests.test_classes import Person
+from transmutate import RpcType, Service, write_jsonb
+from transmutate.cli import iter_lines, load_object, main
+from transmutate.framing import encode_frames
+
+SERVICES = [
+    Service(
+        name="PersonService",
+        types=[RpcType.UNARY],
+        method_names=["GetPerson"],
+        request_dataclass=Person,
+        response_dataclass=Person,
+    )
+]
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.people = [
+            Person(name=f"Person {index}", age=index, phone_numbers=[str(index)])
+            for index in range(50)
+        ]
+        self.ndjson_path = self.path("people.ndjson")
+        write_jsonb(self.ndjson_path, self.people)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def run_cli(self, *argv):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stderr.getvalue()
+
+    def convert(self, source, target, input_path, output_path, *options):
+        return self.run_cli(
+            "convert",
+            "--model",
+            "tests.test_classes:Person",
+            "--from",
+            source,
+            "--to",
+            target,
+            input_path,
+            output_path,
+            *options,
+        )
+
+    def test_ndjson_to_proto_and_back(self):
+        proto_path = self.path("people.bin")
+        status, output = self.convert(
+            "ndjson", "proto-bin", self.ndjson_path, proto_path
+        )
+        self.assertEqual(status, 0)
+        self.assertIn("50 records", output)
+        self.assertIn("records/s", output)
+        with open(proto_path, "rb") as proto_file:
+            self.assertEqual(
+                proto_file.read(),
+                encode_frames(person.to_proto_bytes() for person in self.people),
+            )
+
+        back_path = self.path("back.ndjson")
+        status, _ = self.convert(
+            "proto-bin", "jsonb", proto_path, back_path, "--workers", "2"
+        )
+        self.assertEqual(status, 0)
+        with open(back_path, "rb") as back_file:
+            people = [Person.from_jsonb(line) for line in back_file]
+        self.assertEqual(
+            [(person.name, person.age) for person in people],
+            [(person.name, person.age) for person in self.people],
+        )
+
+    def test_json_array_output(self):
+        json_path = self.path("people.json")
+        self.convert("ndjson", "json", self.ndjson_path, json_path, "--chunk-size", "7")
+        with open(json_path) as json_file:
+            data = json.load(json_file)
+        self.assertEqual(len(data), 50)
+        self.assertEqual(data[3]["name"], "Person 3")
+
+    def test_gzip_input_and_output(self):
+        gzip_path = self.path("people.ndjson.gz")
+        self.convert("ndjson", "ndjson", self.ndjson_path, gzip_path)
+        with gzip.open(gzip_path) as gzip_file:
+            self.assertEqual(len(gzip_file.read().splitlines()), 50)
+        json_path = self.path("people.json")
+        self.convert("jsonb", "json", gzip_path, json_path)
+        with open(json_path) as json_file:
+            self.assertEqual(len(json.load(json_file)), 50)
+
+    def test_empty_input(self):
+        empty_path = self.path("empty.ndjson")
+        open(empty_path, "wb").close()
+        json_path = self.path("empty.json")
+        status, _ = self.convert("ndjson", "json", empty_path, json_path)
+        self.assertEqual(status, 0)
+        with open(json_path) as json_file:
+            self.assertEqual(json.load(json_file), [])
+
+    def test_validation(self):
+        invalid_path = self.path("invalid.ndjson")
+        write_jsonb(invalid_path, [Person(name="Old", age=500, phone_numbers=[])])
+        status, output = self.convert(
+            "ndjson", "proto-bin", invalid_path, self.path("out.bin")
+        )
+        self.assertEqual(status, 1)
+        self.assertIn("Age must be between 0 and 120", output)
+        status, _ = self.convert(
+            "ndjson", "proto-bin", invalid_path, self.path("out.bin"), "--no-validate"
+        )
+        self.assertEqual(status, 0)
+
+    def test_unknown_model(self):
+        status, output = self.run_cli(
+            "convert", "--model", "tests.test_classes:Nope", "--to", "json", "a", "b"
+        )
+        self.assertEqual(status, 1)
+        self.assertIn("Nope", output)
+        with self.assertRaises(ValueError):
+            load_object("tests.test_classes")
+        with self.assertRaises(ImportError):
+            load_object("tests.test_classes:Person.nope")
+
+    def test_load_object_from_current_directory(self):
+        with open(self.path("cli_models.py"), "w") as module_file:
+            module_file.write("VALUE = 42\n")
+        cwd = os.getcwd()
+        path = list(sys.path)
+        os.chdir(self.temp_dir.name)
+        try:
+            self.assertEqual(load_object("cli_models:VALUE"), 42)
+        finally:
+            os.chdir(cwd)
+            sys.modules.pop("cli_models", None)
+        self.assertEqual(sys.path, path)
+
+    def test_iter_lines(self):
+        data = b'{"a":1}\n\n  \r\n{"b":2}\r\n{"c":3}'
+        self.assertEqual(
+            [bytes(line) for line in iter_lines(data)],
+            [b'{"a":1}', b'{"b":2}\r', b'{"c":3}'],
+        )
+
+    def test_gen_proto(self):
+        output_dir = self.path("protos")
+        with redirect_stdout(io.StringIO()):
+            status, _ = self.run_cli(
+                "gen-proto",
+                "tests.test_cli:SERVICES",
+                "--service-name",
+                "People",
+                "--output-dir",
+                output_dir,
+                "--processes",
+                "1",
+            )
+        self.assertEqual(status, 0)
+        with open(os.path.join(output_dir, "people.proto")) as proto_file:
+            content = proto_file.read()
+        self.assertIn("rpc GetPerson", content)
+        self.assertIn("message Person {", content)
+
+        status, output = self.run_cli("gen-proto", "tests.test_cli:SERVICES")
+        self.assertEqual(status, 1)
+        self.assertIn("--service-name", output)
+        status, _ = self.run_cli("gen-proto", "tests.test_classes:Person")
+        self.assertEqual(status, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
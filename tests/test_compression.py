@@ -0,0 +1,114 @@
+import io
+import unittest
+import zlib
+from tests.test_classes import Person, make_people
+from transmutate.compression import (
+    MARKER,
+    DictionaryCompressor,
+    train_dictionary,
+)
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.compressor = DictionaryCompressor(Person)
+        self.dictionary_id = self.compressor.train(make_people(200))
+        self.person = make_people(1, first=5000)[0]
+
+    def test_round_trip_with_dictionary(self):
+        data = self.compressor.encode(self.person)
+        self.assertEqual(data[0], MARKER)
+        self.assertEqual(data[1], self.dictionary_id)
+        plain = self.person.to_jsonb_bytes()
+        self.assertLess(len(data), len(zlib.compress(plain)) * 0.7)
+        person = self.compressor.decode(data)
+        self.assertEqual(
+            (person.name, person.email, person.phone_numbers),
+            (self.person.name, self.person.email, self.person.phone_numbers),
+        )
+
+    def test_dictionary_versions(self):
+        old_data = self.compressor.encode(self.person)
+        new_id = self.compressor.train(make_people(50, first=100))
+        self.assertEqual(new_id, self.dictionary_id + 1)
+        new_data = self.compressor.encode(self.person)
+        self.assertEqual(new_data[1], new_id)
+
+        # Another process loading the stored dictionaries reads both versions
+        reader = DictionaryCompressor(Person)
+        for dictionary_id, dictionary in self.compressor.dictionaries.items():
+            reader.add_dictionary(dictionary, dictionary_id)
+        self.assertEqual(reader.decompress(old_data), reader.decompress(new_data))
+        with self.assertRaises(ValueError):
+            DictionaryCompressor(Person).decode(new_data)
+        with self.assertRaises(ValueError):
+            reader.add_dictionary(b"other", dictionary_id=new_id)
+
+    def test_without_dictionary(self):
+        compressor = DictionaryCompressor(Person)
+        data = compressor.compress(b'{"name": "Ann"}')
+        self.assertEqual(data[:2], bytes((MARKER, 0)))
+        self.assertEqual(compressor.decompress(data), b'{"name": "Ann"}')
+
+    def test_invalid_payloads(self):
+        data = self.compressor.encode(self.person)
+        with self.assertRaises(ValueError):
+            self.compressor.decompress(data[:-3])
+        with self.assertRaises(ValueError):
+            self.compressor.decompress(self.person.to_jsonb_bytes())
+
+    def test_train_dictionary(self):
+        samples = [person.to_jsonb_bytes() for person in make_people(20)]
+        dictionary = train_dictionary(samples, size=256)
+        self.assertLessEqual(len(dictionary), 256)
+        self.assertTrue(dictionary.endswith(samples[-1]))
+        self.assertIn(b'"phone_numbers":', dictionary)
+        with self.assertRaises(ValueError):
+            train_dictionary([])
+
+    def test_ndjson_stream(self):
+        people = make_people(300)
+        buffer = io.BytesIO()
+        self.assertEqual(self.compressor.write_ndjson(buffer, people, 1024), 300)
+        data = buffer.getvalue()
+        plain_size = sum(len(person.to_jsonb_bytes()) + 1 for person in people)
+        self.assertLess(len(data), plain_size / 5)
+
+        decoded = list(self.compressor.iter_ndjson(io.BytesIO(data), buffer_size=100))
+        self.assertEqual(
+            [person.name for person in decoded], [person.name for person in people]
+        )
+        with self.assertRaises(ValueError):
+            list(self.compressor.iter_ndjson(io.BytesIO(data[:-10])))
+
+    def test_ndjson_stream_of_compressible_records(self):
+        people = make_people(50)
+        for person in people:
+            person.email = "x" * 5000 + person.email
+        buffer = io.BytesIO()
+        self.compressor.write_ndjson(buffer, people)
+        data = buffer.getvalue()
+        self.assertLess(len(data), 5000)
+
+        # Each read expands to far more than buffer_size bytes
+        decoded = list(self.compressor.iter_ndjson(io.BytesIO(data), buffer_size=64))
+        self.assertEqual(
+            [person.email for person in decoded], [person.email for person in people]
+        )
+        compressor = DictionaryCompressor(Person, max_size=1000)
+        with self.assertRaises(ValueError):
+            list(compressor.iter_ndjson(io.BytesIO(data)))
+
+    def test_max_size(self):
+        compressor = DictionaryCompressor(Person, max_size=100)
+        self.assertEqual(
+            compressor.decompress(compressor.compress(b"a" * 100)), b"a" * 100
+        )
+        with self.assertRaises(ValueError):
+            compressor.decompress(compressor.compress(b"a" * 101))
+        with self.assertRaises(ValueError):
+            compressor.decompress(compressor.compress(b"a" * 100)[:-2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import unittest
+from tests.test_classes import Person
+from transmutate import RpcType
+from transmutate.framing import (
+    FrameDecoder,
+    FrameWriter,
+    encode_frames,
+    iter_frames,
+    read_models,
+    write_models,
+)
+from transmutate.proto_wire import encode_varint
+
+
+class CountingWriter(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.write_calls = 0
+
+    def write(self, data):
+        self.write_calls += 1
+        return super().write(data)
+
+
+class TestFraming(unittest.TestCase):
+    def setUp(self):
+        self.payloads = [b"", b"a", b"x" * 300, b"{}" * 10000, b"last"]
+        self.data = encode_frames(self.payloads)
+
+    def test_encode_frames(self):
+        self.assertEqual(encode_frames([b"abc"]), b"\x03abc")
+        self.assertEqual(
+            encode_frames([b"x" * 300])[:2], encode_varint(300)
+        )  # Multi-byte varint prefix
+        self.assertEqual(encode_frames([]), b"")
+
+    def test_decoder_whole_chunk_zero_copy(self):
+        decoder = FrameDecoder()
+        frames = decoder.feed(self.data)
+        self.assertEqual([bytes(frame) for frame in frames], self.payloads)
+        self.assertTrue(all(isinstance(frame, memoryview) for frame in frames))
+        self.assertIs(frames[2].obj, self.data)
+        self.assertTrue(decoder.at_frame_boundary)
+        decoder.close()
+
+    def test_decoder_partial_chunks(self):
+        for chunk_size in (1, 2, 3, 7, 64, 301, 4096):
+            decoder = FrameDecoder()
+            frames = []
+            for pos in range(0, len(self.data), chunk_size):
+                frames += decoder.feed(self.data[pos : pos + chunk_size])
+            self.assertEqual([bytes(frame) for frame in frames], self.payloads)
+            decoder.close()
+
+    def test_decoder_truncated_stream(self):
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(self.data[:-1])[-1], self.payloads[-2])
+        self.assertFalse(decoder.at_frame_boundary)
+        with self.assertRaises(ValueError):
+            decoder.close()
+
+    def test_decoder_limits(self):
+        with self.assertRaises(ValueError):
+            FrameDecoder(max_frame_size=100).feed(encode_frames([b"x" * 101]))
+        with self.assertRaises(ValueError):
+            FrameDecoder().feed(b"\xff" * 11)
+
+    def test_writer_batches_flushes(self):
+        buffer = CountingWriter()
+        with FrameWriter(buffer, buffer_size=1024) as writer:
+            for _ in range(100):
+                writer.write(b"x" * 50)
+        self.assertEqual(writer.frame_count, 100)
+        self.assertEqual(buffer.write_calls, 5)
+        self.assertEqual(len(list(iter_frames(io.BytesIO(buffer.getvalue())))), 100)
+
+    def test_iter_frames_small_chunks(self):
+        frames = list(iter_frames(io.BytesIO(self.data), chunk_size=5))
+        self.assertEqual([bytes(frame) for frame in frames], self.payloads)
+
+    def test_models_round_trip(self):
+        people = [
+            Person(name=f"Person {n}", age=n, email=None, phone_numbers=[str(n)])
+            for n in range(20)
+        ]
+        for payload in ("jsonb", "proto"):
+            buffer = io.BytesIO()
+            self.assertEqual(write_models(buffer, people, payload=payload), 20)
+            buffer.seek(0)
+            decoded = list(read_models(buffer, Person, payload=payload, chunk_size=16))
+            self.assertEqual(
+                [person.to_dict() for person in decoded],
+                [person.to_dict() for person in people],
+            )
+
+    def test_unknown_payload(self):
+        with self.assertRaises(ValueError):
+            write_models(io.BytesIO(), [Person(name="a", age=1)], payload="xml")
+
+    def test_rpc_type_streaming_sides(self):
+        self.assertFalse(RpcType.UNARY.streams_requests)
+        self.assertFalse(RpcType.UNARY.streams_responses)
+        self.assertTrue(RpcType.SERVER_STREAMING.streams_responses)
+        self.assertTrue(RpcType.CLIENT_STREAMING.streams_requests)
+        self.assertTrue(RpcType.BIDIRECTIONAL.streams_requests)
+        self.assertTrue(RpcType.BIDIRECTIONAL.streams_responses)
+
+
+if __name__ == "__main__":
+    unittest.main()
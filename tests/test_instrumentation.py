@@ -0,0 +1,103 @@
+import unittest
+from tests.test_classes import Address, Person
+from transmutate import BaseModel, instrumentation
+from transmutate.instrumentation import INSTRUMENTED_METHODS, Observer
+
+PERSON = "tests.test_classes.Person"
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.person = Person(
+            name="John Doe",
+            age=30,
+            email="john.doe@example.com",
+            phone_numbers=["123-456-7890"],
+        )
+        self.addCleanup(instrumentation.disable)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertIsNone(instrumentation.get_observer())
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_originals_restored(self):
+        originals = {name: BaseModel.__dict__[name] for name in INSTRUMENTED_METHODS}
+        validators = Person._validators
+        instrumentation.enable()
+        self.assertIsNot(BaseModel.__dict__["to_jsonb"], originals["to_jsonb"])
+        self.person.run_validations()
+        self.assertIsNot(Person._validators, validators)
+        instrumentation.disable()
+        for name, original in originals.items():
+            self.assertIs(BaseModel.__dict__[name], original)
+        self.assertIs(Person._validators, validators)
+
+    def test_records_operations(self):
+        with instrumentation.instrumented() as observer:
+            jsonb_data = self.person.to_jsonb()
+            self.assertEqual(Person.from_jsonb(jsonb_data).name, "John Doe")
+            json_data = self.person.to_json()
+            Person.from_json(json_data)
+            snapshot = observer.snapshot()
+
+        operations = snapshot[PERSON]["operations"]
+        self.assertEqual(operations["to_jsonb"]["count"], 1)
+        self.assertEqual(operations["to_jsonb"]["bytes"], len(jsonb_data))
+        self.assertEqual(operations["from_jsonb"]["bytes"], len(jsonb_data))
+        self.assertEqual(operations["to_json"]["bytes"], len(json_data))
+        # from_json and from_jsonb go through from_dict
+        self.assertEqual(operations["from_dict"]["count"], 2)
+        self.assertEqual(operations["run_validations"]["count"], 2)
+        self.assertGreater(operations["to_jsonb"]["seconds"], 0)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_payload_bytes_are_utf8(self):
+        person = Person(name="Zoë", age=30, phone_numbers=[])
+        with instrumentation.instrumented() as observer:
+            jsonb_data = person.to_jsonb()
+            person.to_jsonb_bytes()  # Not instrumented
+        operations = observer.snapshot()[PERSON]["operations"]
+        self.assertEqual(operations["to_jsonb"]["bytes"], len(jsonb_data.encode()))
+        self.assertNotIn("to_jsonb_bytes", operations)
+
+    def test_records_validators_and_errors(self):
+        with instrumentation.instrumented() as observer:
+            with self.assertRaises(ValueError):
+                Person.from_dict({"name": "Jane", "age": 150, "phone_numbers": []})
+            address = Address(street="1 Main St", city="Anytown", zip_code="1")
+            with self.assertRaises(ValueError):
+                address.run_validations(collect_errors=True)
+            snapshot = observer.snapshot()
+
+        validators = snapshot[PERSON]["validators"]
+        self.assertEqual(
+            validators["age"], {**validators["age"], "count": 1, "errors": 1}
+        )
+        # The first failure stops the other validators
+        self.assertNotIn("email", validators)
+        self.assertEqual(snapshot[PERSON]["operations"]["from_dict"]["errors"], 1)
+        address_stats = snapshot["tests.test_classes.Address"]
+        self.assertEqual(address_stats["validators"]["zip_code"]["errors"], 1)
+        self.assertEqual(address_stats["operations"]["run_validations"]["errors"], 1)
+
+    def test_custom_observer(self):
+        class ListObserver(Observer):
+            def __init__(self):
+                super().__init__()
+                self.calls = []
+
+            def record(self, model_cls, operation, seconds, size=None, error=False):
+                self.calls.append((model_cls, operation))
+                super().record(model_cls, operation, seconds, size, error)
+
+        observer = instrumentation.enable(ListObserver())
+        self.assertIs(instrumentation.get_observer(), observer)
+        self.person.to_jsonb()
+        self.assertEqual(observer.calls, [(Person, "to_jsonb")])
+        observer.reset()
+        self.assertEqual(instrumentation.snapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
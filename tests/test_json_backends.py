@@ -0,0 +1,201 @@
+import json
+import math
+import unittest
+from typing import List, Optional
+from tests.test_classes import Person
+from transmutate.base_model import BaseModel
+from transmutate import json_backends
+from transmutate.json_backends import (
+    JSONBackend,
+    StdlibBackend,
+    available_backends,
+    get_backend,
+    register_backend,
+    set_backend,
+)
+from transmutate.model_plan import encode_value
+
+SAMPLE = {
+    "name": "John Doe",
+    "age": 30,
+    "score": 12.5,
+    "active": True,
+    "email": None,
+    "phone_numbers": ["123-456-7890", "555-000-1111"],
+    "address": {"street": "123 Main St", "zip_code": "12345"},
+    "matrix": [[1, 2], [3, 4]],
+    "empty": {},
+}
+
+
+class Measure(BaseModel):
+    value: float
+    limit: Optional[float] = None
+    samples: List[float]
+
+
+class BackendConformance:
+    """
+    Conformance suite every JSON backend must pass.
+
+    Output is compared with the stdlib backend, which defines the semantics.
+    """
+
+    backend_name = "stdlib"
+
+    def setUp(self):
+        self.backend = get_backend(self.backend_name)
+        self.stdlib = StdlibBackend()
+
+    def test_compact_output_matches_stdlib(self):
+        self.assertEqual(self.backend.dumps(SAMPLE), self.stdlib.dumps(SAMPLE))
+        self.assertEqual(
+            self.backend.dumps(SAMPLE),
+            json.dumps(SAMPLE, separators=(",", ":")),
+        )
+
+    def test_pretty_output_matches_stdlib(self):
+        self.assertEqual(
+            self.backend.dumps(SAMPLE, indent=4), json.dumps(SAMPLE, indent=4)
+        )
+
+    def test_dumps_bytes(self):
+        self.assertEqual(
+            self.backend.dumps_bytes(SAMPLE), self.stdlib.dumps(SAMPLE).encode()
+        )
+
+    def test_round_trip(self):
+        values = [
+            SAMPLE,
+            {"text": "héllo wörld ✓ 😀", "quote": 'say "hi"\n\t\\'},
+            {"big": 2**70, "negative": -(2**63), "float": 0.1, "exp": 1e-7},
+            [],
+            "plain string",
+            0,
+        ]
+        for value in values:
+            self.assertEqual(self.backend.loads(self.backend.dumps(value)), value)
+            self.assertEqual(json.loads(self.backend.dumps(value)), value)
+            self.assertEqual(self.backend.loads(self.stdlib.dumps(value)), value)
+
+    def test_non_finite_floats_match_stdlib(self):
+        # Non-finite floats are only written as in the stdlib once the model
+        # encoders marked them
+        values = [
+            {"nan": math.nan, "inf": math.inf, "ninf": -math.inf, "none": None},
+            [1.5, [math.inf], {"nested": [math.nan]}],
+            {"none": None, "finite": 1.5},
+        ]
+        for value in map(encode_value, values):
+            self.assertEqual(self.backend.dumps(value), self.stdlib.dumps(value))
+            self.assertEqual(
+                self.backend.dumps_bytes(value), self.stdlib.dumps_bytes(value)
+            )
+        measure = Measure(
+            value=math.nan, limit=math.inf, samples=[1.0, -math.inf], extra=math.nan
+        )
+        self.assertEqual(
+            measure.to_jsonb(backend=self.backend_name),
+            '{"value":NaN,"limit":Infinity,"samples":[1.0,-Infinity],"extra":NaN}',
+        )
+        self.assertEqual(
+            Measure(value=0.5, limit=None, samples=[]).to_jsonb_bytes(
+                backend=self.backend_name
+            ),
+            b'{"value":0.5,"limit":null,"samples":[]}',
+        )
+
+    def test_non_string_keys(self):
+        data = {1: "one", 2.5: "half", None: "none"}
+        self.assertEqual(
+            json.loads(self.backend.dumps(data)), json.loads(self.stdlib.dumps(data))
+        )
+
+    def test_loads_buffers(self):
+        text = self.stdlib.dumps(SAMPLE)
+        for data in (
+            text,
+            text.encode(),
+            bytearray(text.encode()),
+            memoryview(text.encode()),
+        ):
+            self.assertEqual(self.backend.loads(data), SAMPLE)
+
+    def test_loads_non_finite_and_big_numbers(self):
+        self.assertEqual(self.backend.loads("[18446744073709551616]"), [2**64])
+        self.assertTrue(math.isnan(self.backend.loads("NaN")))
+
+    def test_invalid_json(self):
+        for data in ('{"name": ', "[1, 2,]", ""):
+            with self.assertRaises(ValueError):
+                self.backend.loads(data)
+
+    def test_unsupported_values(self):
+        with self.assertRaises(TypeError):
+            self.backend.dumps({"value": object()})
+        with self.assertRaises(TypeError):
+            self.backend.dumps({"value": {1, 2}})
+
+    def test_model_round_trip(self):
+        person = Person(name="Zoë", age=30, phone_numbers=["1"])
+        jsonb_data = person.to_jsonb(backend=self.backend_name)
+        decoded = Person.from_jsonb(jsonb_data, backend=self.backend_name)
+        self.assertEqual(decoded.name, "Zoë")
+        self.assertEqual(
+            person.to_jsonb_bytes(backend=self.backend_name),
+            jsonb_data.encode("utf-8"),
+        )
+
+
+class TestStdlibBackend(BackendConformance, unittest.TestCase):
+    backend_name = "stdlib"
+
+
+@unittest.skipUnless("orjson" in available_backends(), "orjson is not installed")
+class TestOrjsonBackend(BackendConformance, unittest.TestCase):
+    backend_name = "orjson"
+
+
+class TestBackendRegistry(unittest.TestCase):
+    def tearDown(self):
+        set_backend(None)
+        json_backends._BACKEND_FACTORIES.pop("missing", None)
+        json_backends._BACKEND_FACTORIES.pop("custom", None)
+        json_backends._BACKEND_ORDER[:] = [
+            name
+            for name in json_backends._BACKEND_ORDER
+            if name in ("orjson", "stdlib")
+        ]
+
+    def test_default_is_fastest_available(self):
+        self.assertEqual(get_backend().name, available_backends()[0])
+        self.assertEqual(available_backends()[-1], "stdlib")
+
+    def test_set_backend(self):
+        self.assertEqual(set_backend("stdlib").name, "stdlib")
+        self.assertIs(get_backend(), get_backend("stdlib"))
+        with self.assertRaises(ValueError):
+            set_backend("unknown")
+        self.assertEqual(get_backend().name, "stdlib")
+
+    def test_unavailable_backend(self):
+        def missing():
+            raise ImportError("not installed")
+
+        register_backend("missing", missing, preferred=True)
+        self.assertNotIn("missing", available_backends())
+        self.assertNotEqual(get_backend().name, "missing")
+        with self.assertRaises(ValueError):
+            get_backend("missing")
+
+    def test_register_preferred_backend(self):
+        class CustomBackend(StdlibBackend):
+            name = "custom"
+
+        register_backend("custom", CustomBackend, preferred=True)
+        self.assertIsInstance(get_backend(), CustomBackend)
+        self.assertIsInstance(get_backend(), JSONBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -55,6 +55,24 @@ class TestJSONBHandler(unittest.TestCase):
         self.assertEqual(data_dict["city"], "Anytown")
         self.assertEqual(data_dict["zip_code"], "12345")
 
+    def test_to_jsonb_bytes(self):
+        jsonb_handler = JSONBHandler(self.address)
+        self.assertEqual(
+            jsonb_handler.to_jsonb_bytes(),
+            b'{"street":"123 Main St","city":"Anytown","zip_code":"12345"}',
+        )
+
+    def test_parse_jsonb_buffers(self):
+        jsonb_data = b'{"street":"123 Main St","city":"Anytown","zip_code":"12345"}'
+        for buffer in (
+            jsonb_data,
+            bytearray(jsonb_data),
+            memoryview(jsonb_data),
+            memoryview(b"  " + jsonb_data)[2:],
+        ):
+            data_dict = JSONBHandler.parse_jsonb(buffer)
+            self.assertEqual(data_dict["zip_code"], "12345")
+
 
 if __name__ == "__main__":
     unittest.main()
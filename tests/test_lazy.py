@@ -0,0 +1,150 @@
+import io
+import json
+import unittest
+from tests.test_classes import Address, Customer, Person
+from transmutate.base_model import BaseModel
+from transmutate.lazy import LazyModel
+from transmutate.ndjson import write_jsonb
+
+
+class Shipment(BaseModel):
+    reference: str
+    customer: Customer
+    parcels: list
+    priority: int = 1
+
+    def validation_priority(self):
+        if self.priority not in (1, 2, 3):
+            raise ValueError("Priority must be 1, 2 or 3.")
+
+    def label(self):
+        return f"{self.reference}/{self.priority}"
+
+
+class TestLazyModel(unittest.TestCase):
+    def setUp(self):
+        self.customer = Customer(
+            person=Person(
+                name="Jane", age=41, email="jane@example.com", phone_numbers=["1"]
+            ),
+            addresses=[
+                Address(street="1 Main St", city="Springfield", zip_code="12345")
+            ],
+            labels={"tier": "gold"},
+        )
+        self.shipment = Shipment(
+            reference="SHP-1", customer=self.customer, parcels=[1, 2], priority=2
+        )
+        self.jsonb = self.shipment.to_jsonb()
+
+    def test_scalar_access_skips_nested_models(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        self.assertEqual(lazy.reference, "SHP-1")
+        self.assertEqual(lazy.priority, 2)
+        self.assertFalse(lazy.is_decoded("customer"))
+
+    def test_nested_model_decoded_once(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        customer = lazy.customer
+        self.assertIsInstance(customer, Customer)
+        self.assertEqual(customer.addresses[0].city, "Springfield")
+        self.assertIs(lazy.customer, customer)
+
+    def test_isinstance(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        self.assertIsInstance(lazy, Shipment)
+        self.assertIsInstance(lazy, LazyModel)
+
+    def test_defaults(self):
+        data = json.loads(self.jsonb)
+        del data["priority"]
+        lazy = Shipment.from_jsonb_lazy(json.dumps(data))
+        self.assertEqual(lazy.priority, 1)
+
+    def test_missing_required_field(self):
+        data = json.loads(self.jsonb)
+        del data["reference"]
+        with self.assertRaises(ValueError):
+            Shipment.from_jsonb_lazy(json.dumps(data))
+
+    def test_validation_on_access(self):
+        data = json.loads(self.jsonb)
+        data["priority"] = 9
+        data["customer"]["addresses"][0]["zip_code"] = "bad"
+        lazy = Shipment.from_jsonb_lazy(json.dumps(data))
+        self.assertEqual(lazy.reference, "SHP-1")
+        with self.assertRaises(ValueError):
+            lazy.priority
+        with self.assertRaises(ValueError):
+            lazy.priority  # Not cached after a failed validation
+        with self.assertRaises(ValueError):
+            lazy.customer
+
+        unvalidated = Shipment.from_jsonb_lazy(json.dumps(data), validate=False)
+        self.assertEqual(unvalidated.priority, 9)
+        self.assertEqual(unvalidated.customer.addresses[0].zip_code, "bad")
+
+    def test_materialize(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        customer = lazy.customer
+        shipment = lazy.materialize()
+        self.assertIsInstance(shipment, Shipment)
+        self.assertIs(shipment.customer, customer)
+        self.assertEqual(lazy.to_dict()["parcels"], [1, 2])
+        self.assertEqual(lazy.to_jsonb(), Shipment.from_jsonb(self.jsonb).to_jsonb())
+
+    def test_assignment(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        lazy.reference = "SHP-2"
+        self.assertEqual(lazy.reference, "SHP-2")
+        self.assertEqual(lazy.materialize().reference, "SHP-2")
+
+    def test_methods_bound_to_proxy(self):
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        self.assertEqual(lazy.label(), "SHP-1/2")
+        self.assertFalse(lazy.is_decoded("customer"))
+        with self.assertRaises(AttributeError):
+            lazy.unknown
+
+    def test_encoders_accept_proxies(self):
+        expected = Shipment.from_jsonb(self.jsonb).to_jsonb_bytes()
+        lazy = Shipment.from_jsonb_lazy(self.jsonb)
+        self.assertEqual(lazy.to_jsonb_bytes(), expected)
+        buffer = bytearray()
+        self.assertEqual(lazy.write_into(buffer), len(expected))
+        self.assertEqual(bytes(buffer), expected)
+        self.assertEqual(
+            json.loads(Shipment.to_jsonb_many([lazy, lazy])),
+            [json.loads(expected)] * 2,
+        )
+        output = io.BytesIO()
+        write_jsonb(output, [lazy])
+        self.assertEqual(output.getvalue(), expected + b"\n")
+
+    def test_proxy_in_nested_field(self):
+        person = Person.from_jsonb_lazy(self.customer.person.to_jsonb())
+        customer = Customer(
+            person=person, addresses=[], labels={}, billing_address=None
+        )
+        self.assertEqual(
+            json.loads(customer.to_jsonb())["person"]["email"], "jane@example.com"
+        )
+        decoded = Customer.from_proto_bytes(customer.to_proto_bytes())
+        self.assertEqual(decoded.person.name, "Jane")
+
+    def test_field_table_follows_class_changes(self):
+        class Temporary(BaseModel):
+            name: str
+
+        self.assertEqual(Temporary.from_jsonb_lazy('{"name": "a"}').name, "a")
+        Temporary.__annotations__ = {"name": str, "size": int}
+        with self.assertRaises(ValueError):
+            Temporary.from_jsonb_lazy('{"name": "a"}')
+
+    def test_rejects_non_object(self):
+        with self.assertRaises(ValueError):
+            Shipment.from_jsonb_lazy("[1, 2]")
+
+
+if __name__ == "__main__":
+    unittest.main()
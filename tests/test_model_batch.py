@@ -0,0 +1,181 @@
+import gzip
+import io
+import unittest
+from array import array
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from tests.test_classes import Address, Customer, Person
+from transmutate import BaseModel, ModelBatch, ValidationError, write_jsonb
+
+
+class Measurement(BaseModel):
+    sensor: str
+    value: float
+    count: int
+    active: bool
+    note: Optional[str] = None
+
+    def validation_count(self):
+        if self.count < 0:
+            raise ValueError("Count must be positive.")
+
+
+class Level(Enum):
+    LOW = 1
+    HIGH = 2
+
+
+class Event(BaseModel):
+    at: datetime
+    level: Level
+    address: Optional[Address] = None
+
+    def validation_at(self):
+        if self.at.year < 2000:
+            raise ValueError("Events start in 2000.")
+
+    def validation_address(self):
+        if self.address is not None and not isinstance(self.address, Address):
+            raise ValueError("Address must be decoded.")
+
+
+class TestModelBatch(unittest.TestCase):
+    def setUp(self):
+        self.people = [
+            Person(name=f"Person {n}", age=n, email=None, phone_numbers=[str(n)])
+            for n in range(10)
+        ]
+        self.batch = ModelBatch[Person].from_models(self.people)
+
+    def test_batch_class_is_cached(self):
+        self.assertIs(ModelBatch[Person], ModelBatch[Person])
+        self.assertIs(ModelBatch[Person].model_cls, Person)
+        with self.assertRaises(TypeError):
+            ModelBatch()
+
+    def test_columns(self):
+        batch = ModelBatch[Measurement].from_dicts(
+            [
+                {"sensor": "a", "value": 1.5, "count": 3, "active": True},
+                {"sensor": "b", "value": 2, "count": 4, "active": False, "note": "x"},
+            ]
+        )
+        self.assertEqual(batch.column("value"), array("d", [1.5, 2.0]))
+        self.assertEqual(batch.column("count"), array("q", [3, 4]))
+        self.assertEqual(batch.column("active"), array("B", [1, 0]))
+        self.assertEqual(batch.column("sensor"), ["a", "b"])
+        self.assertEqual(batch.column("note"), [None, "x"])
+        self.assertIs(batch[0].active, True)
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            ModelBatch[Measurement].from_dicts(
+                [{"sensor": "a", "value": "high", "count": 3, "active": True}]
+            )
+        with self.assertRaises(ValueError):
+            ModelBatch[Measurement].from_dicts([{"sensor": "a"}])
+
+    def test_big_integers_fall_back_to_lists(self):
+        batch = ModelBatch[Measurement].from_dicts(
+            [
+                {"sensor": "a", "value": 1.0, "count": 1, "active": True},
+                {"sensor": "b", "value": 1.0, "count": 2**70, "active": True},
+            ]
+        )
+        self.assertEqual(batch.column("count"), [1, 2**70])
+
+    def test_row_access(self):
+        self.assertEqual(len(self.batch), 10)
+        person = self.batch[3]
+        self.assertIsInstance(person, Person)
+        self.assertEqual(person.to_dict(), self.people[3].to_dict())
+        self.assertEqual(self.batch[-1].name, "Person 9")
+        with self.assertRaises(IndexError):
+            self.batch[10]
+
+    def test_slice(self):
+        part = self.batch[2:5]
+        self.assertEqual(len(part), 3)
+        self.assertEqual([person.age for person in part], [2, 3, 4])
+
+    def test_to_models(self):
+        models = self.batch.to_models()
+        self.assertEqual(
+            [model.to_dict() for model in models],
+            [person.to_dict() for person in self.people],
+        )
+
+    def test_to_jsonb(self):
+        self.assertEqual(self.batch.to_jsonb(), Person.to_jsonb_many(self.people))
+        decoded = ModelBatch[Person].from_jsonb(self.batch.to_jsonb())
+        self.assertEqual(decoded.to_jsonb(), self.batch.to_jsonb())
+
+    def test_nested_models(self):
+        customer = Customer(
+            person=self.people[1],
+            addresses=[Address(street="1 Main St", city="Anytown", zip_code="12345")],
+            labels={"tier": "gold"},
+            billing_address=None,
+        )
+        batch = ModelBatch[Customer].from_models([customer, customer])
+        self.assertEqual(batch.column("person")[0]["name"], "Person 1")
+        row = batch[1]
+        self.assertIsInstance(row.person, Person)
+        self.assertIsInstance(row.addresses[0], Address)
+        self.assertEqual(batch.to_jsonb(), Customer.to_jsonb_many([customer] * 2))
+
+    def test_proto_bytes_round_trip(self):
+        decoded = ModelBatch[Person].from_proto_bytes(self.batch.to_proto_bytes())
+        self.assertEqual(decoded.to_jsonb(), self.batch.to_jsonb())
+        first = self.people[0].to_proto_bytes()
+        self.assertEqual(
+            self.batch.to_proto_bytes()[: len(first) + 2],
+            bytes([0x0A, len(first)]) + first,
+        )
+
+    def test_validate(self):
+        records = [
+            {"sensor": "a", "value": 1.0, "count": -1, "active": True},
+            {"sensor": "b", "value": 1.0, "count": -2, "active": True},
+        ]
+        with self.assertRaises(ValueError):
+            ModelBatch[Measurement].from_dicts(records)
+        batch = ModelBatch[Measurement].from_dicts(records, validate=False)
+        with self.assertRaises(ValidationError) as context:
+            batch.validate(collect_errors=True)
+        self.assertEqual(
+            [field for field, _ in context.exception.errors], ["count[0]", "count[1]"]
+        )
+
+    def test_typed_values(self):
+        address = Address(street="1 Main St", city="Anytown", zip_code="12345")
+        events = [
+            Event(at=datetime(2024, 1, 2, 3, 4), level=Level.HIGH, address=address),
+            Event(at=datetime(2001, 5, 6), level=Level.LOW, address=None),
+        ]
+        batch = ModelBatch[Event].from_models(events)
+        batch.validate()
+        self.assertEqual(batch.column("level"), [2, 1])
+        self.assertIs(
+            ModelBatch[Event].from_jsonb(batch.to_jsonb())[0].level, Level.HIGH
+        )
+        with self.assertRaises(ValueError):
+            ModelBatch[Event].from_dicts([{"at": "1999-01-01T00:00:00", "level": 1}])
+
+        decoded = ModelBatch[Event].from_proto_bytes(batch.to_proto_bytes())
+        self.assertEqual(decoded.column("level"), [2, 1])
+        self.assertEqual(decoded.to_jsonb(), batch.to_jsonb())
+        self.assertEqual(decoded.to_jsonb(), Event.to_jsonb_many(events))
+
+    def test_from_ndjson(self):
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as file:
+            write_jsonb(file, self.people)
+        buffer.seek(0)
+        batch = ModelBatch[Person].from_ndjson(io.BufferedReader(buffer))
+        self.assertEqual(batch.to_jsonb(), self.batch.to_jsonb())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+import unittest
+from dataclasses import dataclass, field
+from typing import List, Optional
+from tests.test_classes import Person, Address, Customer, Directory
+from transmutate.base_model import BaseModel
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.model_plan import ModelPlan
+
+
+class TestModelPlan(unittest.TestCase):
+    def setUp(self):
+        self.person = Person(
+            name="John Doe",
+            age=30,
+            email="john.doe@example.com",
+            phone_numbers=["123-456-7890"],
+        )
+        self.address = Address(
+            street="123 Main St",
+            city="Anytown",
+            zip_code="12345",
+        )
+        self.customer = Customer(
+            person=self.person,
+            addresses=[self.address],
+            labels={"tier": "gold"},
+            billing_address=None,
+        )
+
+    def test_plan_is_cached_per_class(self):
+        plan = Person._get_plan()
+        self.assertIsInstance(plan, ModelPlan)
+        self.assertIs(Person._get_plan(), plan)
+        self.assertIsNot(Address._get_plan(), plan)
+
+    def test_plan_fields_follow_annotations(self):
+        plan = Person._get_plan()
+        self.assertEqual(
+            [(field.name, field.number) for field in plan.fields],
+            [("name", 1), ("age", 2), ("email", 3), ("phone_numbers", 4)],
+        )
+
+    def test_encode_nested_models(self):
+        self.assertEqual(
+            Customer._get_plan().encode(self.customer),
+            {
+                "person": {
+                    "name": "John Doe",
+                    "age": 30,
+                    "email": "john.doe@example.com",
+                    "phone_numbers": ["123-456-7890"],
+                },
+                "addresses": [
+                    {"street": "123 Main St", "city": "Anytown", "zip_code": "12345"}
+                ],
+                "labels": {"tier": "gold"},
+                "billing_address": None,
+            },
+        )
+
+    def test_encode_plain_dicts_in_model_fields(self):
+        person = Customer._get_plan().encode(self.customer)["person"]
+        address = {"street": "1 Elm St", "city": "Anytown", "zip_code": "12345"}
+        customer = Customer(
+            person=dict(person), addresses=[address], labels={}, billing_address=None
+        )
+        data = JSONBHandler.parse_jsonb(customer.to_jsonb())
+        self.assertEqual(data["person"], person)
+        self.assertEqual(data["addresses"], [address])
+        decoded = Customer.from_proto_bytes(customer.to_proto_bytes())
+        self.assertEqual(decoded.person.name, "John Doe")
+        self.assertEqual(decoded.addresses[0].street, "1 Elm St")
+
+    def test_encode_returns_new_dict(self):
+        data = Person._get_plan().encode(self.person)
+        data["name"] = "Jane Doe"
+        self.assertEqual(self.person.name, "John Doe")
+
+    def test_scalar_fields_are_passed_through(self):
+        self.assertEqual(Person._get_plan()._converters, ())
+
+    def test_unannotated_attributes_use_generic_path(self):
+        self.person.nickname = "JD"
+        self.person.home = self.address
+        data = Person._get_plan().encode(self.person)
+        self.assertEqual(data["nickname"], "JD")
+        self.assertEqual(data["home"]["zip_code"], "12345")
+
+    def test_to_jsonb_matches_handler(self):
+        self.assertEqual(
+            self.customer.to_jsonb(), JSONBHandler(self.customer).to_jsonb()
+        )
+
+    def test_to_json_person(self):
+        expected_json = """{
+    "name": "John Doe",
+    "age": 30,
+    "email": "john.doe@example.com",
+    "phone_numbers": [
+        "123-456-7890"
+    ]
+}"""
+        self.assertEqual(self.person.to_json(), expected_json)
+
+    def test_from_json_builds_nested_models(self):
+        customer = Customer.from_json(self.customer.to_json())
+        self.assertIsInstance(customer.person, Person)
+        self.assertIsInstance(customer.addresses[0], Address)
+        self.assertEqual(customer.addresses[0].zip_code, "12345")
+        self.assertEqual(customer.labels, {"tier": "gold"})
+        self.assertIsNone(customer.billing_address)
+        self.assertEqual(customer.to_jsonb(), self.customer.to_jsonb())
+
+    def test_from_dict_builds_dict_of_models(self):
+        data = {
+            "owners": {"jd": {"name": "John Doe", "age": 30, "phone_numbers": []}},
+            "teams": {"core": [{"name": "Jane", "age": 41, "phone_numbers": []}]},
+        }
+        directory = Directory.from_dict(data)
+        self.assertIsInstance(directory.owners["jd"], Person)
+        self.assertEqual(directory.teams["core"][0].name, "Jane")
+        self.assertEqual(directory.name, "default")
+
+    def test_from_dict_optional_field_absent(self):
+        person = Person.from_dict({"name": "John Doe", "age": 30, "phone_numbers": []})
+        self.assertIsNone(person.email)
+        customer = Customer.from_dict(
+            {"person": self.person.to_dict(), "addresses": [], "labels": {}}
+        )
+        self.assertIsNone(customer.billing_address)
+
+    def test_from_dict_missing_required_field(self):
+        with self.assertRaises(ValueError) as context:
+            Person.from_dict({"name": "John Doe", "phone_numbers": []})
+        self.assertEqual(str(context.exception), "Missing required field 'age'")
+
+    def test_from_dict_accepts_model_instances(self):
+        customer = Customer.from_dict(
+            {"person": self.person, "addresses": [self.address], "labels": {}}
+        )
+        self.assertIs(customer.person, self.person)
+
+    def test_from_dict_dataclass_defaults(self):
+        @dataclass
+        class Inventory(BaseModel):
+            sku: str
+            tags: List[str] = field(default_factory=list)
+            location: Optional[Address] = None
+
+        inventory = Inventory.from_dict(
+            {
+                "sku": "A-1",
+                "location": {"street": "1 Way", "city": "X", "zip_code": "54321"},
+            }
+        )
+        self.assertEqual(inventory.tags, [])
+        self.assertIsInstance(inventory.location, Address)
+        self.assertIsNot(Inventory.from_dict({"sku": "A-2"}).tags, inventory.tags)
+
+    def test_from_dict_dataclass_without_validation(self):
+        @dataclass
+        class Totals(BaseModel):
+            values: List[int]
+            total: int = field(init=False, default=0)
+            history: List[int] = field(init=False, default_factory=list)
+
+            def __post_init__(self):
+                self.total = sum(self.values)
+                super().__post_init__()
+
+            def validation_values(self):
+                if any(value < 0 for value in self.values):
+                    raise ValueError("Values must be positive.")
+
+        totals = Totals.from_dict({"values": [1, -2]}, validate=False)
+        self.assertEqual(totals.total, -1)
+        self.assertEqual(totals.history, [])
+        with self.assertRaises(ValueError):
+            Totals.from_dict({"values": [1, -2]})
+        with self.assertRaises(ValueError):
+            Totals(values=[-1])
+
+
+class TestProjection(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "person": {
+                "name": "John Doe",
+                "age": 30,
+                "email": "john.doe@example.com",
+                "phone_numbers": ["123-456-7890"],
+            },
+            "addresses": [
+                {"street": "123 Main St", "city": "Anytown", "zip_code": "12345"},
+                {"street": "9 Side St", "city": "Othertown", "zip_code": "54321"},
+            ],
+            "labels": {"tier": "gold"},
+        }
+
+    def test_only_requested_fields_are_set(self):
+        customer = Customer.from_dict(self.data, fields=["labels"])
+        self.assertIsInstance(customer, Customer)
+        self.assertEqual(customer.labels, {"tier": "gold"})
+        self.assertNotIn("person", customer.__dict__)
+        self.assertNotIn("billing_address", customer.__dict__)
+
+    def test_dotted_paths(self):
+        customer = Customer.from_dict(
+            self.data, fields=["person.name", "addresses.city"]
+        )
+        self.assertIsInstance(customer.person, Person)
+        self.assertEqual(customer.person.__dict__, {"name": "John Doe"})
+        self.assertEqual(
+            [address.__dict__ for address in customer.addresses],
+            [{"city": "Anytown"}, {"city": "Othertown"}],
+        )
+
+    def test_whole_field_wins_over_paths(self):
+        customer = Customer.from_dict(self.data, fields=["person", "person.name"])
+        self.assertEqual(customer.person.age, 30)
+
+    def test_dict_of_models(self):
+        data = {
+            "owners": {"jd": {"name": "John Doe", "age": 30, "phone_numbers": []}},
+            "teams": {"core": [{"name": "Jane", "age": 41, "phone_numbers": []}]},
+        }
+        directory = Directory.from_dict(data, fields=["teams.name", "name"])
+        self.assertEqual(directory.teams["core"][0].__dict__, {"name": "Jane"})
+        self.assertEqual(directory.name, "default")
+
+    def test_validation_of_kept_fields_only(self):
+        self.data["person"]["age"] = 200
+        self.data["addresses"][0]["zip_code"] = "bad"
+        customer = Customer.from_dict(self.data, fields=["person.name"])
+        self.assertEqual(customer.person.name, "John Doe")
+        with self.assertRaises(ValueError):
+            Customer.from_dict(self.data, fields=["person.age"])
+        with self.assertRaises(ValueError):
+            Customer.from_dict(self.data, fields=["addresses"])
+        customer = Customer.from_dict(
+            self.data, validate=False, fields=["person.age", "addresses"]
+        )
+        self.assertEqual(customer.person.age, 200)
+
+    def test_missing_kept_field(self):
+        del self.data["person"]["name"]
+        Customer.from_dict(self.data, fields=["person.age"])
+        with self.assertRaises(ValueError) as context:
+            Customer.from_dict(self.data, fields=["person.name"])
+        self.assertEqual(str(context.exception), "Missing required field 'name'")
+
+    def test_invalid_paths(self):
+        with self.assertRaises(ValueError):
+            Customer.from_dict(self.data, fields=["unknown"])
+        with self.assertRaises(ValueError):
+            Customer.from_dict(self.data, fields=["person.unknown"])
+        with self.assertRaises(ValueError):
+            Customer.from_dict(self.data, fields=["labels.tier"])
+
+    def test_projection_is_cached(self):
+        plan = Customer._get_plan()
+        self.assertIs(
+            plan.project(["labels", "person"]), plan.project(("person", "labels"))
+        )
+
+    def test_json_entry_points(self):
+        customer = Customer.from_dict(self.data)
+        jsonb_data = customer.to_jsonb()
+        self.assertEqual(
+            Customer.from_json(customer.to_json(), fields=["person.age"]).person.age,
+            30,
+        )
+        self.assertEqual(
+            Customer.from_jsonb(jsonb_data, fields=["labels"]).labels,
+            {"tier": "gold"},
+        )
+        customers = Customer.from_jsonb_many(
+            Customer.to_jsonb_many([customer, customer]), fields=["person.name"]
+        )
+        self.assertEqual([c.person.name for c in customers], ["John Doe"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
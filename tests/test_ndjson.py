@@ -0,0 +1,99 @@
+import gc
+import gzip
+import io
+import os
+import tempfile
+import unittest
+import warnings
+from tests.test_classes import Person
+from transmutate.ndjson import iter_jsonb, open_ndjson, write_jsonb
+
+
+class CountingWriter(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.write_calls = 0
+
+    def write(self, chunk):
+        self.write_calls += 1
+        return super().write(chunk)
+
+
+class TestNDJSON(unittest.TestCase):
+    def setUp(self):
+        self.people = [
+            Person(name=f"Person {n}", age=n, phone_numbers=[str(n)])
+            for n in range(100)
+        ]
+
+    def test_write_jsonb_text(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_jsonb(buffer, self.people[:2]), 2)
+        self.assertEqual(
+            buffer.getvalue(),
+            self.people[0].to_jsonb() + "\n" + self.people[1].to_jsonb() + "\n",
+        )
+
+    def test_write_jsonb_buffers_writes(self):
+        buffer = CountingWriter()
+        write_jsonb(buffer, self.people, buffer_size=1024)
+        self.assertGreater(buffer.write_calls, 1)
+        self.assertLess(buffer.write_calls, len(self.people))
+
+    def test_round_trip_binary(self):
+        buffer = io.BytesIO()
+        write_jsonb(buffer, iter(self.people))
+        buffer.seek(0)
+        decoded = list(iter_jsonb(io.BufferedReader(buffer), Person))
+        self.assertEqual(len(decoded), 100)
+        self.assertIsInstance(decoded[0], Person)
+        self.assertEqual(decoded[42].name, "Person 42")
+        self.assertEqual(decoded[42].phone_numbers, ["42"])
+
+    def test_iter_jsonb_is_lazy(self):
+        buffer = io.StringIO()
+        write_jsonb(buffer, self.people)
+        buffer.seek(0)
+        records = iter_jsonb(buffer, Person)
+        self.assertEqual(next(records).name, "Person 0")
+        self.assertEqual(buffer.tell(), len(self.people[0].to_jsonb()) + 1)
+
+    def test_iter_jsonb_skips_blank_lines(self):
+        buffer = io.StringIO(self.people[0].to_jsonb() + "\n\n")
+        self.assertEqual(len(list(iter_jsonb(buffer, Person))), 1)
+
+    def test_gzip_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.ndjson.gz")
+            write_jsonb(path, self.people)
+            with gzip.open(path, "rb") as file:
+                self.assertTrue(file.readline().startswith(b'{"name":"Person 0"'))
+            self.assertEqual(len(list(iter_jsonb(path, Person))), 100)
+
+            # Compression is detected from the content, not only the extension
+            renamed = os.path.join(directory, "people.ndjson")
+            os.rename(path, renamed)
+            self.assertEqual(len(list(iter_jsonb(renamed, Person))), 100)
+            with open(renamed, "rb") as file:
+                self.assertEqual(len(list(iter_jsonb(file, Person))), 100)
+                self.assertFalse(file.closed)
+
+    def test_sniffed_gzip_files_are_closed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.ndjson")
+            with gzip.open(path, "wb") as file:
+                write_jsonb(file, self.people)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", ResourceWarning)
+                with open_ndjson(path) as file:
+                    self.assertEqual(file.readline()[:1], b"{")
+                with open(path, "rb") as raw:
+                    self.assertEqual(len(list(iter_jsonb(raw, Person))), 100)
+                    self.assertFalse(raw.closed)
+                del file
+                gc.collect()
+            self.assertEqual(caught, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from tests.test_classes import Address, Person, make_people
+from transmutate.base_model import BaseModel
+from transmutate.parallel import (
+    ParallelConverter,
+    Throughput,
+    decode_many,
+    encode_many,
+)
+
+
+class Account(BaseModel, track_changes=True):
+    owner: str
+    balance: int
+    tags: List[str]
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.people = make_people(250)
+        self.expected = [person.to_jsonb_bytes() for person in self.people]
+
+    def test_encode_many_in_process(self):
+        self.assertEqual(
+            encode_many(self.people, processes=1, chunk_size=7), self.expected
+        )
+
+    def test_encode_decode_process_pool(self):
+        encoded = encode_many(self.people, processes=2, chunk_size=30)
+        self.assertEqual(encoded, self.expected)
+        decoded = decode_many(Person, encoded, processes=2, chunk_size=30)
+        self.assertEqual(
+            [person.name for person in decoded], [p.name for p in self.people]
+        )
+        self.assertIsInstance(decoded[0], Person)
+
+    def test_proto_payload(self):
+        encoded = encode_many(self.people, payload="proto", processes=1)
+        self.assertEqual(encoded[3], self.people[3].to_proto_bytes())
+        decoded = decode_many(Person, encoded, payload="proto", processes=1)
+        self.assertEqual(decoded[3].age, 3)
+
+    def test_tracked_models(self):
+        accounts = [
+            Account(owner=f"Owner {index}", balance=index, tags=["a"])
+            for index in range(20)
+        ]
+        for account in accounts:
+            # Caches outputs and a JSON backend in the tracking state
+            account.mark_clean()
+            account.to_jsonb_bytes()
+            account.balance += 1
+        for payload in ("jsonb", "proto"):
+            expected = [
+                (
+                    account.to_proto_bytes()
+                    if payload == "proto"
+                    else account.to_jsonb_bytes()
+                )
+                for account in accounts
+            ]
+            self.assertEqual(
+                encode_many(accounts, payload, processes=2, chunk_size=6), expected
+            )
+        self.assertEqual(accounts[3].changes(), {"balance": 4})
+
+    def test_convert(self):
+        with ParallelConverter(processes=2, chunk_size=40) as converter:
+            converted = list(converter.convert(Person, self.expected, "jsonb", "proto"))
+        self.assertEqual(converted, [person.to_proto_bytes() for person in self.people])
+        self.assertEqual(converter.throughput.records, 250)
+
+    def test_bounded_window(self):
+        consumed = []
+
+        def models():
+            for index, person in enumerate(self.people):
+                consumed.append(index)
+                yield person
+
+        with ThreadPoolExecutor(2) as executor:
+            converter = ParallelConverter(
+                processes=2, chunk_size=10, window=3, executor=executor
+            )
+            iterator = converter.encode(models())
+            next(iterator)
+            # The first result is taken once the window is full
+            self.assertEqual(len(consumed), 30)
+            self.assertEqual(list(iterator), self.expected[1:])
+
+    def test_memoryview_payloads(self):
+        data = b"".join(self.expected[:3])
+        views = []
+        offset = 0
+        for payload in self.expected[:3]:
+            views.append(memoryview(data)[offset : offset + len(payload)])
+            offset += len(payload)
+        decoded = decode_many(Person, views, processes=2, chunk_size=1)
+        self.assertEqual(decoded[2].name, "Person 2")
+
+    def test_throughput(self):
+        with ParallelConverter(processes=1, chunk_size=100) as converter:
+            list(converter.decode(Person, self.expected))
+        throughput = converter.throughput
+        self.assertEqual(throughput.records, 250)
+        self.assertEqual(throughput.bytes, sum(map(len, self.expected)))
+        self.assertGreater(throughput.records_per_sec, 0)
+        self.assertIn("250 records", str(throughput))
+        self.assertEqual(Throughput().records_per_sec, 0.0)
+
+    def test_errors_propagate(self):
+        payloads = self.expected[:5] + [b'{"name": "Broken"}']
+        with self.assertRaises(ValueError):
+            decode_many(Person, payloads, processes=2, chunk_size=2)
+
+    def test_validation(self):
+        invalid = Address(street="1 Main St", city="X", zip_code="bad").to_jsonb()
+        with self.assertRaises(ValueError):
+            decode_many(Address, [invalid], processes=1)
+        address = decode_many(Address, [invalid], validate=False, processes=1)[0]
+        self.assertEqual(address.zip_code, "bad")
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            ParallelConverter(chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
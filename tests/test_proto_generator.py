@@ -1,9 +1,11 @@
 import unittest
 import os
+import tempfile
 from transmutate import Service, RpcType
 from transmutate import ProtoGenerator
 from transmutate import BaseModel
 from typing import List
+from tests.test_classes import Address, Customer, Person
 
 
 class TestMessage(BaseModel):
@@ -111,6 +113,105 @@ message AnotherMessage {
             self.assertEqual(content.strip(), expected_content.strip())
         os.remove(self.generator.proto_file_path)
 
+    def test_generate_messages_without_instances(self):
+        generator = ProtoGenerator(
+            service_name="CustomerService",
+            services=[
+                Service(
+                    name="CustomerService",
+                    types=[RpcType.UNARY],
+                    method_names=["GetCustomer"],
+                    request_dataclass=Person,
+                    response_dataclass=Customer,
+                ),
+                Service(
+                    name="CustomerService",
+                    types=[RpcType.UNARY],
+                    method_names=["GetAddress"],
+                    request_dataclass=Person,
+                    response_dataclass=Address,
+                ),
+            ],
+        )
+        messages_content = generator._generate_messages()
+        self.assertEqual(messages_content.count("message Person {"), 1)
+        self.assertEqual(messages_content.count("message Address {"), 1)
+        self.assertLess(
+            messages_content.index("message Address {"),
+            messages_content.index("message Customer {"),
+        )
+
+
+class TestProtoGeneratorBuild(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+
+    def make_generators(self, response_dataclass=AnotherMessage):
+        return [
+            ProtoGenerator(
+                service_name=service_name,
+                services=[
+                    Service(
+                        name=service_name,
+                        types=[RpcType.UNARY],
+                        method_names=["Get"],
+                        request_dataclass=request_dataclass,
+                        response_dataclass=response_dataclass,
+                    )
+                ],
+                output_dir=self.output_dir.name,
+            )
+            for service_name, request_dataclass in (
+                ("PersonService", Person),
+                ("CustomerService", Customer),
+            )
+        ]
+
+    def test_build_writes_and_skips(self):
+        generators = self.make_generators()
+        report = ProtoGenerator.build(generators, processes=1)
+        self.assertEqual(
+            report.written, [generator.proto_file_path for generator in generators]
+        )
+        self.assertEqual(report.skipped, [])
+        for generator in generators:
+            with open(generator.proto_file_path) as proto_file:
+                self.assertEqual(proto_file.read(), generator.generate_proto_content())
+        self.assertTrue(
+            os.path.exists(os.path.join(self.output_dir.name, ".proto_manifest.json"))
+        )
+
+        report = ProtoGenerator.build(self.make_generators(), processes=1)
+        self.assertEqual(report.written, [])
+        self.assertEqual(len(report.skipped), 2)
+
+    def test_build_rewrites_changed_files(self):
+        ProtoGenerator.build(self.make_generators(), processes=1)
+
+        class ChangedMessage(BaseModel):
+            status: str
+
+        generators = self.make_generators(response_dataclass=ChangedMessage)
+        generators[1].services[0].response_dataclass = AnotherMessage
+        report = ProtoGenerator.build(generators, processes=1)
+        self.assertEqual(report.written, [generators[0].proto_file_path])
+        self.assertEqual(report.skipped, [generators[1].proto_file_path])
+
+    def test_build_rewrites_deleted_files(self):
+        generators = self.make_generators()
+        ProtoGenerator.build(generators, processes=1)
+        os.remove(generators[0].proto_file_path)
+        report = ProtoGenerator.build(generators, processes=1)
+        self.assertEqual(report.written, [generators[0].proto_file_path])
+
+    def test_build_in_process_pool(self):
+        generators = self.make_generators()
+        report = ProtoGenerator.build(generators, processes=2)
+        self.assertEqual(len(report.written), 2)
+        with open(generators[1].proto_file_path) as proto_file:
+            self.assertIn("message Customer {", proto_file.read())
+
 
 if __name__ == "__main__":
     unittest.main()
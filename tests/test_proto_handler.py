@@ -1,6 +1,14 @@
 import unittest
-from tests.test_classes import Person, Address
-from transmutate.proto_handler import ProtoHandler
+from typing import List, Optional
+from tests.test_classes import Person, Address, Customer, Directory
+from transmutate.base_model import BaseModel
+from transmutate.proto_handler import ProtoHandler, collect_messages
+
+
+class TreeNode(BaseModel):
+    name: str
+    children: List["TreeNode"]
+    parent: Optional["TreeNode"] = None
 
 
 class TestProtoHandler(unittest.TestCase):
@@ -47,6 +55,98 @@ class TestProtoHandler(unittest.TestCase):
 
         self.assertEqual(proto_content.strip(), expected_address_proto.strip())
 
+    def test_generate_proto_nested_messages(self):
+        customer = Customer(person=self.person, addresses=[], labels={})
+        proto_content = ProtoHandler(customer).generate_proto()
+
+        expected_customer_proto = """message Person {
+  string name = 1;
+  int32 age = 2;
+  string email = 3;
+  repeated string phone_numbers = 4;
+}
+message Address {
+  string street = 1;
+  string city = 2;
+  string zip_code = 3;
+}
+message Customer {
+  Person person = 1;
+  repeated Address addresses = 2;
+  map<string, string> labels = 3;
+  Address billing_address = 4;
+}"""
+
+        self.assertEqual(proto_content.strip(), expected_customer_proto.strip())
+
+    def test_generate_proto_from_class(self):
+        self.assertEqual(
+            ProtoHandler(Customer).generate_proto(),
+            ProtoHandler(
+                Customer(person=self.person, addresses=[], labels={})
+            ).generate_proto(),
+        )
+
+
+class TestProtoSchema(unittest.TestCase):
+    def test_proto_schema_without_instance(self):
+        # Customer has required fields, so it cannot be built without arguments
+        with self.assertRaises(ValueError):
+            Customer.from_dict({})
+        schema = Customer.proto_schema()
+        self.assertEqual(schema, ProtoHandler(Customer).generate_proto())
+        self.assertTrue(schema.startswith("message Person {"))
+        self.assertTrue(schema.endswith("Address billing_address = 4;\n}"))
+
+    def test_proto_schema_is_cached(self):
+        schema = Customer.proto_schema()
+        self.assertIs(Customer.proto_schema(), schema)
+        self.assertEqual(schema.count("message Address {"), 1)
+
+    def test_nested_repeated_fields_raise(self):
+        # Directory.teams is a map of lists, which proto3 cannot express
+        with self.assertRaisesRegex(TypeError, "Directory.teams"):
+            Directory.proto_schema()
+
+        class Grid(BaseModel):
+            rows: List[List[int]]
+
+        with self.assertRaises(TypeError):
+            Grid.proto_schema()
+
+    def test_proto_schema_invalidated_on_change(self):
+        class Temporary(BaseModel):
+            name: str
+
+        self.assertNotIn("int32 size", Temporary.proto_schema())
+        Temporary.__annotations__ = {"name": str, "size": int}
+        self.assertIn("int32 size = 2;", Temporary.proto_schema())
+
+    def test_plan_invalidated_with_schema(self):
+        class Temporary(BaseModel):
+            name: str
+
+        self.assertEqual(Temporary(name="a").to_proto_bytes(), b"\x0a\x01a")
+        Temporary.__annotations__ = {"size": int, "name": str}
+        self.assertIn("string name = 2;", Temporary.proto_schema())
+        self.assertEqual(Temporary(name="a").to_proto_bytes(), b"\x12\x01a")
+
+    def test_recursive_messages(self):
+        self.assertEqual(
+            TreeNode.proto_schema(),
+            "message TreeNode {\n"
+            "  string name = 1;\n"
+            "  repeated TreeNode children = 2;\n"
+            "  TreeNode parent = 3;\n"
+            "}",
+        )
+
+    def test_collect_messages_dependency_order(self):
+        self.assertEqual(
+            [name for name, _ in collect_messages(Customer)],
+            ["Person", "Address", "Customer"],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
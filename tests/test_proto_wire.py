@@ -0,0 +1,164 @@
+import unittest
+from typing import Dict, List, Optional, Union
+from tests.test_classes import Person, Address, Customer, Directory
+from transmutate import BaseModel
+from transmutate.proto_wire import (
+    encode_varint,
+    read_varint,
+)
+
+
+class Metrics(BaseModel):
+    scores: List[int]
+    ratio: float
+    flags: List[bool]
+    counts: Dict[str, int]
+    offset: int
+    retries: Optional[int] = None
+
+
+class Owners(BaseModel):
+    owners: Dict[str, Person]
+    name: str = "default"
+
+
+class Grid(BaseModel):
+    rows: List[List[int]]
+
+
+class Mixed(BaseModel):
+    value: Union[int, str]
+
+
+class TestProtoWire(unittest.TestCase):
+    def setUp(self):
+        self.person = Person(
+            name="John Doe",
+            age=30,
+            email="john.doe@example.com",
+            phone_numbers=["123-456-7890"],
+        )
+        self.address = Address(
+            street="123 Main St",
+            city="Anytown",
+            zip_code="12345",
+        )
+
+    def test_varint(self):
+        self.assertEqual(encode_varint(1), b"\x01")
+        self.assertEqual(encode_varint(150), b"\x96\x01")
+        self.assertEqual(encode_varint(-1), b"\xff" * 9 + b"\x01")
+        self.assertEqual(read_varint(b"\x00\x96\x01", 1), (150, 3))
+        with self.assertRaises(ValueError):
+            read_varint(b"\x96", 0)
+
+    def test_map_of_models_round_trip(self):
+        owners = Owners(owners={"lead": self.person}, name="team")
+        decoded = Owners.from_proto_bytes(owners.to_proto_bytes())
+        self.assertEqual(decoded.name, "team")
+        self.assertEqual(decoded.owners["lead"].name, "John Doe")
+        self.assertEqual(decoded.owners["lead"].phone_numbers, ["123-456-7890"])
+
+    def test_unencodable_fields_raise(self):
+        directory = Directory(owners={"lead": self.person}, teams={"t": [self.person]})
+        with self.assertRaisesRegex(TypeError, "teams"):
+            directory.to_proto_bytes()
+        with self.assertRaises(TypeError):
+            Directory.from_proto_bytes(b"")
+        with self.assertRaisesRegex(TypeError, "rows"):
+            Grid(rows=[[1, 2], [3]]).to_proto_bytes()
+        with self.assertRaisesRegex(TypeError, "value"):
+            Mixed(value=1).to_proto_bytes()
+
+    def test_to_proto_bytes_address(self):
+        self.assertEqual(
+            self.address.to_proto_bytes(),
+            b"\x0a\x0b123 Main St\x12\x07Anytown\x1a\x0512345",
+        )
+
+    def test_to_proto_bytes_person(self):
+        self.assertEqual(
+            self.person.to_proto_bytes(),
+            b"\x0a\x08John Doe"
+            b"\x10\x1e"
+            b"\x1a\x14john.doe@example.com"
+            b"\x22\x0c123-456-7890",
+        )
+
+    def test_round_trip_nested(self):
+        customer = Customer(
+            person=self.person,
+            addresses=[self.address, self.address],
+            labels={"tier": "gold"},
+        )
+        decoded = Customer.from_proto_bytes(customer.to_proto_bytes())
+        self.assertIsInstance(decoded.person, Person)
+        self.assertEqual(decoded.person.email, "john.doe@example.com")
+        self.assertEqual(len(decoded.addresses), 2)
+        self.assertIsInstance(decoded.addresses[1], Address)
+        self.assertEqual(decoded.labels, {"tier": "gold"})
+        self.assertIsNone(decoded.billing_address)
+        self.assertIsInstance(Customer.from_proto(customer.to_proto_bytes()), Customer)
+
+    def test_packed_repeated_and_maps(self):
+        metrics = Metrics(
+            scores=[1, -2, 300],
+            ratio=0.5,
+            flags=[True, False],
+            counts={"a": 3},
+            offset=-7,
+            retries=0,
+        )
+        data = metrics.to_proto_bytes()
+        # Field 1, length-delimited, packed varints 1, -2 (10 bytes) and 300
+        self.assertTrue(data.startswith(b"\x0a\x0d\x01" + b"\xfe" + b"\xff" * 8))
+        decoded = Metrics.from_proto_bytes(data)
+        self.assertEqual(decoded.scores, [1, -2, 300])
+        self.assertEqual(decoded.ratio, 0.5)
+        self.assertEqual(decoded.flags, [True, False])
+        self.assertEqual(decoded.counts, {"a": 3})
+        self.assertEqual(decoded.offset, -7)
+        self.assertEqual(decoded.retries, 0)
+
+    def test_floats_keep_double_precision(self):
+        metrics = Metrics(scores=[], ratio=1 / 3, flags=[], counts={}, offset=0)
+        self.assertIn("double ratio = 2;", Metrics.proto_schema())
+        data = metrics.to_proto_bytes()
+        # Field 2, 64-bit
+        self.assertEqual(data[:1], b"\x11")
+        self.assertEqual(Metrics.from_proto_bytes(data).ratio, 0.3333333333333333)
+
+    def test_unpacked_repeated_is_accepted(self):
+        decoded = Metrics.from_proto_bytes(b"\x08\x01\x08\x02")
+        self.assertEqual(decoded.scores, [1, 2])
+
+    def test_zero_values(self):
+        metrics = Metrics(scores=[], ratio=0.0, flags=[], counts={}, offset=0)
+        self.assertEqual(metrics.to_proto_bytes(), b"")
+        decoded = Metrics.from_proto_bytes(b"")
+        self.assertEqual(decoded.scores, [])
+        self.assertEqual(decoded.offset, 0)
+        self.assertEqual(decoded.counts, {})
+        self.assertIsNone(decoded.retries)
+
+    def test_unknown_fields_are_skipped(self):
+        data = b"\x78\x05" + self.address.to_proto_bytes() + b"\x7d\x00\x00\x00\x00"
+        self.assertEqual(Address.from_proto_bytes(data).city, "Anytown")
+
+    def test_truncated_message(self):
+        with self.assertRaises(ValueError):
+            Address.from_proto_bytes(self.address.to_proto_bytes()[:-2])
+
+    def test_from_proto_bytes_validates(self):
+        data = Address(street="s", city="c", zip_code="bad").to_proto_bytes()
+        with self.assertRaises(ValueError):
+            Address.from_proto_bytes(data)
+        self.assertEqual(Address.from_proto_bytes(data, validate=False).zip_code, "bad")
+
+    def test_memoryview_input(self):
+        data = bytearray(self.person.to_proto_bytes())
+        self.assertEqual(Person.from_proto_bytes(memoryview(data)).name, "John Doe")
+
+
+if __name__ == "__main__":
+    unittest.main()
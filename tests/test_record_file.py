@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from tests.test_classes import Address, Person, make_people
+from transmutate.framing import FrameDecoder
+from transmutate.record_file import (
+    RecordFileReader,
+    RecordFileWriter,
+    schema_fingerprint,
+    write_records,
+)
+
+
+class TestRecordFile(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "people.tmrf")
+        self.people = make_people(120)
+
+    def test_jsonb_random_access(self):
+        self.assertEqual(write_records(self.path, Person, self.people), 120)
+        with RecordFileReader(self.path, Person) as reader:
+            self.assertEqual(len(reader), 120)
+            self.assertEqual(reader[7].name, "Person 7")
+            self.assertEqual(reader[-1].name, "Person 119")
+            self.assertEqual([p.age for p in reader[10:13]], [10, 11, 12])
+            self.assertEqual(
+                bytes(reader.record_bytes(5)), self.people[5].to_jsonb_bytes()
+            )
+            with self.assertRaises(IndexError):
+                reader[120]
+
+    def test_proto_payload(self):
+        write_records(self.path, Person, self.people, payload="proto")
+        with RecordFileReader(self.path, Person) as reader:
+            self.assertEqual(reader.payload, "proto")
+            self.assertEqual(
+                bytes(reader.record_bytes(42)), self.people[42].to_proto_bytes()
+            )
+            self.assertEqual(
+                [p.name for p in reader.iter_range(118)], ["Person 118", "Person 119"]
+            )
+
+    def test_range_bytes_are_frames(self):
+        write_records(self.path, Person, self.people)
+        with RecordFileReader(self.path, Person) as reader:
+            frames = reader.range_bytes(100, 120)
+            decoded = FrameDecoder().feed(frames)
+            self.assertEqual(
+                [bytes(frame) for frame in decoded],
+                [person.to_jsonb_bytes() for person in self.people[100:]],
+            )
+            self.assertEqual(len(reader.range_bytes(5, 5)), 0)
+            del frames, decoded
+
+    def test_small_buffer_and_append(self):
+        with RecordFileWriter(self.path, Person, buffer_size=64) as writer:
+            writer.write_many(self.people[:50])
+        with RecordFileWriter(self.path, Person, append=True) as writer:
+            writer.write(self.people[50])
+            self.assertEqual(len(writer), 51)
+        with RecordFileReader(self.path, Person) as reader:
+            self.assertEqual(
+                [p.name for p in reader], [p.name for p in self.people[:51]]
+            )
+
+    def test_schema_mismatch(self):
+        write_records(self.path, Person, self.people)
+        self.assertNotEqual(schema_fingerprint(Person), schema_fingerprint(Address))
+        with self.assertRaises(ValueError):
+            RecordFileReader(self.path, Address)
+        with self.assertRaises(ValueError):
+            RecordFileWriter(self.path, Address, append=True)
+        with self.assertRaises(ValueError):
+            RecordFileWriter(self.path, Person, payload="proto", append=True)
+
+    def test_unclosed_file(self):
+        writer = RecordFileWriter(self.path, Person)
+        writer.write_many(self.people)
+        writer.flush()
+        with self.assertRaises(ValueError):
+            RecordFileReader(self.path, Person)
+        writer.close()
+        with RecordFileReader(self.path, Person) as reader:
+            self.assertEqual(len(reader), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from typing import List, Optional
+from transmutate.base_model import BaseModel
+from transmutate.record_file import RecordFileReader, write_records
+from transmutate.schema_registry import Schema, SchemaRegistry, schema_fingerprint
+
+
+def contact_v1():
+    class Contact(BaseModel):
+        name: str
+        age: int
+        fax: str
+        tags: List[str]
+
+    return Contact
+
+
+class Contact(BaseModel):
+    full_name: str
+    age: int
+    tags: List[str]
+    country: str = "NL"
+    email: Optional[str] = None
+
+    def validation_age(self):
+        if self.age < 0:
+            raise ValueError("Age cannot be negative.")
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    def setUp(self):
+        self.v1 = contact_v1()
+        self.old = self.v1(name="Ann", age=30, fax="123", tags=["a", "b"])
+        self.registry = SchemaRegistry()
+        self.writer = self.registry.add(self.v1.proto_schema())
+        self.registry.register(Contact, renames={"full_name": "name"})
+
+    def test_schema_from_definition(self):
+        schema = Schema.from_model(self.v1)
+        self.assertEqual(schema.name, "Contact")
+        self.assertEqual(schema.fingerprint, schema_fingerprint(self.v1))
+        self.assertEqual(
+            [(field.name, field.number, field.type) for field in schema.fields],
+            [
+                ("name", 1, "string"),
+                ("age", 2, "int32"),
+                ("fax", 3, "string"),
+                ("tags", 4, "repeated string"),
+            ],
+        )
+        self.assertEqual(len(self.registry.versions("Contact")), 2)
+        self.assertIs(self.registry.get(schema.fingerprint.hex()), self.writer)
+
+    def test_jsonb_translation(self):
+        contact = self.registry.from_jsonb(
+            Contact, self.old.to_jsonb(), self.writer.fingerprint
+        )
+        self.assertIsInstance(contact, Contact)
+        self.assertEqual(contact.full_name, "Ann")
+        self.assertEqual(contact.tags, ["a", "b"])
+        self.assertEqual(contact.country, "NL")
+        self.assertIsNone(contact.email)
+        self.assertFalse(hasattr(contact, "fax"))
+
+    def test_proto_translation_uses_writer_numbers(self):
+        contact = self.registry.from_proto_bytes(
+            Contact, self.old.to_proto_bytes(), self.writer
+        )
+        self.assertEqual(
+            (contact.full_name, contact.age, contact.tags, contact.country),
+            ("Ann", 30, ["a", "b"], "NL"),
+        )
+
+    def test_plans_are_cached_and_validate(self):
+        plan = self.registry.translation(self.writer, Contact)
+        self.assertIs(self.registry.translation(self.writer.fingerprint, Contact), plan)
+        self.assertEqual(
+            plan.mapping, {"name": "full_name", "age": "age", "tags": "tags"}
+        )
+        with self.assertRaises(ValueError):
+            self.registry.from_dict(
+                Contact, {"name": "Ann", "age": -1, "tags": []}, self.writer
+            )
+
+    def test_incompatible_versions(self):
+        with self.assertRaises(ValueError):
+            self.registry.translation(b"\0" * 32, Contact)
+        registry = SchemaRegistry()
+        registry.add(self.v1.proto_schema())
+        # full_name has no counterpart without the rename
+        with self.assertRaises(ValueError):
+            registry.translation(self.writer.fingerprint, Contact)
+
+        class Renamed(BaseModel):
+            name: int
+
+        with self.assertRaises(ValueError):
+            registry.translation(self.writer.fingerprint, Renamed)
+
+    def test_record_file_of_older_version(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "contacts.tmrf")
+            write_records(path, self.v1, [self.old] * 3, payload="proto")
+            with self.assertRaises(ValueError):
+                RecordFileReader(path, Contact)
+            with RecordFileReader(path, Contact, registry=self.registry) as reader:
+                self.assertEqual(reader[2].full_name, "Ann")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import copy
+import pickle
+import unittest
+from typing import List, Optional
+from tests.test_classes import Address
+from transmutate.base_model import BaseModel
+from transmutate.tracking import ChangeTracking
+
+
+class Account(BaseModel, track_changes=True):
+    owner: str
+    balance: int
+    tags: List[str]
+    address: Optional[Address] = None
+
+    def validation_balance(self):
+        if self.balance < 0:
+            raise ValueError("Balance must not be negative.")
+
+
+class SlottedAccount(BaseModel, slots=True, track_changes=True):
+    owner: str
+    balance: int = 0
+
+
+class TestChangeTracking(unittest.TestCase):
+    def setUp(self):
+        self.account = Account.from_dict(
+            {
+                "owner": "Jane",
+                "balance": 10,
+                "tags": ["vip"],
+                "address": {"street": "1 Main St", "city": "X", "zip_code": "12345"},
+            }
+        )
+
+    def test_mixin_inserted(self):
+        self.assertTrue(issubclass(Account, ChangeTracking))
+        self.assertFalse(issubclass(Address, ChangeTracking))
+        self.assertNotIn("_transmutate_state", self.account.to_dict())
+
+    def test_decoded_models_start_clean(self):
+        self.assertFalse(self.account.is_dirty())
+        self.assertEqual(self.account.changes(), {})
+        self.assertEqual(self.account.json_patch(), [])
+
+    def test_constructed_models_start_dirty(self):
+        account = Account(owner="Jane", balance=1, tags=[])
+        self.assertTrue(account.is_dirty())
+        self.assertEqual(
+            account.json_patch()[0], {"op": "add", "path": "/owner", "value": "Jane"}
+        )
+
+    def test_cached_output_while_clean(self):
+        jsonb_data = self.account.to_jsonb()
+        self.assertIs(self.account.to_jsonb(), jsonb_data)
+        proto_data = self.account.to_proto_bytes()
+        self.assertIs(self.account.to_proto_bytes(), proto_data)
+        self.assertEqual(Account.from_proto_bytes(proto_data).to_jsonb(), jsonb_data)
+
+    def test_assignment_invalidates_output(self):
+        jsonb_data = self.account.to_jsonb()
+        proto_data = self.account.to_proto_bytes()
+        self.account.balance = 20
+        self.assertEqual(Account.from_jsonb(self.account.to_jsonb()).balance, 20)
+        self.assertNotEqual(self.account.to_jsonb(), jsonb_data)
+        self.assertNotEqual(self.account.to_proto_bytes(), proto_data)
+
+    def test_only_changed_fields_are_reencoded(self):
+        self.account.to_jsonb()
+        encoded_address = self.account._change_state().encoded["address"]
+        self.account.owner = "John"
+        self.assertEqual(self.account._change_state().stale, {"owner"})
+        encoded = self.account._get_plan().encode(self.account)
+        self.assertEqual(encoded["owner"], "John")
+        self.assertIs(encoded["address"], encoded_address)
+
+    def test_encode_returns_new_dict(self):
+        plan = Account._get_plan()
+        encoded = plan.encode(self.account)
+        encoded["owner"] = "changed"
+        self.assertEqual(plan.encode(self.account)["owner"], "Jane")
+
+    def test_changes_and_patch(self):
+        self.account.balance = 15
+        self.account.address = Address(street="2 Side St", city="Y", zip_code="54321")
+        del self.account.tags
+        self.assertTrue(self.account.is_dirty())
+        self.assertEqual(
+            self.account.changes(),
+            {
+                "balance": 15,
+                "address": {"street": "2 Side St", "city": "Y", "zip_code": "54321"},
+            },
+        )
+        self.assertEqual(
+            self.account.json_patch(),
+            [
+                {"op": "replace", "path": "/balance", "value": 15},
+                {
+                    "op": "replace",
+                    "path": "/address",
+                    "value": {"street": "2 Side St", "city": "Y", "zip_code": "54321"},
+                },
+                {"op": "remove", "path": "/tags"},
+            ],
+        )
+        self.account.mark_clean()
+        self.assertFalse(self.account.is_dirty())
+        self.assertEqual(self.account.json_patch(), [])
+
+    def test_apply_json_patch(self):
+        replica = Account.from_jsonb(self.account.to_jsonb())
+        self.account.balance = 15
+        self.account.address = Address(street="2 Side St", city="Y", zip_code="54321")
+        replica.apply_json_patch(self.account.json_patch())
+        self.assertIsInstance(replica.address, Address)
+        self.assertEqual(replica.to_jsonb(), self.account.to_jsonb())
+        with self.assertRaises(ValueError):
+            replica.apply_json_patch(
+                [{"op": "replace", "path": "/balance", "value": -1}]
+            )
+        with self.assertRaises(ValueError):
+            replica.apply_json_patch([{"op": "move", "path": "/balance"}])
+
+    def test_mark_changed_after_in_place_mutation(self):
+        jsonb_data = self.account.to_jsonb()
+        self.account.tags.append("new")
+        self.assertIs(self.account.to_jsonb(), jsonb_data)  # Not seen
+        self.account.mark_changed("tags")
+        self.assertEqual(self.account.changes(), {"tags": ["vip", "new"]})
+        self.assertIn('"new"', self.account.to_jsonb())
+
+    def test_slotted(self):
+        account = SlottedAccount.from_dict({"owner": "Jane"})
+        self.assertFalse(hasattr(account, "__dict__"))
+        self.assertEqual(account.balance, 0)
+        jsonb_data = account.to_jsonb()
+        self.assertIs(account.to_jsonb(), jsonb_data)
+        account.balance = 5
+        self.assertEqual(account.changes(), {"balance": 5})
+        self.assertEqual(SlottedAccount.from_jsonb(account.to_jsonb()).balance, 5)
+
+    def test_copies_get_their_own_state(self):
+        jsonb_data = self.account.to_jsonb()
+        self.account.to_proto_bytes()
+        for other in (
+            copy.copy(self.account),
+            copy.deepcopy(self.account),
+            pickle.loads(pickle.dumps(self.account)),
+        ):
+            self.assertFalse(other.is_dirty())
+            self.assertEqual(other.to_jsonb(), jsonb_data)
+            other.owner = "Ann"
+            self.assertIn('"Ann"', other.to_jsonb())
+            self.assertEqual(other.changes(), {"owner": "Ann"})
+            self.assertIs(self.account.to_jsonb(), jsonb_data)
+            self.assertFalse(self.account.is_dirty())
+
+        account = SlottedAccount.from_dict({"owner": "Jane"})
+        account.to_jsonb()
+        other = pickle.loads(pickle.dumps(account))
+        other.balance = 5
+        self.assertEqual(other.to_jsonb(), '{"owner":"Jane","balance":5}')
+        self.assertEqual(account.balance, 0)
+
+    def test_subclass_keeps_tracking(self):
+        class SavingsAccount(Account):
+            rate: float = 0.01
+
+        account = SavingsAccount.from_dict({"owner": "Jane", "balance": 1, "tags": []})
+        account.rate = 0.02
+        self.assertEqual(account.changes(), {"rate": 0.02})
+
+    def test_custom_setattr_rejected(self):
+        with self.assertRaises(TypeError):
+
+            class Broken(BaseModel, track_changes=True):
+                value: int
+
+                def __setattr__(self, name, value):
+                    object.__setattr__(self, name, value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum, IntEnum
+from typing import Dict, FrozenSet, List, Optional, Set
+from uuid import UUID
+from transmutate import JSONHandler, register_type
+from transmutate.base_model import BaseModel
+from transmutate.type_registry import get_type_codec
+
+
+class Color(Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Priority(IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+class Money:
+    def __init__(self, cents: int):
+        self.cents = cents
+
+    def __eq__(self, other):
+        return isinstance(other, Money) and other.cents == self.cents
+
+
+# Proto binary sends the encoded value as text, hence int()
+register_type(Money, lambda money: money.cents, lambda cents: Money(int(cents)))
+
+
+class Event(BaseModel):
+    id: UUID
+    created_at: datetime
+    day: date
+    starts: time
+    color: Color
+    priority: Priority
+    amount: Decimal
+    payload: bytes
+    tags: Set[str]
+    codes: FrozenSet[int]
+    history: List[datetime]
+    colors_by_name: Dict[str, Color]
+    price: Money
+    closed_at: Optional[datetime] = None
+
+
+class TestTypeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.event = Event(
+            id=UUID("12345678-1234-5678-1234-567812345678"),
+            created_at=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+            day=date(2024, 5, 1),
+            starts=time(9, 15),
+            color=Color.GREEN,
+            priority=Priority.HIGH,
+            amount=Decimal("12.30"),
+            payload=b"\x00\xffdata",
+            tags={"b", "a"},
+            codes=frozenset({3, 1}),
+            history=[datetime(2024, 1, 1)],
+            colors_by_name={"sky": Color.RED},
+            price=Money(250),
+        )
+
+    def test_encode(self):
+        data = self.event._get_plan().encode(self.event)
+        self.assertEqual(data["id"], "12345678-1234-5678-1234-567812345678")
+        self.assertEqual(data["created_at"], "2024-05-01T12:30:00+00:00")
+        self.assertEqual(data["day"], "2024-05-01")
+        self.assertEqual(data["starts"], "09:15:00")
+        self.assertEqual(data["color"], "green")
+        self.assertEqual(data["priority"], 2)
+        self.assertEqual(data["amount"], "12.30")
+        self.assertEqual(data["payload"], "AP9kYXRh")
+        self.assertEqual(data["tags"], ["a", "b"])
+        self.assertEqual(data["codes"], [1, 3])
+        self.assertEqual(data["history"], ["2024-01-01T00:00:00"])
+        self.assertEqual(data["colors_by_name"], {"sky": "red"})
+        self.assertEqual(data["price"], 250)
+
+    def test_round_trip(self):
+        for event in (
+            Event.from_jsonb(self.event.to_jsonb()),
+            Event.from_json(self.event.to_json()),
+            Event.from_proto_bytes(self.event.to_proto_bytes()),
+        ):
+            for name in Event._get_plan()._field_names:
+                self.assertEqual(getattr(event, name), getattr(self.event, name), name)
+            self.assertIsInstance(event.tags, set)
+            self.assertIsInstance(event.codes, frozenset)
+            self.assertIs(event.priority, Priority.HIGH)
+
+    def test_decode_accepts_instances(self):
+        event = Event.from_dict(self.event.to_dict())
+        self.assertIs(event.created_at, self.event.created_at)
+
+    def test_decode_utc_suffix_and_float_decimal(self):
+        data = self.event._get_plan().encode(self.event)
+        data["created_at"] = "2024-05-01T12:30:00Z"
+        data["amount"] = 0.1
+        event = Event.from_dict(data)
+        self.assertEqual(event.created_at, self.event.created_at)
+        self.assertEqual(event.amount, Decimal("0.1"))
+
+    def test_invalid_enum_value(self):
+        data = self.event._get_plan().encode(self.event)
+        data["color"] = "purple"
+        with self.assertRaises(ValueError):
+            Event.from_dict(data)
+
+    def test_generic_path(self):
+        self.assertEqual(
+            JSONHandler(None).serialize_obj(
+                {"when": date(2024, 1, 2), "ids": {2, 1}, "color": Color.RED}
+            ),
+            {"when": "2024-01-02", "ids": [1, 2], "color": "red"},
+        )
+
+    def test_codec_resolution(self):
+        self.assertIsNone(get_type_codec(int))
+        self.assertIsNone(get_type_codec(List[int]))
+        encode, decode = get_type_codec(Priority)
+        self.assertEqual(encode(Priority.HIGH), 2)
+        self.assertEqual(decode("2"), Priority.HIGH)  # Proto string payloads
+
+
+if __name__ == "__main__":
+    unittest.main()
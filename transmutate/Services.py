@@ -14,6 +14,30 @@ class RpcType(Enum):
     )
     BIDIRECTIONAL = "  rpc {method_name} (stream {request_message}) returns (stream {response_message});\n"
 
+    @property
+    def streams_requests(self) -> bool:
+        """Whether requests are sent as a stream of framed messages."""
+        return self in (RpcType.CLIENT_STREAMING, RpcType.BIDIRECTIONAL)
+
+    @property
+    def streams_responses(self) -> bool:
+        """Whether responses are sent as a stream of framed messages."""
+        return self in (RpcType.SERVER_STREAMING, RpcType.BIDIRECTIONAL)
+
+
+def get_message_definition(message_type: Type) -> str:
+    """
+    Returns the proto definition of a request/response class.
+
+    BaseModel subclasses provide a cached class-level schema, so no instance is
+    created and models with required fields are supported.
+    """
+    proto_schema = getattr(message_type, "proto_schema", None)
+    if proto_schema is not None:
+        return proto_schema()
+    # Other classes, e.g. Empty, only offer the instance method
+    return message_type().to_proto()
+
 
 # Service dataclass
 @dataclass
@@ -25,19 +49,15 @@ class Service:
     response_dataclass: Optional[Type] = None  # Optional dataclass for response
 
     def get_request_message(self) -> str:
-        """Generates the request message definition using to_proto."""
+        """Generates the request message definition from the class schema."""
         if self.request_dataclass:
-            # Create an instance of the request dataclass
-            request_instance = self.request_dataclass()
-            return request_instance.to_proto()
+            return get_message_definition(self.request_dataclass)
         return ""
 
     def get_response_message(self) -> str:
-        """Generates the response message definition using to_proto."""
+        """Generates the response message definition from the class schema."""
         if self.response_dataclass:
-            # Create an instance of the response dataclass
-            response_instance = self.response_dataclass()
-            return response_instance.to_proto()
+            return get_message_definition(self.response_dataclass)
         return ""
 
     def generate_service_definition(self) -> str:
@@ -1,16 +1,32 @@
-from .base_model import BaseModel
+from .base_model import BaseModel, ValidationError
 from .proto_handler import ProtoHandler
 from .json_handler import JSONHandler
 from .jsonb_handler import JSONBHandler
 from .Services import Service, RpcType
 from .proto_generator import ProtoGenerator
+from .ndjson import iter_jsonb, write_jsonb
+from .json_backends import JSONBackend, get_backend, register_backend, set_backend
+from .model_batch import ModelBatch
+from .type_registry import register_type, register_type_factory
+from . import instrumentation
 
 __all__ = [
     "BaseModel",
+    "ValidationError",
     "ProtoHandler",
     "JSONHandler",
     "JSONBHandler",
     "Service",
     "RpcType",
     "ProtoGenerator",
+    "iter_jsonb",
+    "write_jsonb",
+    "JSONBackend",
+    "get_backend",
+    "register_backend",
+    "set_backend",
+    "ModelBatch",
+    "register_type",
+    "register_type_factory",
+    "instrumentation",
 ]
@@ -0,0 +1,169 @@
+"""
+asyncio streaming of models over ``StreamReader``/``StreamWriter``.
+
+Two framings are supported:
+
+* ``"ndjson"``: one JSONB record per line, as written by ``write_jsonb``.
+* ``"length"``: every payload is preceded by its size as a varint, the
+  protobuf delimited format implemented by ``transmutate.framing``.
+  Payloads are JSONB or proto binary.
+"""
+
+import asyncio
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Type, Union
+
+from transmutate.base_model import BaseModel
+from transmutate.framing import (
+    DEFAULT_CHUNK_SIZE,
+    FrameDecoder,
+    decode_model,
+    encode_model,
+    write_frame,
+)
+
+FRAMINGS = ("ndjson", "length")
+PAYLOADS = ("jsonb", "proto")
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+def _check_format(framing: str, payload: str) -> None:
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unknown framing '{framing}', expected one of {FRAMINGS}")
+    if payload not in PAYLOADS:
+        raise ValueError(f"Unknown payload '{payload}', expected one of {PAYLOADS}")
+    if framing == "ndjson" and payload != "jsonb":
+        raise ValueError("NDJSON framing only supports JSONB payloads")
+
+
+async def _read_line(reader: asyncio.StreamReader) -> bytes:
+    # readline() gives up on lines longer than the stream limit
+    chunks = []
+    while True:
+        try:
+            chunks.append(await reader.readuntil(b"\n"))
+            return b"".join(chunks)
+        except asyncio.IncompleteReadError as error:
+            chunks.append(error.partial)  # Last line without a newline
+            return b"".join(chunks)
+        except asyncio.LimitOverrunError as error:
+            chunks.append(await reader.readexactly(error.consumed))
+
+
+async def iter_payloads(
+    reader: asyncio.StreamReader, framing: str = "ndjson"
+) -> AsyncIterator[bytes]:
+    """Yields the raw payloads of a stream without decoding them."""
+    if framing == "ndjson":
+        while True:
+            line = await _read_line(reader)
+            if not line:
+                return
+            if line.strip():
+                yield line
+    else:
+        # Frames are parsed from whole chunks, see framing.FrameDecoder
+        decoder = FrameDecoder()
+        while True:
+            chunk = await reader.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                decoder.close()
+                return
+            for frame in decoder.feed(chunk):
+                yield frame
+
+
+async def read_models(
+    reader: asyncio.StreamReader,
+    model_cls: Type[BaseModel],
+    framing: str = "ndjson",
+    payload: str = "jsonb",
+    validate: bool = True,
+    backend: Optional[str] = None,
+    executor=None,
+    offload_threshold: Optional[int] = None,
+) -> AsyncIterator[BaseModel]:
+    """
+    Decodes models from a stream as they arrive.
+
+    ``async for person in read_models(reader, Person): ...``
+
+    :param reader: asyncio StreamReader, or any object with the same methods.
+    :param model_cls: BaseModel subclass to build for every record.
+    :param framing: ``"ndjson"`` or ``"length"``.
+    :param payload: ``"jsonb"`` or, with length framing, ``"proto"``.
+    :param validate: Run the model validators, as in ``from_dict``.
+    :param backend: Name of the JSON backend, None for the default one.
+    :param executor: Executor used for offloaded payloads; None uses the loop's
+        default executor. A ProcessPoolExecutor needs ``model_cls`` to be
+        importable by its workers.
+    :param offload_threshold: Payloads of at least this many bytes are decoded
+        in the executor instead of blocking the event loop; None never offloads.
+    """
+    _check_format(framing, payload)
+    loop = asyncio.get_running_loop()
+    async for data in iter_payloads(reader, framing):
+        if offload_threshold is not None and len(data) >= offload_threshold:
+            # Copied out of the chunk so process pools can pickle it
+            yield await loop.run_in_executor(
+                executor,
+                partial(
+                    decode_model, model_cls, bytes(data), payload, validate, backend
+                ),
+            )
+        else:
+            yield decode_model(model_cls, data, payload, validate, backend)
+
+
+async def write_models(
+    writer: asyncio.StreamWriter,
+    models: Union[Iterable[BaseModel], AsyncIterable[BaseModel]],
+    framing: str = "ndjson",
+    payload: str = "jsonb",
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    backend: Optional[str] = None,
+) -> int:
+    """
+    Encodes models to a stream.
+
+    Encoded records are collected until ``buffer_size`` bytes are pending, then
+    written at once followed by ``await writer.drain()``, so a slow peer pauses
+    the producer instead of growing the transport buffer without bound.
+
+    :param writer: asyncio StreamWriter, or any object with ``write``/``drain``.
+    :param models: Iterable or async iterable of models.
+    :param framing: ``"ndjson"`` or ``"length"``.
+    :param payload: ``"jsonb"`` or, with length framing, ``"proto"``.
+    :return: The number of records written.
+    """
+    _check_format(framing, payload)
+    pending = bytearray()
+    count = 0
+
+    async def flush():
+        writer.write(bytes(pending))
+        pending.clear()
+        await writer.drain()
+
+    async def add(model):
+        data = encode_model(model, payload, backend)
+        if framing == "ndjson":
+            pending.extend(data)
+            pending.append(0x0A)
+        else:
+            write_frame(pending, data)
+        if len(pending) >= buffer_size:
+            await flush()
+
+    if hasattr(models, "__aiter__"):
+        async for model in models:
+            await add(model)
+            count += 1
+    else:
+        for model in models:
+            await add(model)
+            count += 1
+    if pending:
+        await flush()
+    return count
@@ -1,91 +1,363 @@
-from typing import Type
+from abc import ABCMeta
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import ClassVar, Iterable, List, Optional, Tuple, Type, Union
+from typing import get_origin
+import inspect
 import json
 
+from transmutate.json_handler import JSONHandler
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.tracking import ChangeTracking
+
+# False while skip_validations() is active, see BaseModel.__post_init__
+_validations_enabled = ContextVar("transmutate_validations_enabled", default=True)
+
+
+@contextmanager
+def skip_validations():
+    """Builds models, including dataclass models, without running their validators."""
+    token = _validations_enabled.set(False)
+    try:
+        yield
+    finally:
+        _validations_enabled.reset(token)
+
+
+class ValidationError(ValueError):
+    """Raised by ``run_validations(collect_errors=True)`` with every failure."""
+
+    def __init__(self, errors: List[Tuple[str, Exception]]):
+        self.errors = errors
+        super().__init__(
+            "; ".join(f"{field_name}: {error}" for field_name, error in errors)
+        )
+
+
+def _collect_validators(cls) -> Tuple[Tuple[str, object], ...]:
+    # Resolve the validation_<field> methods once per class, inherited fields first
+    field_names = {}
+    for klass in reversed(cls.__mro__):
+        field_names.update(klass.__dict__.get("__annotations__", {}))
+
+    validators = []
+    for field_name in field_names:
+        validation_method_name = f"validation_{field_name}"
+        validation_method = inspect.getattr_static(cls, validation_method_name, None)
+        if validation_method is None:
+            continue
+        if not inspect.isfunction(validation_method):
+            # staticmethods, classmethods and other descriptors or callables are
+            # bound per instance
+            def validation_method(obj, name=validation_method_name):
+                return getattr(obj, name)()
+
+        validators.append((field_name, validation_method))
+    return tuple(validators)
+
+
+def _is_classvar(annotation) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+    return annotation is ClassVar or get_origin(annotation) is ClassVar
+
+
+class ModelMeta(ABCMeta):
+    """
+    Metaclass of BaseModel implementing the ``slots`` and ``track_changes``
+    class keywords.
+
+    It derives from ``ABCMeta``, so models can also inherit from ``ABC`` and
+    declare abstract methods. Bases with any other metaclass conflict with it.
+
+    ``class Point(BaseModel, slots=True)`` generates ``__slots__`` from the
+    annotations of the class, so its instances carry no ``__dict__``. Default
+    values cannot stay class attributes next to slots; they are moved to
+    ``_slot_defaults`` and assigned by ``BaseModel.__init__`` instead.
+
+    ``class Account(BaseModel, track_changes=True)`` inserts the
+    ``ChangeTracking`` mixin (see ``transmutate.tracking``) in the bases.
+
+    ``generation`` is bumped whenever a field or method of a model class is
+    assigned or deleted after creation, which invalidates the cached schemas.
+    """
+
+    generation = 0
+
+    # Models are checked in the encoding hot paths; virtual subclasses
+    # registered on model classes are not supported in exchange
+    __instancecheck__ = type.__instancecheck__
+    __subclasscheck__ = type.__subclasscheck__
+
+    def __new__(
+        mcs,
+        name,
+        bases,
+        namespace,
+        slots: bool = False,
+        track_changes: bool = False,
+        **kwargs,
+    ):
+        if track_changes and not any(
+            issubclass(base, ChangeTracking) for base in bases
+        ):
+            if "__setattr__" in namespace or "__delattr__" in namespace:
+                raise TypeError(
+                    "track_changes=True models cannot define __setattr__ or __delattr__"
+                )
+            bases = (ChangeTracking,) + bases
+        own_defaults = {}
+        if slots and "__slots__" not in namespace:
+            inherited_slots = set()
+            for base in bases:
+                for klass in base.__mro__:
+                    inherited_slots.update(klass.__dict__.get("__slots__", ()))
+            slot_names = tuple(
+                field_name
+                for field_name, annotation in namespace.get(
+                    "__annotations__", {}
+                ).items()
+                if field_name not in inherited_slots and not _is_classvar(annotation)
+            )
+            for field_name in slot_names:
+                if field_name in namespace:
+                    own_defaults[field_name] = namespace.pop(field_name)
+            namespace["__slots__"] = slot_names
+
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        # Merged with the defaults of slotted base classes, nearest class last
+        cls._slot_defaults = {**getattr(cls, "_slot_defaults", {}), **own_defaults}
+        return cls
+
+    def __setattr__(cls, name, value):
+        super().__setattr__(name, value)
+        if name == "__annotations__" or not name.startswith("_"):
+            ModelMeta.generation += 1
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+        if name == "__annotations__" or not name.startswith("_"):
+            ModelMeta.generation += 1
+
+
+class BaseModel(metaclass=ModelMeta):
+    # Subclasses get a __dict__ unless they are declared with slots=True
+    __slots__ = ()
+
+    # (field name, validation function) pairs, resolved when a subclass is created
+    _validators = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._validators = _collect_validators(cls)
 
-class BaseModel:
     def __init__(self, **kwargs):
+        # Defaults of slotted models are not readable from the class
+        for key, value in self._slot_defaults.items():
+            if key not in kwargs:
+                setattr(self, key, value)
         # Automatically set attributes for any keyword arguments passed
         for key, value in kwargs.items():
             setattr(self, key, value)
 
     def __post_init__(self):
         # Run validation methods
-        self.run_validations()
+        if _validations_enabled.get():
+            self.run_validations()
+
+    def run_validations(self, collect_errors: bool = False):
+        """
+        Runs the validation_<field> methods of the model.
+
+        :param collect_errors: Run every validator and raise a single
+            ValidationError listing all failures instead of stopping at the first.
+        """
+        if not collect_errors:
+            for _, validation_method in self._validators:
+                validation_method(self)
+            return
 
-    def run_validations(self):
-        # Iterate over all fields and check for validation methods
-        for field_name in self.__annotations__:
-            validation_method_name = f"validation_{field_name}"
-            if hasattr(self, validation_method_name):
-                validation_method = getattr(self, validation_method_name)
-                validation_method()
+        errors = []
+        for field_name, validation_method in self._validators:
+            try:
+                validation_method(self)
+            except Exception as error:
+                errors.append((field_name, error))
+        if errors:
+            raise ValidationError(errors)
 
     def to_proto(self):
+        return self.proto_schema()
+
+    @classmethod
+    def proto_schema(cls) -> str:
+        """
+        Returns the proto3 messages describing the class, nested messages first.
+
+        Works from the class alone and is cached until a model class changes.
+        """
+        cached = cls.__dict__.get("_transmutate_proto_schema")
+        if cached is not None and cached[0] == ModelMeta.generation:
+            return cached[1]
+
         from transmutate.proto_handler import (
-            ProtoHandler,
+            collect_messages,
         )  # Lazy import to avoid circular import
 
-        proto_generator = ProtoHandler(self)
-        return proto_generator.generate_proto()
+        schema = "\n".join(definition for _, definition in collect_messages(cls))
+        cls._transmutate_proto_schema = (ModelMeta.generation, schema)
+        return schema
 
-    def to_json(self):
-        from transmutate.json_handler import (
-            JSONHandler,
-        )  # Lazy import to avoid circular import
+    # The JSON methods take an optional backend name (see json_backends);
+    # None uses the globally selected backend.
 
-        json_handler = JSONHandler(self)
-        return json_handler.to_json()
+    def to_json(self, backend: Optional[str] = None):
+        return JSONHandler.dumps(self._get_plan().encode(self), backend)
 
-    def to_jsonb(self):
-        from transmutate.jsonb_handler import (
-            JSONBHandler,
-        )  # Lazy import to avoid circular import
+    def to_jsonb(self, backend: Optional[str] = None):
+        return JSONBHandler.dumps(self._get_plan().encode(self), backend)
 
-        jsonb_handler = JSONBHandler(self)
-        return jsonb_handler.to_jsonb()
+    def to_jsonb_bytes(self, backend: Optional[str] = None) -> bytes:
+        """Returns the JSONB encoding of the model as UTF-8 bytes."""
+        return JSONBHandler.dumps_bytes(self._get_plan().encode(self), backend)
+
+    def write_into(self, buffer: bytearray, backend: Optional[str] = None) -> int:
+        """
+        Appends the JSONB encoding of the model to a caller-owned buffer.
+
+        :param buffer: bytearray to extend, e.g. a pending socket write buffer.
+        :return: The number of bytes appended.
+        """
+        encoded = JSONBHandler.dumps_bytes(self._get_plan().encode(self), backend)
+        buffer += encoded
+        return len(encoded)
 
     @classmethod
-    def from_proto(cls: Type["BaseModel"], proto_data: str) -> "BaseModel":
-        # Placeholder: Parse Proto data and create an instance of the dataclass
-        # Requires a real parser for production code
-        return cls.from_dict(json.loads(proto_data))  # Simulating using JSON parsing
+    def to_jsonb_many(
+        cls, models: Iterable["BaseModel"], backend: Optional[str] = None
+    ) -> str:
+        """Encodes a sequence of models into a single JSONB array."""
+        encode = cls._get_plan().encode
+        return JSONBHandler.dumps(
+            [
+                encode(model) if type(model) is cls else model._get_plan().encode(model)
+                for model in models
+            ],
+            backend,
+        )
 
     @classmethod
-    def from_json(cls: Type["BaseModel"], json_data: str) -> "BaseModel":
-        from transmutate.json_handler import (
-            JSONHandler,
+    def _get_plan(cls):
+        # Compiled once per class and cached in the class' own namespace, until
+        # a model class changes, like the proto schema whose numbering it shares
+        cached = cls.__dict__.get("_transmutate_plan")
+        if cached is not None and cached[0] == ModelMeta.generation:
+            return cached[1]
+
+        from transmutate.model_plan import (
+            ModelPlan,
         )  # Lazy import to avoid circular import
 
-        data_dict = JSONHandler.parse_json(json_data)
-        return cls.from_dict(data_dict)
+        plan = ModelPlan(cls)
+        cls._transmutate_plan = (ModelMeta.generation, plan)
+        return plan
+
+    def to_proto_bytes(self) -> bytes:
+        """Encodes the model in the protobuf binary wire format of ``to_proto()``."""
+        return self._get_plan().get_proto_codec().encode(self)
+
+    @classmethod
+    def from_proto_bytes(
+        cls: Type["BaseModel"], proto_data: bytes, validate: bool = True
+    ) -> "BaseModel":
+        return cls._get_plan().get_proto_codec().decode(proto_data, validate)
+
+    @classmethod
+    def from_proto(cls: Type["BaseModel"], proto_data) -> "BaseModel":
+        if isinstance(proto_data, (bytes, bytearray, memoryview)):
+            return cls.from_proto_bytes(proto_data)
+        # Text input keeps the former behaviour of parsing JSON
+        return cls.from_dict(json.loads(proto_data))
+
+    @classmethod
+    def from_json(
+        cls: Type["BaseModel"],
+        json_data: str,
+        validate: bool = True,
+        backend: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> "BaseModel":
+        data_dict = JSONHandler.parse_json(json_data, backend)
+        return cls.from_dict(data_dict, validate=validate, fields=fields)
+
+    @classmethod
+    def from_jsonb(
+        cls: Type["BaseModel"],
+        jsonb_data: Union[str, bytes, bytearray, memoryview],
+        validate: bool = True,
+        backend: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> "BaseModel":
+        # Also accepts mmap objects and any other buffer holding UTF-8 JSON
+        data_dict = JSONBHandler.parse_jsonb(jsonb_data, backend)
+        return cls.from_dict(data_dict, validate=validate, fields=fields)
 
     @classmethod
-    def from_jsonb(cls: Type["BaseModel"], jsonb_data: str) -> "BaseModel":
-        from transmutate.jsonb_handler import (
-            JSONBHandler,
+    def from_jsonb_lazy(
+        cls: Type["BaseModel"],
+        jsonb_data: Union[str, bytes, bytearray, memoryview],
+        validate: bool = True,
+        backend: Optional[str] = None,
+    ):
+        """
+        Parses JSONB without building the model, see ``transmutate.lazy``.
+
+        Fields are decoded and validated on first access, so reading a few
+        fields of a large document skips constructing the rest of it.
+        """
+        from transmutate.lazy import (
+            LazyModel,
         )  # Lazy import to avoid circular import
 
-        data_dict = JSONBHandler.parse_jsonb(jsonb_data)
-        return cls.from_dict(data_dict)
+        data_dict = JSONBHandler.parse_jsonb(jsonb_data, backend)
+        if not isinstance(data_dict, dict):
+            raise ValueError("Expected a JSONB object")
+        return LazyModel(cls, data_dict, validate)
+
+    @classmethod
+    def from_dict(
+        cls,
+        data_dict: dict,
+        validate: bool = True,
+        fields: Optional[Iterable[str]] = None,
+    ) -> "BaseModel":
+        # Fields, defaults and nested models are resolved by the compiled plan.
+        # validate=False skips validation for trusted data, e.g. our own database
+        if fields is not None:
+            # Only the listed fields, or dotted paths, are decoded and set
+            return cls._get_plan().project(fields).decode(data_dict, validate)
+        return cls._get_plan().decode(data_dict, validate)
 
     @classmethod
-    def from_dict(cls, data_dict: dict) -> "BaseModel":
-        # Initialize the fields directly from the data dictionary
-        field_values = {}
-        for (
-            key,
-            value,
-        ) in cls.__annotations__.items():  # Assuming type hints are provided
-            if key in data_dict:
-                field_values[key] = data_dict[key]
-            else:
-                raise ValueError(f"Missing required field '{key}'")
-        return cls(**field_values)
+    def from_jsonb_many(
+        cls,
+        jsonb_data: Union[str, bytes, bytearray, memoryview],
+        validate: bool = True,
+        backend: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List["BaseModel"]:
+        """Decodes a JSONB array into a list of models sharing one compiled plan."""
+        data_list = JSONBHandler.parse_jsonb(jsonb_data, backend)
+        if not isinstance(data_list, list):
+            raise ValueError("Expected a JSONB array of objects")
+        plan = cls._get_plan()
+        decode = plan.decode if fields is None else plan.project(fields).decode
+        return [decode(data_dict, validate) for data_dict in data_list]
 
     def to_dict(self) -> dict:
         """Convert the model instance to a dictionary."""
-        return self.__dict__.copy()
+        return self._get_plan().get_attributes(self)
 
     def __repr__(self):
-        fields = ", ".join(f"{k}={v}" for k, v in self.__dict__.items())
+        fields = ", ".join(f"{k}={v}" for k, v in self.to_dict().items())
         return f"{self.__class__.__name__}({fields})"
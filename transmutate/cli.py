@@ -0,0 +1,290 @@
+"""
+Command line interface, available as ``transmutate`` or ``python -m transmutate``.
+
+    transmutate convert --model pkg.mod:Person --from ndjson --to proto-bin in out
+    transmutate gen-proto pkg.mod:services --service-name People
+
+``convert`` streams records with constant memory: uncompressed input files are
+memory-mapped and records are converted in chunks, optionally on several
+worker processes. ``-`` reads from stdin or writes to stdout.
+"""
+
+import argparse
+import gzip
+import importlib
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, Optional
+
+from transmutate.framing import (
+    DEFAULT_CHUNK_SIZE,
+    FrameDecoder,
+    FrameWriter,
+    iter_frames,
+)
+from transmutate.ndjson import open_ndjson
+from transmutate.parallel import (
+    DEFAULT_CHUNK_SIZE as DEFAULT_RECORDS_PER_CHUNK,
+    ParallelConverter,
+)
+from transmutate.proto_generator import ProtoGenerator
+from transmutate.Services import Service
+
+# Command line format -> (framing, payload); "jsonb" is an alias of "ndjson"
+INPUT_FORMATS = {
+    "ndjson": ("lines", "jsonb"),
+    "jsonb": ("lines", "jsonb"),
+    "proto-bin": ("frames", "proto"),
+}
+OUTPUT_FORMATS = {
+    **INPUT_FORMATS,
+    "json": ("array", "json"),
+}
+
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Lines starting with one of these bytes may be blank
+_WHITESPACE = b" \t\r"
+
+
+def load_object(spec: str):
+    """
+    Imports the object named by ``"package.module:attribute"``.
+
+    The attribute may be dotted, e.g. ``"app.models:Outer.Inner"``.
+    """
+    module_name, _, attribute = spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Expected 'module:attribute', got '{spec}'")
+    # Modules of the current directory are importable, as with python -m, for
+    # the duration of the import only
+    cwd = os.getcwd()
+    added = cwd not in sys.path
+    if added:
+        sys.path.insert(0, cwd)
+    try:
+        obj = importlib.import_module(module_name)
+    finally:
+        if added:
+            sys.path.remove(cwd)
+    for name in attribute.split("."):
+        try:
+            obj = getattr(obj, name)
+        except AttributeError:
+            raise ImportError(
+                f"Cannot import '{attribute}' from '{module_name}'"
+            ) from None
+    return obj
+
+
+def iter_lines(data) -> Iterator[memoryview]:
+    """Yields zero-copy slices of the non-blank lines of a bytes-like object."""
+    view = memoryview(data)
+    find = data.find
+    pos = 0
+    end = len(data)
+    while pos < end:
+        stop = find(b"\n", pos)
+        if stop == -1:
+            stop = end
+        if stop > pos and (data[pos] not in _WHITESPACE or data[pos:stop].strip()):
+            yield view[pos:stop]
+        pos = stop + 1
+
+
+@contextmanager
+def map_input(fileobj: IO[bytes]):
+    """Yields a read-only mmap of a regular file, or None when it cannot be mapped."""
+    mapped = None
+    if not isinstance(fileobj, gzip.GzipFile):
+        try:
+            fileno = fileobj.fileno()
+            if os.fstat(fileno).st_size:
+                mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            pass  # Pipes, sockets and in-memory files are streamed
+    try:
+        yield mapped
+    finally:
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # Slices still referenced after an error; closed when freed
+
+
+def iter_input(fileobj: IO[bytes], framing: str, mapped=None) -> Iterator:
+    """Yields the raw records of an input file, from its mmap when given."""
+    if mapped is not None:
+        if framing == "lines":
+            yield from iter_lines(mapped)
+        else:
+            decoder = FrameDecoder()
+            view = memoryview(mapped)
+            for pos in range(0, len(view), DEFAULT_CHUNK_SIZE):
+                yield from decoder.feed(view[pos : pos + DEFAULT_CHUNK_SIZE])
+            decoder.close()
+    elif framing == "lines":
+        for line in fileobj:
+            if line.strip():
+                yield line
+    else:
+        yield from iter_frames(fileobj)
+
+
+def write_output(fileobj: IO[bytes], framing: str, payloads: Iterable[bytes]) -> None:
+    if framing == "lines":
+        write = fileobj.write
+        for data in payloads:
+            write(data)
+            write(b"\n")
+    elif framing == "frames":
+        with FrameWriter(fileobj) as writer:
+            for data in payloads:
+                writer.write(data)
+    else:
+        separator = b"[\n"
+        for data in payloads:
+            fileobj.write(separator)
+            fileobj.write(data)
+            separator = b",\n"
+        fileobj.write(b"[]\n" if separator == b"[\n" else b"\n]\n")
+
+
+def _open_input(path: str) -> IO[bytes]:
+    return sys.stdin.buffer if path == "-" else open_ndjson(path, "rb")
+
+
+def _open_output(path: str) -> IO[bytes]:
+    if path == "-":
+        return sys.stdout.buffer
+    elif path.endswith(".gz"):
+        return gzip.open(path, "wb")
+    return open(path, "wb", buffering=OUTPUT_BUFFER_SIZE)
+
+
+def convert(args) -> int:
+    model_cls = load_object(args.model)
+    input_framing, source = INPUT_FORMATS[args.source]
+    output_framing, target = OUTPUT_FORMATS[args.target]
+
+    input_file = _open_input(args.input)
+    output_file = _open_output(args.output)
+    try:
+        with map_input(input_file) as mapped, ParallelConverter(
+            args.workers, args.chunk_size
+        ) as converter:
+            records = iter_input(input_file, input_framing, mapped)
+            payloads = converter.convert(
+                model_cls, records, source, target, not args.no_validate, args.backend
+            )
+            write_output(output_file, output_framing, payloads)
+    finally:
+        if input_file is not sys.stdin.buffer:
+            input_file.close()
+        if output_file is sys.stdout.buffer:
+            output_file.flush()
+        else:
+            output_file.close()
+    print(f"Converted {converter.throughput}", file=sys.stderr)
+    return 0
+
+
+def _collect_generators(obj, service_name: Optional[str], output_dir: str):
+    items = list(obj) if isinstance(obj, (list, tuple)) else [obj]
+    if items and all(isinstance(item, ProtoGenerator) for item in items):
+        return items
+    if items and all(isinstance(item, Service) for item in items):
+        if not service_name:
+            raise ValueError("--service-name is required to generate from services")
+        return [ProtoGenerator(service_name, items, output_dir)]
+    raise ValueError(
+        "Expected a Service, a ProtoGenerator, or a list of either, "
+        f"got {type(obj).__name__}"
+    )
+
+
+def gen_proto(args) -> int:
+    generators = []
+    for spec in args.specs:
+        generators += _collect_generators(
+            load_object(spec), args.service_name, args.output_dir
+        )
+    ProtoGenerator.build(generators, args.processes)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="transmutate")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert a file of records to another format"
+    )
+    convert_parser.add_argument(
+        "--model", required=True, help="Model class, as package.module:Class"
+    )
+    convert_parser.add_argument(
+        "--from",
+        dest="source",
+        choices=sorted(INPUT_FORMATS),
+        default="ndjson",
+        help="Input format (default: ndjson)",
+    )
+    convert_parser.add_argument(
+        "--to",
+        dest="target",
+        choices=sorted(OUTPUT_FORMATS),
+        required=True,
+        help="Output format",
+    )
+    convert_parser.add_argument("input", help="Input file, - for stdin")
+    convert_parser.add_argument(
+        "output", help="Output file, - for stdout; gzip'd when ending in .gz"
+    )
+    convert_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes converting records (default: 1)",
+    )
+    convert_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_RECORDS_PER_CHUNK,
+        help="Records converted per chunk",
+    )
+    convert_parser.add_argument(
+        "--no-validate", action="store_true", help="Skip the model validators"
+    )
+    convert_parser.add_argument("--backend", help="JSON backend name")
+    convert_parser.set_defaults(handler=convert)
+
+    gen_proto_parser = subparsers.add_parser(
+        "gen-proto", help="Generate proto files with ProtoGenerator"
+    )
+    gen_proto_parser.add_argument(
+        "specs",
+        nargs="+",
+        metavar="module:attribute",
+        help="Service, ProtoGenerator, or list of either",
+    )
+    gen_proto_parser.add_argument(
+        "--service-name", help="Name of the gRPC service generated from services"
+    )
+    gen_proto_parser.add_argument(
+        "--output-dir", default="protos", help="Output directory (default: protos)"
+    )
+    gen_proto_parser.add_argument(
+        "--processes", type=int, help="Worker processes rendering proto files"
+    )
+    gen_proto_parser.set_defaults(handler=gen_proto)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (ImportError, OSError, ValueError) as error:
+        print(f"transmutate: error: {error}", file=sys.stderr)
+        return 1
@@ -0,0 +1,337 @@
+"""
+Compression of small JSONB messages with trained zlib preset dictionaries.
+
+Generic compression barely shrinks a 500-byte message: it has no history to
+refer to. A preset dictionary (zlib's ``zdict``) built from sample messages
+of a model provides that history, so the keys and common values of every
+message compress to a few bytes:
+
+    compressor = DictionaryCompressor(Person)
+    compressor.train(sample_people)
+    data = compressor.encode(person)
+    person = compressor.decode(data)
+
+Compressed payloads start with the byte 0xC1, which never occurs in UTF-8,
+followed by the varint id of the dictionary and a raw deflate stream. Id 0
+stands for no dictionary. Dictionaries must be kept, see ``dictionaries``,
+for as long as payloads compressed with them are read.
+"""
+
+import os
+import re
+import zlib
+from collections import Counter
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from transmutate.base_model import BaseModel
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.ndjson import DEFAULT_BUFFER_SIZE
+from transmutate.proto_wire import encode_varint, read_varint
+
+MARKER = 0xC1
+
+DEFAULT_DICTIONARY_SIZE = 16 * 1024
+DEFAULT_LEVEL = 6
+
+# Raw deflate streams, without the zlib header and checksum, and the largest
+# window so dictionaries up to 32 KiB are fully used
+_WBITS = -15
+_MAX_DICTIONARY_SIZE = 32 * 1024
+
+# Keys with their colon, strings, numbers and literals of JSON text
+_TOKEN_PATTERN = re.compile(
+    rb'"(?:[^"\\]|\\.)*"(?:\s*:)?|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null'
+)
+
+PathOrFile = Union[str, os.PathLike, IO[bytes]]
+
+
+def train_dictionary(
+    samples: Iterable[bytes], size: int = DEFAULT_DICTIONARY_SIZE
+) -> bytes:
+    """
+    Builds a zlib preset dictionary from sample payloads.
+
+    JSON tokens found in several samples are ranked by the bytes they would
+    save, and the best ones are placed last, where deflate refers to them
+    with the shortest distances. The dictionary ends with a whole sample,
+    which carries the key order and the punctuation between the values.
+
+    :param samples: Encoded messages, e.g. ``to_jsonb_bytes()`` of models.
+    :param size: Maximum size of the dictionary, at most 32 KiB.
+    """
+    if not 0 < size <= _MAX_DICTIONARY_SIZE:
+        raise ValueError(
+            f"Dictionary size must be between 1 and {_MAX_DICTIONARY_SIZE}"
+        )
+    counts = Counter()
+    last_sample = None
+    sample_count = 0
+    for sample in samples:
+        sample = bytes(sample)
+        # Counted once per sample, so one long list does not dominate
+        counts.update(set(_TOKEN_PATTERN.findall(sample)))
+        last_sample = sample
+        sample_count += 1
+    if last_sample is None:
+        raise ValueError("Cannot train a dictionary without samples")
+
+    tail = last_sample[-size:]
+    budget = size - len(tail)
+    min_count = 2 if sample_count > 1 else 1
+    ranked = sorted(
+        (token for token, count in counts.items() if count >= min_count),
+        key=lambda token: counts[token] * len(token),
+        reverse=True,
+    )
+    selected = []
+    for token in ranked:
+        if len(token) <= budget:
+            selected.append(token)
+            budget -= len(token)
+    selected.reverse()
+    return b"".join(selected) + tail
+
+
+class DictionaryCompressor:
+    """
+    Compresses the JSONB encoding of a model class with trained dictionaries.
+
+    Several dictionary versions can be loaded at once: payloads name the one
+    they were compressed with, and new payloads use ``dictionary_id``.
+
+    :param level: zlib compression level.
+    :param backend: Name of the JSON backend, None for the default one.
+    :param max_size: Largest decompressed payload, or NDJSON record, that is
+        accepted; None for no limit.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[BaseModel],
+        level: int = DEFAULT_LEVEL,
+        backend: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ):
+        self.model_cls = model_cls
+        self.level = level
+        self.backend = backend
+        self.max_size = max_size
+        self.dictionary_id = 0
+        self._dictionaries: Dict[int, bytes] = {0: b""}
+        # Compressor primed with each dictionary, copied for every message
+        # instead of loading the dictionary again
+        self._templates: Dict[int, object] = {}
+
+    @property
+    def dictionaries(self) -> Dict[int, bytes]:
+        """The loaded dictionaries by id, e.g. to store them next to the data."""
+        return {key: value for key, value in self._dictionaries.items() if key}
+
+    def add_dictionary(
+        self, dictionary: bytes, dictionary_id: Optional[int] = None, use: bool = True
+    ) -> int:
+        """
+        Loads a dictionary, e.g. one stored from an earlier ``train()``.
+
+        :param dictionary_id: Id to load it under, by default the next one.
+        :param use: Compress new payloads with it.
+        :return: The dictionary id.
+        """
+        if dictionary_id is None:
+            dictionary_id = max(self._dictionaries) + 1
+        elif dictionary_id < 1:
+            raise ValueError("Dictionary ids start at 1")
+        dictionary = bytes(dictionary[-_MAX_DICTIONARY_SIZE:])
+        existing = self._dictionaries.get(dictionary_id)
+        if existing is not None and existing != dictionary:
+            raise ValueError(f"Dictionary {dictionary_id} is already loaded")
+        self._dictionaries[dictionary_id] = dictionary
+        if use:
+            self.dictionary_id = dictionary_id
+        return dictionary_id
+
+    def train(
+        self, samples: Iterable[BaseModel], size: int = DEFAULT_DICTIONARY_SIZE
+    ) -> int:
+        """
+        Trains a dictionary from sample instances and compresses with it.
+
+        A few hundred samples representative of the production data are
+        usually enough.
+
+        :return: The id of the new dictionary.
+        """
+        backend = self.backend
+        payloads = (model.to_jsonb_bytes(backend) for model in samples)
+        return self.add_dictionary(train_dictionary(payloads, size))
+
+    def _get_dictionary(self, dictionary_id: int) -> bytes:
+        try:
+            return self._dictionaries[dictionary_id]
+        except KeyError:
+            raise ValueError(
+                f"Unknown compression dictionary {dictionary_id}"
+            ) from None
+
+    def _compressor(self, dictionary_id: int):
+        template = self._templates.get(dictionary_id)
+        if template is None:
+            dictionary = self._get_dictionary(dictionary_id)
+            if dictionary:
+                template = zlib.compressobj(
+                    self.level,
+                    zlib.DEFLATED,
+                    _WBITS,
+                    zlib.DEF_MEM_LEVEL,
+                    zlib.Z_DEFAULT_STRATEGY,
+                    dictionary,
+                )
+            else:
+                template = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS)
+            self._templates[dictionary_id] = template
+        return template.copy()
+
+    def _decompressor(self, dictionary_id: int):
+        dictionary = self._get_dictionary(dictionary_id)
+        if dictionary:
+            return zlib.decompressobj(_WBITS, dictionary)
+        return zlib.decompressobj(_WBITS)
+
+    def _header(self) -> bytes:
+        return bytes((MARKER,)) + encode_varint(self.dictionary_id)
+
+    def compress(self, data) -> bytes:
+        """Compresses an encoded message with the current dictionary."""
+        compressor = self._compressor(self.dictionary_id)
+        return self._header() + compressor.compress(data) + compressor.flush()
+
+    def _parse_header(self, data) -> Tuple[int, int]:
+        if not data or data[0] != MARKER:
+            raise ValueError("Not a dictionary-compressed payload")
+        return read_varint(data, 1)
+
+    def decompress(self, data) -> bytes:
+        """Decompresses a payload of ``compress()``, with the dictionary it names."""
+        dictionary_id, pos = self._parse_header(data)
+        decompressor = self._decompressor(dictionary_id)
+        data = memoryview(data)[pos:]
+        if self.max_size is None:
+            result = decompressor.decompress(data)
+        else:
+            # One byte over the limit tells a too large payload apart
+            result = decompressor.decompress(data, self.max_size + 1)
+            if len(result) > self.max_size:
+                raise ValueError(f"Compressed payload exceeds {self.max_size} bytes")
+        if not decompressor.eof:
+            raise ValueError("Truncated compressed payload")
+        return result
+
+    def encode(self, model: BaseModel) -> bytes:
+        """Returns the compressed JSONB encoding of a model."""
+        return self.compress(model.to_jsonb_bytes(self.backend))
+
+    def decode(self, data, validate: bool = True) -> BaseModel:
+        """Builds a model from a payload of ``encode()``, as ``from_jsonb`` does."""
+        return self.model_cls.from_jsonb(self.decompress(data), validate, self.backend)
+
+    def write_ndjson(
+        self,
+        fileobj: PathOrFile,
+        models: Iterable[BaseModel],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> int:
+        """
+        Writes models as a single compressed stream of NDJSON records.
+
+        The whole stream shares one deflate history, primed with the current
+        dictionary, so it compresses better than per-message payloads.
+
+        :param fileobj: Path or open binary file.
+        :return: The number of records written.
+        """
+        if isinstance(fileobj, (str, os.PathLike)):
+            with open(fileobj, "wb") as file:
+                return self.write_ndjson(file, models, buffer_size)
+
+        compressor = self._compressor(self.dictionary_id)
+        backend = self.backend
+        fileobj.write(self._header())
+        count = 0
+        pending: List[bytes] = []
+        pending_size = 0
+        for model in models:
+            line = model.to_jsonb_bytes(backend)
+            pending.append(line)
+            pending_size += len(line) + 1
+            count += 1
+            if pending_size >= buffer_size:
+                pending.append(b"")
+                fileobj.write(compressor.compress(b"\n".join(pending)))
+                pending.clear()
+                pending_size = 0
+        if pending:
+            pending.append(b"")
+            fileobj.write(compressor.compress(b"\n".join(pending)))
+        fileobj.write(compressor.flush())
+        return count
+
+    def iter_ndjson(
+        self,
+        fileobj: PathOrFile,
+        validate: bool = True,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> Iterator[BaseModel]:
+        """
+        Lazily decodes the models of a ``write_ndjson()`` stream.
+
+        Memory is bounded by ``buffer_size`` and the longest record, which
+        can be limited with ``max_size``.
+        """
+        if isinstance(fileobj, (str, os.PathLike)):
+            with open(fileobj, "rb") as file:
+                yield from self.iter_ndjson(file, validate, buffer_size)
+            return
+
+        # The header is at most 11 bytes: the marker and a varint
+        header = bytearray(fileobj.read(2))
+        while len(header) < 11 and header[-1:] and header[-1] & 0x80:
+            header += fileobj.read(1)
+        dictionary_id, _ = self._parse_header(header)
+        decompressor = self._decompressor(dictionary_id)
+        decode = self.model_cls._get_plan().decode
+        backend = self.backend
+        max_size = self.max_size
+        # Decompressed data not yet parsed: the start of the next record
+        pending = bytearray()
+        while True:
+            chunk = data = fileobj.read(buffer_size)
+            while True:
+                # Output is bounded even for highly compressed input; the rest
+                # of the chunk is kept in unconsumed_tail
+                output = decompressor.decompress(data, buffer_size)
+                start = len(pending)
+                pending += output
+                # Earlier data holds no newline, so only the new one is searched
+                end = pending.rfind(b"\n", start)
+                if end >= 0:
+                    lines = pending[:end].split(b"\n")
+                    del pending[: end + 1]
+                    for line in lines:
+                        if line:
+                            yield decode(
+                                JSONBHandler.parse_jsonb(line, backend), validate
+                            )
+                if max_size is not None and len(pending) > max_size:
+                    raise ValueError(f"NDJSON record exceeds {max_size} bytes")
+                data = decompressor.unconsumed_tail
+                # At the end of the file, output held back by the limit is
+                # drained with empty input
+                if not data and (chunk or not output):
+                    break
+            if not chunk:
+                break
+        if not decompressor.eof:
+            raise ValueError("Truncated compressed stream")
+        if pending.strip():
+            yield decode(JSONBHandler.parse_jsonb(pending, backend), validate)
@@ -0,0 +1,271 @@
+"""
+Varint length-delimited framing of message streams.
+
+Every frame is the size of its payload encoded as a varint followed by the
+payload, which is the format of protobuf's ``writeDelimitedTo`` /
+``parseDelimitedFrom``. Payloads can be JSONB or proto binary encodings, so
+the framing carries the messages of streaming RPC types.
+"""
+
+from typing import (
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from transmutate.base_model import BaseModel
+from transmutate.proto_wire import write_varint
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Varints encoding sizes up to 2**64 take at most ten bytes
+_MAX_PREFIX_SIZE = 10
+
+Frame = Union[memoryview, bytearray]
+
+
+def write_frame(buffer: bytearray, payload) -> None:
+    """Appends one frame holding ``payload`` to ``buffer``."""
+    write_varint(buffer, len(payload))
+    buffer += payload
+
+
+def encode_frames(payloads: Iterable) -> bytes:
+    """Frames a sequence of payloads into a single bytes object."""
+    buffer = bytearray()
+    for payload in payloads:
+        write_frame(buffer, payload)
+    return bytes(buffer)
+
+
+def encode_model(
+    model: BaseModel, payload: str = "jsonb", backend: Optional[str] = None
+) -> bytes:
+    """Encodes a model as a ``"jsonb"``, ``"proto"`` or ``"json"`` payload."""
+    if payload == "proto":
+        return model.to_proto_bytes()
+    elif payload == "jsonb":
+        return model.to_jsonb_bytes(backend)
+    elif payload == "json":
+        return model.to_json(backend).encode("utf-8")
+    raise ValueError(
+        f"Unknown payload '{payload}', expected 'jsonb', 'proto' or 'json'"
+    )
+
+
+def decode_model(
+    model_cls: Type[BaseModel],
+    data,
+    payload: str = "jsonb",
+    validate: bool = True,
+    backend: Optional[str] = None,
+) -> BaseModel:
+    """Decodes a ``"jsonb"``, ``"proto"`` or ``"json"`` payload into a model."""
+    if payload == "proto":
+        return model_cls.from_proto_bytes(data, validate)
+    elif payload in ("jsonb", "json"):
+        return model_cls.from_jsonb(data, validate, backend)
+    raise ValueError(
+        f"Unknown payload '{payload}', expected 'jsonb', 'proto' or 'json'"
+    )
+
+
+def _parse_prefix(data, pos: int, end: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a frame size.
+
+    :return: The size and the position of the payload, or None when the prefix
+        is not complete yet.
+    """
+    length = 0
+    shift = 0
+    while pos < end:
+        byte = data[pos]
+        pos += 1
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return length, pos
+        shift += 7
+        if shift >= 7 * _MAX_PREFIX_SIZE:
+            raise ValueError("Malformed frame size")
+    return None
+
+
+class FrameWriter:
+    """
+    Writes frames to a binary file-like object.
+
+    Frames are collected in a buffer and handed to ``fileobj.write`` in one
+    call once ``buffer_size`` bytes are pending, or on ``flush()``.
+    """
+
+    def __init__(self, fileobj: IO[bytes], buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.fileobj = fileobj
+        self.buffer_size = buffer_size
+        self.frame_count = 0
+        self._buffer = bytearray()
+
+    def write(self, payload) -> None:
+        """Writes one frame holding an already encoded payload."""
+        write_frame(self._buffer, payload)
+        self.frame_count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_model(
+        self, model: BaseModel, payload: str = "jsonb", backend: Optional[str] = None
+    ) -> None:
+        self.write(encode_model(model, payload, backend))
+
+    def flush(self) -> None:
+        if self._buffer:
+            # Swapped rather than copied; the written buffer is never reused
+            data, self._buffer = self._buffer, bytearray()
+            self.fileobj.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+class FrameDecoder:
+    """
+    Incremental frame parser fed with chunks of any size.
+
+    Frames lying entirely within a chunk are returned as ``memoryview`` slices
+    of that chunk, without copying; they stay valid as long as the chunk is
+    not modified. Only frames spanning several chunks are assembled in an
+    internal buffer.
+    """
+
+    def __init__(self, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._pending = bytearray()
+
+    def _check_size(self, length: int) -> None:
+        if length > self.max_frame_size:
+            raise ValueError(
+                f"Frame of {length} bytes exceeds the limit of "
+                f"{self.max_frame_size} bytes"
+            )
+
+    def _complete_pending(self, data: memoryview, frames: List[Frame]) -> int:
+        # Returns how many bytes of the chunk were used
+        pending = self._pending
+        taken = 0
+        parsed = _parse_prefix(pending, 0, len(pending))
+        while parsed is None:
+            if taken == len(data):
+                return taken
+            pending.append(data[taken])
+            taken += 1
+            parsed = _parse_prefix(pending, 0, len(pending))
+        length, start = parsed
+        self._check_size(length)
+
+        missing = start + length - len(pending)
+        if missing > len(data) - taken:
+            pending += data[taken:]
+            return len(data)
+        pending += data[taken : taken + missing]
+        frames.append(pending[start:])
+        pending.clear()
+        return taken + missing
+
+    def feed(self, chunk) -> List[Frame]:
+        """
+        Parses the frames completed by ``chunk``.
+
+        :param chunk: bytes-like object, e.g. the result of ``read()``.
+        :return: The payloads of the complete frames, in order.
+        """
+        data = memoryview(chunk)
+        if data.format != "B" or data.ndim != 1:
+            data = data.cast("B")
+        frames = []
+        end = len(data)
+        pos = 0
+        if self._pending:
+            pos = self._complete_pending(data, frames)
+            if self._pending:
+                return frames
+
+        while pos < end:
+            parsed = _parse_prefix(data, pos, end)
+            if parsed is None:
+                self._pending += data[pos:]
+                break
+            length, start = parsed
+            self._check_size(length)
+            stop = start + length
+            if stop > end:
+                self._pending += data[pos:]
+                break
+            frames.append(data[start:stop])
+            pos = stop
+        return frames
+
+    @property
+    def at_frame_boundary(self) -> bool:
+        """Whether every byte fed so far belonged to a complete frame."""
+        return not self._pending
+
+    def close(self) -> None:
+        """Checks that the stream did not end in the middle of a frame."""
+        if self._pending:
+            raise ValueError("Truncated frame at the end of the stream")
+
+
+def iter_frames(
+    fileobj: IO[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+) -> Iterator[Frame]:
+    """Reads the frames of a binary file-like object, one chunk at a time."""
+    decoder = FrameDecoder(max_frame_size)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            decoder.close()
+            return
+        yield from decoder.feed(chunk)
+
+
+def read_models(
+    fileobj: IO[bytes],
+    model_cls: Type[BaseModel],
+    payload: str = "jsonb",
+    validate: bool = True,
+    backend: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[BaseModel]:
+    """Lazily decodes the models of a framed stream."""
+    for frame in iter_frames(fileobj, chunk_size):
+        yield decode_model(model_cls, frame, payload, validate, backend)
+
+
+def write_models(
+    fileobj: IO[bytes],
+    models: Iterable[BaseModel],
+    payload: str = "jsonb",
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    backend: Optional[str] = None,
+) -> int:
+    """
+    Writes models as a framed stream.
+
+    :return: The number of frames written.
+    """
+    with FrameWriter(fileobj, buffer_size) as writer:
+        for model in models:
+            writer.write(encode_model(model, payload, backend))
+    return writer.frame_count
@@ -0,0 +1,291 @@
+"""
+Opt-in instrumentation of the serialization and validation hot paths.
+
+Nothing is measured until ``enable()`` is called: the BaseModel methods are
+only wrapped while instrumentation is enabled and the originals are restored
+by ``disable()``, so there is no overhead otherwise.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Dict, Optional, Tuple
+
+from transmutate.base_model import BaseModel
+
+# BaseModel methods wrapped while instrumentation is enabled
+INSTRUMENTED_METHODS = (
+    "to_json",
+    "to_jsonb",
+    "from_json",
+    "from_jsonb",
+    "from_dict",
+    "run_validations",
+)
+
+
+def _payload_size(payload) -> int:
+    if isinstance(payload, str):
+        return len(payload) if payload.isascii() else len(payload.encode("utf-8"))
+    return memoryview(payload).nbytes
+
+
+def _model_name(model_cls) -> str:
+    return f"{model_cls.__module__}.{model_cls.__qualname__}"
+
+
+class Observer:
+    """
+    Aggregates the measurements of instrumented calls per model class.
+
+    Subclasses can override ``record`` and ``record_validator`` to forward
+    measurements elsewhere instead of, or on top of, aggregating them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (model, operation) -> [count, errors, seconds, bytes]
+        self._operations: Dict[Tuple[str, str], list] = {}
+        # (model, field) -> [count, errors, seconds]
+        self._validators: Dict[Tuple[str, str], list] = {}
+
+    def record(
+        self,
+        model_cls,
+        operation: str,
+        seconds: float,
+        size: Optional[int] = None,
+        error: bool = False,
+    ) -> None:
+        """
+        Records one call of an instrumented method.
+
+        :param size: Payload size in bytes, for the JSON methods.
+        :param error: Whether the call raised.
+        """
+        key = (_model_name(model_cls), operation)
+        with self._lock:
+            stats = self._operations.get(key)
+            if stats is None:
+                stats = self._operations[key] = [0, 0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += error
+            stats[2] += seconds
+            stats[3] += size or 0
+
+    def record_validator(
+        self, model_cls, field_name: str, seconds: float, error: bool = False
+    ) -> None:
+        """Records one call of a ``validation_<field>`` method."""
+        key = (_model_name(model_cls), field_name)
+        with self._lock:
+            stats = self._validators.get(key)
+            if stats is None:
+                stats = self._validators[key] = [0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += error
+            stats[2] += seconds
+
+    def snapshot(self) -> dict:
+        """
+        Exports the aggregated measurements as plain data.
+
+        :return: ``{model: {"operations": {operation: {"count", "errors",
+            "seconds", "bytes"}}, "validators": {field: {"count", "errors",
+            "seconds"}}}}`` with models named ``module.QualifiedName``.
+        """
+        result = {}
+        with self._lock:
+            for (model, operation), (count, errors, seconds, size) in sorted(
+                self._operations.items()
+            ):
+                model_stats = result.setdefault(
+                    model, {"operations": {}, "validators": {}}
+                )
+                model_stats["operations"][operation] = {
+                    "count": count,
+                    "errors": errors,
+                    "seconds": seconds,
+                    "bytes": size,
+                }
+            for (model, field_name), (count, errors, seconds) in sorted(
+                self._validators.items()
+            ):
+                model_stats = result.setdefault(
+                    model, {"operations": {}, "validators": {}}
+                )
+                model_stats["validators"][field_name] = {
+                    "count": count,
+                    "errors": errors,
+                    "seconds": seconds,
+                }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+            self._validators.clear()
+
+
+def _instrument_to(func, observer: Observer):
+    operation = func.__name__
+
+    @wraps(func)
+    def instrumented(self, *args, **kwargs):
+        start = perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+        except BaseException:
+            observer.record(type(self), operation, perf_counter() - start, error=True)
+            raise
+        observer.record(
+            type(self), operation, perf_counter() - start, _payload_size(result)
+        )
+        return result
+
+    return instrumented
+
+
+def _instrument_from(func, observer: Observer, measure_payload: bool):
+    operation = func.__name__
+
+    @wraps(func)
+    def instrumented(cls, data, *args, **kwargs):
+        start = perf_counter()
+        try:
+            result = func(cls, data, *args, **kwargs)
+        except BaseException:
+            observer.record(cls, operation, perf_counter() - start, error=True)
+            raise
+        size = _payload_size(data) if measure_payload else None
+        observer.record(cls, operation, perf_counter() - start, size)
+        return result
+
+    return classmethod(instrumented)
+
+
+def _timed_validators(model_cls, validators, observer: Observer) -> tuple:
+    def timed(field_name, validation_method):
+        @wraps(validation_method)
+        def validator(obj):
+            start = perf_counter()
+            try:
+                validation_method(obj)
+            except BaseException:
+                observer.record_validator(
+                    model_cls, field_name, perf_counter() - start, True
+                )
+                raise
+            observer.record_validator(model_cls, field_name, perf_counter() - start)
+
+        return validator
+
+    return tuple((name, timed(name, method)) for name, method in validators)
+
+
+def _instrument_run_validations(func, observer: Observer):
+    @wraps(func)
+    def run_validations(self, *args, **kwargs):
+        model_cls = type(self)
+        if model_cls not in _original_validators:
+            # Validators are timed by swapping the class' validator table,
+            # on the first validation of the class, so the loop stays the
+            # original one
+            validators = _original_validators.setdefault(
+                model_cls, model_cls._validators
+            )
+            type.__setattr__(
+                model_cls,
+                "_validators",
+                _timed_validators(model_cls, validators, observer),
+            )
+        start = perf_counter()
+        try:
+            func(self, *args, **kwargs)
+        except BaseException:
+            observer.record(
+                model_cls, "run_validations", perf_counter() - start, error=True
+            )
+            raise
+        observer.record(model_cls, "run_validations", perf_counter() - start)
+
+    return run_validations
+
+
+_observer: Optional[Observer] = None
+_original_methods: Dict[str, object] = {}
+# Model class -> validator table replaced by timed validators
+_original_validators: Dict[type, tuple] = {}
+
+
+def enable(observer: Optional[Observer] = None) -> Observer:
+    """
+    Starts instrumenting the BaseModel methods listed in ``INSTRUMENTED_METHODS``.
+
+    Calls of ``from_json`` and ``from_jsonb`` also record the ``from_dict``
+    call they make. Subclasses overriding these methods are measured only
+    when they call the BaseModel implementation.
+
+    :param observer: Observer receiving the measurements; a new one by default.
+    :return: The active observer.
+    """
+    global _observer
+    if _observer is not None:
+        disable()
+    observer = observer or Observer()
+    for name in INSTRUMENTED_METHODS:
+        original = BaseModel.__dict__[name]
+        _original_methods[name] = original
+        if name == "run_validations":
+            instrumented = _instrument_run_validations(original, observer)
+        elif isinstance(original, classmethod):
+            instrumented = _instrument_from(
+                original.__func__, observer, measure_payload=name != "from_dict"
+            )
+        else:
+            instrumented = _instrument_to(original, observer)
+        # type.__setattr__ keeps the cached schemas (see ModelMeta) valid
+        type.__setattr__(BaseModel, name, instrumented)
+    _observer = observer
+    return observer
+
+
+def disable() -> None:
+    """Restores the original BaseModel methods."""
+    global _observer
+    for name, original in _original_methods.items():
+        type.__setattr__(BaseModel, name, original)
+    _original_methods.clear()
+    for model_cls, validators in _original_validators.items():
+        type.__setattr__(model_cls, "_validators", validators)
+    _original_validators.clear()
+    _observer = None
+
+
+def is_enabled() -> bool:
+    return _observer is not None
+
+
+def get_observer() -> Optional[Observer]:
+    """Returns the active observer, or None when instrumentation is disabled."""
+    return _observer
+
+
+def snapshot() -> dict:
+    """Returns the measurements of the active observer, see ``Observer.snapshot``."""
+    return _observer.snapshot() if _observer is not None else {}
+
+
+@contextmanager
+def instrumented(observer: Optional[Observer] = None):
+    """
+    Enables instrumentation for the duration of a ``with`` block.
+
+    Yields the active observer.
+    """
+    observer = enable(observer)
+    try:
+        yield observer
+    finally:
+        disable()
@@ -0,0 +1,188 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+class JSONBackend:
+    """
+    Interface of the JSON codecs used by JSONHandler and JSONBHandler.
+
+    Every backend must produce the same data as the stdlib backend once parsed:
+    ``tests/test_json_backends.py`` holds the conformance suite they must pass.
+    """
+
+    name = ""
+
+    def dumps(self, data: Any, indent: Optional[int] = None) -> str:
+        """Encodes compact JSON, or pretty-printed JSON when ``indent`` is set."""
+        raise NotImplementedError
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        """Encodes compact JSON as UTF-8 bytes."""
+        return self.dumps(data).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        """Parses JSON from a str or any buffer holding UTF-8 text."""
+        raise NotImplementedError
+
+
+class StdlibBackend(JSONBackend):
+    name = "stdlib"
+
+    def __init__(self):
+        # Reused across calls instead of building a new encoder for every dumps()
+        self._compact_encoder = json.JSONEncoder(separators=(",", ":"))
+        self._pretty_encoder = json.JSONEncoder(indent=4)
+
+    def dumps(self, data: Any, indent: Optional[int] = None) -> str:
+        if indent is None:
+            return self._compact_encoder.encode(data)
+        elif indent == 4:
+            return self._pretty_encoder.encode(data)
+        return json.dumps(data, indent=indent)
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        # The encoder escapes non-ASCII characters, so this is a plain copy
+        return self._compact_encoder.encode(data).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        if not isinstance(data, (str, bytes, bytearray)):
+            # memoryview, mmap and other buffers are decoded in place, without
+            # first copying them into a bytes object
+            data = str(data, "utf-8")
+        return json.loads(data)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Backend using orjson when it is installed.
+
+    Non-ASCII characters are emitted as UTF-8 instead of ``\\uXXXX`` escapes.
+    Values orjson cannot handle (integers beyond 64 bits, custom classes) and
+    indentations other than compact are delegated to the stdlib backend, so
+    they behave exactly as before. This includes the non-finite floats of
+    model data, which the model encoders mark with a float subclass; other
+    non-finite floats are written as ``null`` by orjson.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._options = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+        )
+        self._stdlib = StdlibBackend()
+
+    def dumps(self, data: Any, indent: Optional[int] = None) -> str:
+        if indent is not None:
+            # orjson only supports two-space indentation
+            return self._stdlib.dumps(data, indent)
+        return self.dumps_bytes(data).decode("utf-8")
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        try:
+            return self._orjson.dumps(data, option=self._options)
+        except self._orjson.JSONEncodeError:
+            return self._stdlib.dumps_bytes(data)
+
+    def loads(self, data: Any) -> Any:
+        if not isinstance(data, (str, bytes, bytearray, memoryview)):
+            data = memoryview(data)
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            # NaN/Infinity literals and big integers are accepted by the stdlib;
+            # truly invalid documents raise the same error type from there
+            return self._stdlib.loads(data)
+
+
+# Backend name -> factory; _BACKEND_ORDER lists them fastest first
+_BACKEND_FACTORIES: Dict[str, Callable[[], JSONBackend]] = {
+    "orjson": OrjsonBackend,
+    "stdlib": StdlibBackend,
+}
+_BACKEND_ORDER: List[str] = ["orjson", "stdlib"]
+_backends: Dict[str, JSONBackend] = {}
+_selected_backend: Optional[str] = None  # Set by set_backend()
+_default_backend: Optional[JSONBackend] = None
+
+
+def register_backend(
+    name: str, factory: Callable[[], JSONBackend], preferred: bool = False
+) -> None:
+    """
+    Registers a JSON backend.
+
+    :param name: Name used to select the backend.
+    :param factory: Callable returning the backend; raising ImportError marks
+        the backend as unavailable.
+    :param preferred: Try this backend first when picking the default backend.
+    """
+    global _default_backend
+    _BACKEND_FACTORIES[name] = factory
+    if name in _BACKEND_ORDER:
+        _BACKEND_ORDER.remove(name)
+    if preferred:
+        _BACKEND_ORDER.insert(0, name)
+    else:
+        _BACKEND_ORDER.append(name)
+    _backends.pop(name, None)
+    _default_backend = None
+
+
+def _load_backend(name: str) -> Optional[JSONBackend]:
+    backend = _backends.get(name)
+    if backend is None:
+        try:
+            factory = _BACKEND_FACTORIES[name]
+        except KeyError:
+            raise ValueError(f"Unknown JSON backend '{name}'") from None
+        try:
+            backend = factory()
+        except ImportError:
+            return None
+        _backends[name] = backend
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Returns the names of the backends that can be used, fastest first."""
+    return [name for name in _BACKEND_ORDER if _load_backend(name) is not None]
+
+
+def get_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Returns a JSON backend.
+
+    :param name: Name of the backend, or None for the default one: the backend
+        chosen with ``set_backend``, else the fastest available one.
+    """
+    global _default_backend
+    if name is None:
+        if _default_backend is None:
+            _default_backend = get_backend(_selected_backend or available_backends()[0])
+        return _default_backend
+    backend = _load_backend(name)
+    if backend is None:
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    return backend
+
+
+def set_backend(name: Optional[str]) -> JSONBackend:
+    """
+    Selects the default backend globally.
+
+    :param name: Name of the backend, or None to go back to automatic selection.
+    :return: The new default backend.
+    """
+    global _selected_backend, _default_backend
+    if name is not None:
+        get_backend(name)  # Fail early on unknown or missing backends
+    _selected_backend = name
+    _default_backend = None
+    return get_backend()
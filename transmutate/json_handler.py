@@ -1,29 +1,28 @@
-import json
-from typing import Any
+from typing import Any, Optional
+
+from transmutate.json_backends import get_backend
 
 
 class JSONHandler:
-    def __init__(self, obj):
+    def __init__(self, obj, backend: Optional[str] = None):
         self.obj = obj
+        self.backend = backend  # Name of the JSON backend, None for the default
 
     def to_json(self) -> str:
         data = self.serialize_obj(self.obj)
-        return json.dumps(data, indent=4)
+        return self.dumps(data, self.backend)
+
+    @staticmethod
+    def dumps(data: Any, backend: Optional[str] = None) -> str:
+        return get_backend(backend).dumps(data, indent=4)
 
     @staticmethod
-    def parse_json(json_data: str) -> dict:
-        return json.loads(json_data)
+    def parse_json(json_data: str, backend: Optional[str] = None) -> dict:
+        return get_backend(backend).loads(json_data)
 
     def serialize_obj(self, obj: Any) -> Any:
-        if hasattr(obj, "__dict__"):
-            # This is an object that has a __dict__ attribute (like BaseModel or similar)
-            result = {}
-            for key, value in obj.__dict__.items():
-                result[key] = self.serialize_obj(value)
-            return result
-        elif isinstance(obj, list):
-            return [self.serialize_obj(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self.serialize_obj(value) for key, value in obj.items()}
-        else:
-            return obj
+        from transmutate.model_plan import (
+            encode_value,
+        )  # Lazy import to avoid circular import
+
+        return encode_value(obj)
@@ -1,28 +1,40 @@
-import json
-from typing import Any
+from typing import Any, Optional, Union
+
+from transmutate.json_backends import get_backend
 
 
 class JSONBHandler:
-    def __init__(self, obj: Any):
+    def __init__(self, obj: Any, backend: Optional[str] = None):
         self.obj = obj
+        self.backend = backend  # Name of the JSON backend, None for the default
 
     def to_jsonb(self) -> str:
         data = self.serialize_obj(self.obj)
-        return json.dumps(data, separators=(",", ":"))
+        return self.dumps(data, self.backend)
+
+    def to_jsonb_bytes(self) -> bytes:
+        data = self.serialize_obj(self.obj)
+        return self.dumps_bytes(data, self.backend)
+
+    @staticmethod
+    def dumps(data: Any, backend: Optional[str] = None) -> str:
+        return get_backend(backend).dumps(data)
+
+    @staticmethod
+    def dumps_bytes(data: Any, backend: Optional[str] = None) -> bytes:
+        return get_backend(backend).dumps_bytes(data)
 
     @staticmethod
-    def parse_jsonb(jsonb_data: str) -> dict:
-        return json.loads(jsonb_data)
+    def parse_jsonb(
+        jsonb_data: Union[str, bytes, bytearray, memoryview],
+        backend: Optional[str] = None,
+    ) -> dict:
+        # Also accepts mmap objects and any other buffer holding UTF-8 JSON
+        return get_backend(backend).loads(jsonb_data)
 
     def serialize_obj(self, obj: Any) -> Any:
-        if hasattr(obj, "__dict__"):
-            result = {}
-            for key, value in obj.__dict__.items():
-                result[key] = self.serialize_obj(value)
-            return result
-        elif isinstance(obj, list):
-            return [self.serialize_obj(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self.serialize_obj(value) for key, value in obj.items()}
-        else:
-            return obj
+        from transmutate.model_plan import (
+            encode_value,
+        )  # Lazy import to avoid circular import
+
+        return encode_value(obj)
@@ -0,0 +1,143 @@
+"""
+Lazy views of models over parsed JSON.
+
+``Model.from_jsonb_lazy`` parses a document but defers building the model:
+fields are decoded, and validated, the first time they are read.
+"""
+
+from inspect import getattr_static
+from types import FunctionType
+from typing import Any, Dict, Tuple, Type
+
+from transmutate.base_model import BaseModel
+from transmutate.tracking import ChangeTracking
+
+FieldTable = Tuple[Dict[str, Tuple[Any, Any, Any]], frozenset]
+
+# Their methods read the instance storage, which proxies do not have
+_FRAMEWORK_CLASSES = (BaseModel, ChangeTracking)
+
+
+def _get_field_table(model_cls) -> FieldTable:
+    """
+    Returns ``({field name: (decoder, default factory, validator)}, required)``.
+
+    Stored on the plan, so it is rebuilt along with it when a class changes.
+    """
+    plan = model_cls._get_plan()
+    table = plan._lazy_field_table
+    if table is None:
+        validators = dict(model_cls._validators)
+        fields = {
+            name: (decoder, default_factory, validators.get(name))
+            for name, decoder, default_factory in plan._decoders
+        }
+        required = frozenset(
+            name
+            for name, _, default_factory in plan._decoders
+            if default_factory is None
+        )
+        table = plan._lazy_field_table = (fields, required)
+    return table
+
+
+def _defining_class(model_cls, name: str) -> type:
+    for klass in model_cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+
+
+class LazyModel:
+    """
+    Read-only view of a model over parsed JSON data, decoding fields on access.
+
+    Nested models and lists are only built, and ``validation_<field>`` methods
+    only run, when their field is first read; the result is cached. Fields
+    that are never read cost nothing beyond parsing. ``materialize()``,
+    ``to_dict()`` and the serialization methods build the complete model.
+
+    ``isinstance(lazy, Person)`` holds for a lazy ``Person``. The methods
+    inherited from BaseModel, and the encoders given a proxy, work on the
+    complete model.
+    """
+
+    __slots__ = ("_model_cls", "_data", "_values", "_validate")
+
+    def __init__(self, model_cls: Type[BaseModel], data: dict, validate: bool = True):
+        required = _get_field_table(model_cls)[1]
+        if not required.issubset(data):
+            missing = sorted(required.difference(data))[0]
+            raise ValueError(f"Missing required field '{missing}'")
+        object.__setattr__(self, "_model_cls", model_cls)
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_values", {})
+        object.__setattr__(self, "_validate", validate)
+
+    @property
+    def __class__(self):
+        return self._model_cls
+
+    def __getattr__(self, name):
+        # Only called for names not found on the proxy itself
+        values = self._values
+        if name in values:
+            return values[name]
+        model_cls = self._model_cls
+        field = _get_field_table(model_cls)[0].get(name)
+        if field is None:
+            # Methods and class attributes of the model, bound to the proxy
+            attribute = getattr_static(model_cls, name)
+            if (
+                isinstance(attribute, FunctionType)
+                and _defining_class(model_cls, name) in _FRAMEWORK_CLASSES
+            ):
+                return attribute.__get__(self.materialize(), model_cls)
+            if hasattr(attribute, "__get__"):
+                return attribute.__get__(self, model_cls)
+            return attribute
+
+        decoder, default_factory, validator = field
+        data = self._data
+        if name in data:
+            value = data[name]
+            if decoder is not None:
+                value = decoder(value, self._validate)
+        else:
+            value = default_factory()
+        values[name] = value
+        if validator is not None and self._validate:
+            try:
+                validator(self)
+            except BaseException:
+                del values[name]  # Fail again on the next access
+                raise
+        return value
+
+    def __setattr__(self, name, value):
+        self._values[name] = value
+
+    def is_decoded(self, name: str) -> bool:
+        """Whether a field was already decoded or assigned."""
+        return name in self._values
+
+    def materialize(self) -> BaseModel:
+        """Builds the complete model, reusing the fields decoded so far."""
+        values = self._data.copy()
+        values.update(self._values)
+        return self._model_cls._get_plan().decode(values, self._validate)
+
+    def to_dict(self) -> dict:
+        return self.materialize().to_dict()
+
+    def to_json(self, backend=None) -> str:
+        return self.materialize().to_json(backend)
+
+    def to_jsonb(self, backend=None) -> str:
+        return self.materialize().to_jsonb(backend)
+
+    def to_proto_bytes(self) -> bytes:
+        return self.materialize().to_proto_bytes()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v}" for k, v in self._values.items())
+        return f"Lazy{self._model_cls.__name__}({fields})"
@@ -0,0 +1,333 @@
+from array import array
+from inspect import getattr_static
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Union
+
+from transmutate.base_model import BaseModel, ValidationError
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.model_plan import unwrap_optional
+from transmutate.ndjson import PathOrFile, iter_records
+
+# Field types stored in typed arrays; everything else is kept in a list
+ARRAY_TYPECODES = {
+    bool: "B",
+    int: "q",
+    float: "d",
+}
+
+
+class _RowView:
+    """
+    Stand-in for ``self`` when validators run over the columns of a batch.
+
+    Field reads come from the current row, decoded as on a model instance;
+    other attributes (helper methods, class constants) are looked up on the
+    model class.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "ModelBatch"):
+        self._batch = batch
+        self._index = 0
+
+    def __getattr__(self, name):
+        batch = self._batch
+        if name in batch._columns:
+            value = batch._get_value(name, self._index)
+            decoder = batch._decoders.get(name)
+            return value if decoder is None else decoder(value, False)
+        attribute = getattr_static(batch.model_cls, name)
+        if hasattr(attribute, "__get__"):
+            # Bind methods, properties and classmethods to the view
+            return attribute.__get__(self, batch.model_cls)
+        return attribute
+
+
+class ModelBatch:
+    """
+    Columnar (struct-of-arrays) container for many instances of one model class.
+
+    ``ModelBatch[Person]`` stores every annotated field of ``Person`` in its
+    own column: ``array.array`` for non-optional int, float and bool fields,
+    lists of JSON-compatible values for the others. Models are only built
+    when a row is accessed.
+    """
+
+    model_cls: Type[BaseModel] = None
+    _batch_classes: Dict[Type[BaseModel], Type["ModelBatch"]] = {}
+
+    def __class_getitem__(cls, model_cls: Type[BaseModel]) -> Type["ModelBatch"]:
+        batch_cls = cls._batch_classes.get(model_cls)
+        if batch_cls is None:
+            batch_cls = type(
+                f"ModelBatch[{model_cls.__name__}]", (cls,), {"model_cls": model_cls}
+            )
+            cls._batch_classes[model_cls] = batch_cls
+        return batch_cls
+
+    def __init__(self):
+        if self.model_cls is None:
+            raise TypeError("Use ModelBatch[ModelClass]() to create a batch")
+        self._plan = self.model_cls._get_plan()
+        # Columns hold encoded values, decoded for validators
+        self._decoders = {
+            field.name: field.decoder
+            for field in self._plan.fields
+            if field.decoder is not None
+        }
+        self._columns: Dict[str, Union[array, list]] = {}
+        self._bool_columns = set()
+        for field in self._plan.fields:
+            field_type, optional = unwrap_optional(field.type)
+            typecode = None if optional else ARRAY_TYPECODES.get(field_type)
+            if typecode is None:
+                self._columns[field.name] = []
+            else:
+                self._columns[field.name] = array(typecode)
+                if field_type is bool:
+                    self._bool_columns.add(field.name)
+        self._length = 0
+
+    @classmethod
+    def from_models(cls, models: Iterable[BaseModel]) -> "ModelBatch":
+        """Builds a batch from model instances; nested values are stored encoded."""
+        batch = cls()
+        for model in models:
+            batch.append(model)
+        return batch
+
+    @classmethod
+    def from_dicts(
+        cls, data_dicts: Iterable[dict], validate: bool = True
+    ) -> "ModelBatch":
+        """
+        Builds a batch from parsed JSON objects without constructing models.
+
+        :param data_dicts: Dictionaries as accepted by ``from_dict``.
+        :param validate: Run the model validators over the columns once loaded.
+        """
+        batch = cls()
+        for data_dict in data_dicts:
+            batch.append_dict(data_dict)
+        if validate:
+            batch.validate()
+        return batch
+
+    @classmethod
+    def from_jsonb(
+        cls,
+        jsonb_data: Union[str, bytes, bytearray, memoryview],
+        validate: bool = True,
+        backend: Optional[str] = None,
+    ) -> "ModelBatch":
+        """Builds a batch from a JSONB array, e.g. the output of ``to_jsonb``."""
+        data_list = JSONBHandler.parse_jsonb(jsonb_data, backend)
+        if not isinstance(data_list, list):
+            raise ValueError("Expected a JSONB array of objects")
+        return cls.from_dicts(data_list, validate)
+
+    @classmethod
+    def from_ndjson(
+        cls, fileobj: PathOrFile, validate: bool = True, backend: Optional[str] = None
+    ) -> "ModelBatch":
+        """Builds a batch from newline-delimited JSONB records, see ``iter_jsonb``."""
+        return cls.from_dicts(iter_records(fileobj, backend), validate)
+
+    def append(self, model: BaseModel) -> None:
+        """Appends the field values of a model instance as a new row."""
+        values = {}
+        for field in self._plan.fields:
+            try:
+                value = getattr(model, field.name)
+            except AttributeError:
+                continue  # Filled in by append_dict, or reported as missing
+            values[field.name] = (
+                value if field.encoder is None else field.encoder(value)
+            )
+        self.append_dict(values)
+
+    def append_dict(self, data_dict: dict) -> None:
+        """Appends a row from a parsed JSON object, filling in defaults."""
+        row = []
+        for field in self._plan.fields:
+            if field.name in data_dict:
+                row.append((field.name, data_dict[field.name]))
+            elif field.default_factory is not None:
+                row.append((field.name, field.default_factory()))
+            else:
+                raise ValueError(f"Missing required field '{field.name}'")
+        # Rows are added only once every value is known to be present
+        for index, (name, value) in enumerate(row):
+            try:
+                self._columns[name].append(value)
+            except OverflowError:
+                # Integers beyond 64 bits: keep this column as a plain list
+                self._columns[name] = list(self._columns[name])
+                self._columns[name].append(value)
+            except TypeError:
+                for undo_name, _ in row[:index]:
+                    self._columns[undo_name].pop()
+                raise ValueError(
+                    f"Invalid value {value!r} for field '{name}'"
+                ) from None
+        self._length += 1
+
+    def validate(self, collect_errors: bool = False) -> None:
+        """
+        Runs the ``validation_<field>`` methods of the model over every row.
+
+        Validators are applied one column at a time on a row view, without
+        building model instances.
+
+        :param collect_errors: Raise a single ValidationError listing every
+            failure, as ``field[row]`` entries, instead of the first error.
+        """
+        view = _RowView(self)
+        errors = []
+        for field_name, validation_method in self.model_cls._validators:
+            for index in range(self._length):
+                view._index = index
+                if not collect_errors:
+                    validation_method(view)
+                    continue
+                try:
+                    validation_method(view)
+                except Exception as error:
+                    errors.append((f"{field_name}[{index}]", error))
+        if errors:
+            raise ValidationError(errors)
+
+    def column(self, name: str) -> Union[array, list]:
+        """Returns the storage of a field: an ``array.array`` or a list."""
+        return self._columns[name]
+
+    def _get_value(self, name: str, index: int) -> Any:
+        value = self._columns[name][index]
+        if name in self._bool_columns:
+            return bool(value)
+        return value
+
+    def _python_columns(self) -> List[Iterable]:
+        return [
+            map(bool, column) if name in self._bool_columns else column
+            for name, column in self._columns.items()
+        ]
+
+    def iter_dicts(self) -> Iterator[dict]:
+        """Yields every row as JSON-compatible data, as ``to_dict`` would encode it."""
+        names = tuple(self._columns)
+        for values in zip(*self._python_columns()):
+            yield dict(zip(names, values))
+
+    def get_row(self, index: int, validate: bool = False) -> BaseModel:
+        """Materializes one row as a model instance."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ModelBatch index out of range")
+        row = {name: self._get_value(name, index) for name in self._columns}
+        return self._plan.decode(row, validate)
+
+    def to_models(self) -> List[BaseModel]:
+        decode = self._plan.decode
+        return [decode(row, False) for row in self.iter_dicts()]
+
+    def to_jsonb(self, backend: Optional[str] = None) -> str:
+        """
+        Encodes the rows as a JSONB array straight from the columns.
+
+        The output decodes with ``BaseModel.from_jsonb_many`` and
+        ``ModelBatch.from_jsonb``.
+        """
+        return JSONBHandler.dumps(list(self.iter_dicts()), backend)
+
+    def to_proto_bytes(self) -> bytes:
+        """
+        Encodes the rows in the protobuf binary wire format, as the message
+        ``message <Model>Batch { repeated <Model> items = 1; }``.
+        """
+        from transmutate.proto_wire import (
+            WIRE_LENGTH_DELIMITED,
+            write_varint,
+        )  # Lazy import to avoid circular import
+
+        tag = (1 << 3) | WIRE_LENGTH_DELIMITED
+        writers = []
+        for field, (name, write) in zip(
+            self._plan.fields, self._plan.get_proto_codec()._writers
+        ):
+            column = self._columns[name]
+            if field.decoder is not None:
+                # Nested models are stored encoded; the wire writers need instances
+                column = [field.decoder(value, False) for value in column]
+            writers.append((column, write))
+
+        buffer = bytearray()
+        row = bytearray()
+        for index in range(self._length):
+            row.clear()
+            for column, write in writers:
+                write(row, column[index])
+            buffer.append(tag)
+            write_varint(buffer, len(row))
+            buffer += row
+        return bytes(buffer)
+
+    @classmethod
+    def from_proto_bytes(cls, proto_data: bytes, validate: bool = True):
+        """Decodes the output of ``to_proto_bytes``."""
+        from transmutate.proto_wire import (
+            read_varint,
+            skip_field,
+        )  # Lazy import to avoid circular import
+
+        plan = cls.model_cls._get_plan()
+        codec = plan.get_proto_codec()
+        # Values are stored in the form append() gives them, e.g. enum values
+        # instead of their proto text
+        converters = [
+            (field.name, field.decoder, field.encoder)
+            for field in plan.fields
+            if field.decoder is not None or field.encoder is not None
+        ]
+        data = memoryview(proto_data)
+        records = []
+        pos = 0
+        while pos < len(data):
+            key, pos = read_varint(data, pos)
+            if key >> 3 != 1:
+                pos = skip_field(data, pos, key & 7)
+                continue
+            length, pos = read_varint(data, pos)
+            record = codec.decode_fields(data[pos : pos + length])
+            for name, decoder, encoder in converters:
+                if name in record:
+                    value = record[name]
+                    if decoder is not None:
+                        value = decoder(value, False)
+                    record[name] = value if encoder is None else encoder(value)
+            records.append(record)
+            pos += length
+        if pos != len(data):
+            raise ValueError("Truncated protobuf message")
+        return cls.from_dicts(records, validate)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            batch = type(self)()
+            for name, column in self._columns.items():
+                batch._columns[name] = column[index]
+            batch._length = len(range(*index.indices(self._length)))
+            return batch
+        return self.get_row(index)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        decode = self._plan.decode
+        for row in self.iter_dicts():
+            yield decode(row, False)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._length} rows)"
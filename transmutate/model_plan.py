@@ -0,0 +1,576 @@
+from dataclasses import MISSING, Field, is_dataclass
+from inspect import getattr_static
+from types import MemberDescriptorType
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+)
+from typing import get_args, get_origin, get_type_hints
+
+from transmutate.base_model import BaseModel, skip_validations
+from transmutate.lazy import LazyModel
+from transmutate.tracking import ChangeTracking, encode_tracked
+from transmutate.type_registry import get_type_codec
+
+# Values of these types are already JSON-compatible and are passed through as-is
+PASSTHROUGH_TYPES = (int, float, str, bool, type(None))
+
+
+class _NonFiniteFloat(float):
+    # Marks NaN and infinities in encoded data. JSON backends that cannot
+    # write them, such as orjson which writes null, reject this subclass and
+    # fall back to the stdlib encoder, without searching the data for them
+    __slots__ = ()
+
+
+def _encode_float(value: Any) -> Any:
+    # x - x is 0.0 for finite floats only
+    if type(value) is float and value - value != 0.0:
+        return _NonFiniteFloat(value)
+    return value
+
+
+def encode_value(value: Any) -> Any:
+    """
+    Generic recursive encoder used for values the class plan cannot specialize.
+
+    Models found along the way are handed over to their own compiled plan and
+    values of registered types (see ``type_registry``) to their codec.
+    """
+    value_type = type(value)
+    if value_type in PASSTHROUGH_TYPES:
+        if value_type is float and value - value != 0.0:
+            return _NonFiniteFloat(value)
+        return value
+    elif isinstance(value, BaseModel):
+        return value._get_plan().encode(value)
+    codec = get_type_codec(type(value))
+    if codec is not None:
+        return codec[0](value)
+    elif hasattr(value, "__dict__"):
+        return {key: encode_value(item) for key, item in value.__dict__.items()}
+    elif isinstance(value, list):
+        return [encode_value(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    elif isinstance(value, (set, frozenset)):
+        return _encode_set(value, encode_value)
+    else:
+        return value
+
+
+def resolve_fields(model_cls) -> Dict[str, Any]:
+    """
+    Returns the annotated fields of a model class, including inherited ones.
+
+    :param model_cls: The BaseModel subclass to inspect.
+    :return: Mapping of field name to type hint, in declaration order.
+    """
+    try:
+        hints = get_type_hints(model_cls)
+    except (NameError, TypeError):
+        # Unresolvable forward references: fall back to the raw annotations
+        hints = {}
+        for klass in reversed(model_cls.__mro__):
+            hints.update(klass.__dict__.get("__annotations__", {}))
+    return {
+        name: field_type
+        for name, field_type in hints.items()
+        if get_origin(field_type) is not ClassVar
+        and not (isinstance(field_type, str) and field_type.startswith("ClassVar"))
+    }
+
+
+def is_model_type(field_type: Any) -> bool:
+    return isinstance(field_type, type) and issubclass(field_type, BaseModel)
+
+
+def unwrap_optional(field_type: Any) -> Tuple[Any, bool]:
+    """
+    Strips ``Optional[...]`` from a type hint.
+
+    :return: The inner type and whether the hint was optional.
+    """
+    if get_origin(field_type) is Union:
+        args = [arg for arg in get_args(field_type) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return field_type, False
+
+
+def _encode_model(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value._get_plan().encode(value)
+    # None, or plain data such as a dict assigned to a model field
+    return encode_value(value)
+
+
+def _encode_set(value, item_encoder) -> list:
+    try:
+        # Sorted so equal sets always have the same encoding
+        items = sorted(value)
+    except TypeError:
+        items = list(value)
+    if item_encoder is None:
+        return items
+    return [item_encoder(item) for item in items]
+
+
+def _type_encoder(encode) -> Callable[[Any], Any]:
+    def encode_registered(value):
+        if value is None:
+            return None
+        return encode(value)
+
+    return encode_registered
+
+
+def _type_decoder(field_type, decode) -> Callable[[Any, bool], Any]:
+    def decode_registered(value, validate):
+        if value is None or isinstance(value, field_type):
+            return value
+        return decode(value)
+
+    return decode_registered
+
+
+def build_encoder(field_type: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Builds an encoder specialized for a field type hint.
+
+    :param field_type: The type hint of the field.
+    :return: A callable encoding a single value, or None when values of this
+        type can be passed through unchanged.
+    """
+    field_type, _ = unwrap_optional(field_type)
+    if field_type is float:
+        return _encode_float
+    if field_type in PASSTHROUGH_TYPES:
+        return None
+    if is_model_type(field_type):
+        return _encode_model
+    codec = get_type_codec(field_type)
+    if codec is not None:
+        return _type_encoder(codec[0])
+
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+    if origin in (set, frozenset) or field_type in (set, frozenset):
+        item_encoder = build_encoder(args[0]) if args else encode_value
+
+        def encode_set(value):
+            if value is None:
+                return None
+            return _encode_set(value, item_encoder)
+
+        return encode_set
+    if origin is Union:
+        if all(arg in PASSTHROUGH_TYPES for arg in args):
+            return _encode_float if float in args else None
+        return encode_value
+    if origin is list:
+        item_encoder = build_encoder(args[0]) if args else encode_value
+        if item_encoder is None:
+            return None
+
+        def encode_list(value):
+            if value is None:
+                return None
+            return [item_encoder(item) for item in value]
+
+        return encode_list
+    if origin is dict:
+        value_encoder = build_encoder(args[1]) if args else encode_value
+        if value_encoder is None:
+            return None
+
+        def encode_dict(value):
+            if value is None:
+                return None
+            return {key: value_encoder(item) for key, item in value.items()}
+
+        return encode_dict
+
+    # Any, unknown classes and unsupported generics use the generic path
+    return encode_value
+
+
+def _decode_model_as(
+    model_cls, fields: Optional[FrozenSet[str]] = None
+) -> Callable[[Any, bool], Any]:
+    if fields is not None:
+        decode = model_cls._get_plan().project(fields).decode
+
+        def decode_projected(value, validate):
+            if not isinstance(value, dict):
+                return value
+            return decode(value, validate)
+
+        return decode_projected
+
+    def decode_model(value, validate):
+        if not isinstance(value, dict):
+            # None, or an already constructed model instance
+            return value
+        return model_cls._get_plan().decode(value, validate)
+
+    return decode_model
+
+
+def build_decoder(
+    field_type: Any, fields: Optional[FrozenSet[str]] = None
+) -> Optional[Callable[[Any, bool], Any]]:
+    """
+    Builds a decoder turning parsed JSON data back into a field value.
+
+    :param field_type: The type hint of the field.
+    :param fields: Dotted paths to keep from the nested models, see
+        ``ModelPlan.project``. None keeps them whole.
+    :return: A callable taking the value and whether nested models should be
+        validated, or None when parsed values can be used as-is.
+    """
+    field_type, _ = unwrap_optional(field_type)
+    if field_type in PASSTHROUGH_TYPES:
+        return None
+    if is_model_type(field_type):
+        return _decode_model_as(field_type, fields)
+    codec = get_type_codec(field_type)
+    if codec is not None:
+        return _type_decoder(field_type, codec[1])
+
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+    if origin in (set, frozenset) or field_type in (set, frozenset):
+        item_decoder = build_decoder(args[0], fields) if args else None
+        set_type = origin or field_type
+
+        def decode_set(value, validate):
+            if value is None:
+                return None
+            if item_decoder is None:
+                return set_type(value)
+            return set_type(item_decoder(item, validate) for item in value)
+
+        return decode_set
+    if origin is list and args:
+        item_decoder = build_decoder(args[0], fields)
+        if item_decoder is None:
+            return None
+
+        def decode_list(value, validate):
+            if value is None:
+                return None
+            return [item_decoder(item, validate) for item in value]
+
+        return decode_list
+    if origin is dict and args:
+        value_decoder = build_decoder(args[1], fields)
+        if value_decoder is None:
+            return None
+
+        def decode_dict(value, validate):
+            if value is None:
+                return None
+            return {key: value_decoder(item, validate) for key, item in value.items()}
+
+        return decode_dict
+
+    return None
+
+
+def resolve_default_factory(model_cls, name: str, optional: bool):
+    """
+    Finds how to fill in a field missing from the input data.
+
+    Dataclass fields, plain class attributes and ``dataclasses.field()``
+    declarations on non-dataclass models are all honoured; optional fields
+    without a default become None.
+
+    :return: A zero-argument callable producing the default, or None when the
+        field is required.
+    """
+    default = MISSING
+    dataclass_fields = getattr(model_cls, "__dataclass_fields__", {})
+    if name in dataclass_fields:
+        default = dataclass_fields[name]
+    else:
+        for klass in model_cls.__mro__:
+            if name in klass.__dict__:
+                default = klass.__dict__[name]
+                break
+
+    if isinstance(default, MemberDescriptorType):
+        # Field stored in __slots__: ModelMeta moved its default aside
+        default = model_cls._slot_defaults.get(name, MISSING)
+
+    if isinstance(default, Field):
+        if default.default_factory is not MISSING:
+            return default.default_factory
+        default = default.default
+    if default is not MISSING:
+        return lambda: default
+    if optional:
+        return lambda: None
+    return None
+
+
+class FieldPlan:
+    __slots__ = ("name", "number", "type", "encoder", "decoder", "default_factory")
+
+    def __init__(self, model_cls, name: str, number: int, field_type: Any):
+        self.name = name
+        self.number = number
+        self.type = field_type
+        self.encoder = build_encoder(field_type)
+        self.decoder = build_decoder(field_type)
+        self.default_factory = resolve_default_factory(
+            model_cls, name, unwrap_optional(field_type)[1]
+        )
+
+
+class ModelPlan:
+    """
+    Serialization plan compiled once per BaseModel subclass from its annotations.
+
+    Plans are cached on the class by ``BaseModel._get_plan`` and reused by every
+    ``to_json``/``to_jsonb`` and ``from_dict`` call.
+    """
+
+    def __init__(self, model_cls):
+        self.model_cls = model_cls
+        self.fields = tuple(
+            FieldPlan(model_cls, name, number, field_type)
+            for number, (name, field_type) in enumerate(
+                resolve_fields(model_cls).items(), start=1
+            )
+        )
+        self._field_names = frozenset(field.name for field in self.fields)
+        self._encoders = {field.name: field.encoder for field in self.fields}
+        # Only fields whose values need converting are visited on encode
+        self._converters = tuple(
+            (field.name, field.encoder)
+            for field in self.fields
+            if field.encoder is not None
+        )
+        dataclass_fields = getattr(model_cls, "__dataclass_fields__", {})
+        self._decoders = tuple(
+            (field.name, field.decoder, field.default_factory)
+            for field in self.fields
+            if field.name not in dataclass_fields or dataclass_fields[field.name].init
+        )
+        # BaseModel.__init__ only assigns attributes, so it can be bypassed.
+        # Tracked models built this way start without recorded changes.
+        self._tracked = issubclass(model_cls, ChangeTracking)
+        self._direct_init = model_cls.__init__ is BaseModel.__init__ and (
+            model_cls.__setattr__ is object.__setattr__ or self._tracked
+        )
+        # Generated dataclass __init__ methods validate through __post_init__
+        self._validates_on_init = is_dataclass(model_cls)
+        # Fields stored in __slots__ are not part of the instance __dict__
+        self._slot_fields = tuple(
+            field.name
+            for field in self.fields
+            if isinstance(
+                getattr_static(model_cls, field.name, None), MemberDescriptorType
+            )
+        )
+        self._has_dict = model_cls.__dictoffset__ != 0
+        self._dict_only = self._has_dict and not self._slot_fields
+        self._proto_codec = None
+        self._lazy_field_table = None  # See transmutate.lazy
+        self._projections: Dict[FrozenSet[str], ProjectedPlan] = {}
+
+    def get_attributes(self, obj: Any) -> dict:
+        """Returns a shallow dictionary of the attributes set on a model instance."""
+        result = {}
+        for name in self._slot_fields:
+            try:
+                result[name] = getattr(obj, name)
+            except AttributeError:
+                pass  # Unset slot
+        if self._has_dict:
+            result.update(obj.__dict__)
+        return result
+
+    def encode(self, obj: Any) -> dict:
+        """
+        Converts a model instance into JSON-compatible data.
+
+        Attributes without an annotation fall back to the generic encoder.
+        Tracked models only re-encode their changed attributes.
+        """
+        if type(obj) is LazyModel:
+            obj = obj.materialize()
+        if self._tracked:
+            return encode_tracked(self, obj)
+        return self.encode_all(obj)
+
+    def encode_all(self, obj: Any) -> dict:
+        """Converts every attribute of a model instance, see ``encode``."""
+        if self._dict_only:
+            result = obj.__dict__.copy()
+        else:
+            result = self.get_attributes(obj)
+        if not self._field_names.issuperset(result):
+            for key in result.keys() - self._field_names:
+                result[key] = encode_value(result[key])
+        for name, encoder in self._converters:
+            if name in result:
+                result[name] = encoder(result[name])
+        return result
+
+    def encode_field(self, name: str, value: Any) -> Any:
+        """Converts the value of a single attribute, as ``encode`` does."""
+        encoder = self._encoders.get(name, encode_value)
+        return value if encoder is None else encoder(value)
+
+    def project(self, fields: Iterable[str]) -> "ProjectedPlan":
+        """
+        Returns the decoding plan keeping only some fields, compiled on first use.
+
+        :param fields: Field names, or dotted paths into nested models such as
+            ``"customer.person.name"``.
+        """
+        key = frozenset(fields)
+        projection = self._projections.get(key)
+        if projection is None:
+            projection = self._projections[key] = ProjectedPlan(self, key)
+        return projection
+
+    def get_proto_codec(self):
+        """Returns the protobuf binary codec of the model, compiled on first use."""
+        if self._proto_codec is None:
+            from transmutate.proto_wire import (
+                ProtoCodec,
+            )  # Lazy import to avoid circular import
+
+            self._proto_codec = ProtoCodec(self)
+        return self._proto_codec
+
+    def decode(self, data: dict, validate: bool = True) -> Any:
+        """
+        Builds a model instance, including nested models, from parsed data.
+
+        :param data: Dictionary as produced by ``json.loads``.
+        :param validate: Run the ``validation_<field>`` methods.
+        :return: An instance of the planned model class.
+        """
+        values = {}
+        for name, decoder, default_factory in self._decoders:
+            if name in data:
+                value = data[name]
+                values[name] = value if decoder is None else decoder(value, validate)
+            elif default_factory is not None:
+                values[name] = default_factory()
+            else:
+                raise ValueError(f"Missing required field '{name}'")
+        return self.build(values, validate)
+
+    def build(self, values: dict, validate: bool = True) -> Any:
+        """
+        Builds a model instance from already decoded field values, as ``decode``.
+
+        :param values: Field name to value mapping, owned by the callee.
+        """
+        if not validate and self._validates_on_init:
+            # The generated __init__ still runs, with its defaults and
+            # __post_init__; only BaseModel's validations are skipped
+            with skip_validations():
+                obj = self.model_cls(**values)
+            if self._tracked:
+                obj.mark_clean()
+            return obj
+        if self._direct_init:
+            obj = self.model_cls.__new__(self.model_cls)
+            if self._dict_only:
+                obj.__dict__.update(values)
+            else:
+                for name, value in values.items():
+                    object.__setattr__(obj, name, value)
+        else:
+            obj = self.model_cls(**values)
+            if self._tracked:
+                obj.mark_clean()
+            if self._validates_on_init:
+                return obj
+        if validate:
+            obj.run_validations()
+        return obj
+
+
+class ProjectedPlan:
+    """
+    Decoding plan keeping a subset of the fields of a model, see ``ModelPlan.project``.
+
+    Instances are built without calling ``__init__`` and only have the kept
+    fields set. Fields left out are neither decoded, defaulted nor validated,
+    and only the ``validation_<field>`` methods of kept fields are run.
+    """
+
+    def __init__(self, plan: ModelPlan, fields: FrozenSet[str]):
+        model_cls = plan.model_cls
+        self.model_cls = model_cls
+        decoded_names = {name for name, _, _ in plan._decoders}
+        # Field name -> nested paths, None when the whole field is kept
+        nested: Dict[str, Optional[set]] = {}
+        for path in fields:
+            name, _, rest = path.partition(".")
+            if name not in decoded_names:
+                raise ValueError(
+                    f"Unknown field '{name}' in projection of {model_cls.__name__}"
+                )
+            if not rest:
+                nested[name] = None
+            elif nested.get(name, set()) is not None:
+                nested.setdefault(name, set()).add(rest)
+
+        decoders = []
+        for field in plan.fields:
+            if field.name not in nested:
+                continue
+            paths = nested[field.name]
+            if paths is None:
+                decoder = field.decoder
+            else:
+                decoder = build_decoder(field.type, frozenset(paths))
+                if decoder is None:
+                    raise ValueError(
+                        f"Field '{field.name}' of {model_cls.__name__} "
+                        "holds no nested model to project"
+                    )
+            decoders.append((field.name, decoder, field.default_factory))
+        self._decoders = tuple(decoders)
+        self._validators = tuple(
+            (name, method) for name, method in model_cls._validators if name in nested
+        )
+        self._dict_only = plan._dict_only
+
+    def decode(self, data: dict, validate: bool = True) -> Any:
+        """Builds a partial model instance from parsed data, as ``ModelPlan.decode``."""
+        values = {}
+        for name, decoder, default_factory in self._decoders:
+            if name in data:
+                value = data[name]
+                values[name] = value if decoder is None else decoder(value, validate)
+            elif default_factory is not None:
+                values[name] = default_factory()
+            else:
+                raise ValueError(f"Missing required field '{name}'")
+
+        obj = self.model_cls.__new__(self.model_cls)
+        if self._dict_only:
+            obj.__dict__.update(values)
+        else:
+            for name, value in values.items():
+                object.__setattr__(obj, name, value)
+        if validate:
+            for _, validation_method in self._validators:
+                validation_method(obj)
+        return obj
@@ -0,0 +1,125 @@
+import gzip
+import io
+import os
+from typing import IO, Iterable, Iterator, Optional, Type, Union
+
+from transmutate.base_model import BaseModel
+from transmutate.jsonb_handler import JSONBHandler
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+PathOrFile = Union[str, os.PathLike, IO]
+
+
+def open_ndjson(path: Union[str, os.PathLike], mode: str = "rb") -> IO:
+    """
+    Opens an NDJSON file, transparently handling gzip compression.
+
+    Files ending in ``.gz`` are always treated as gzip; when reading, other
+    files are sniffed for the gzip magic bytes.
+
+    :param path: Path of the file.
+    :param mode: ``"rb"`` to read, ``"wb"`` to write or ``"ab"`` to append.
+    """
+    if os.fspath(path).endswith(".gz"):
+        return gzip.open(path, mode)
+    file = open(path, mode)
+    if "r" in mode and file.peek(2)[:2] == GZIP_MAGIC:
+        # GzipFile does not close a file object it was given
+        file.close()
+        return gzip.open(path, mode)
+    return file
+
+
+def iter_records(fileobj: PathOrFile, backend: Optional[str] = None) -> Iterator:
+    """
+    Lazily parses newline-delimited JSONB records without building models.
+
+    :param fileobj: Path or open text/binary file. Binary files may be gzip'd.
+    :param backend: Name of the JSON backend, None for the default one.
+    """
+    if isinstance(fileobj, (str, os.PathLike)):
+        with open_ndjson(fileobj, "rb") as file:
+            yield from iter_records(file, backend)
+        return
+
+    peek = getattr(fileobj, "peek", None)
+    if peek is not None and not isinstance(fileobj, gzip.GzipFile):
+        if peek(2)[:2] == GZIP_MAGIC:
+            # Closes the decompressor only; the caller owns fileobj
+            with gzip.GzipFile(fileobj=fileobj, mode="rb") as file:
+                yield from iter_records(file, backend)
+            return
+
+    for line in fileobj:
+        if line.strip():
+            yield JSONBHandler.parse_jsonb(line, backend)
+
+
+def iter_jsonb(
+    fileobj: PathOrFile,
+    model_cls: Type[BaseModel],
+    validate: bool = True,
+    backend: Optional[str] = None,
+) -> Iterator[BaseModel]:
+    """
+    Lazily decodes newline-delimited JSONB records into models.
+
+    Only one line is held in memory at a time, whatever the size of the file.
+
+    :param fileobj: Path or open text/binary file. Binary files may be gzip'd.
+    :param model_cls: BaseModel subclass to build for every record.
+    :param validate: Run the model validators on every record.
+    :param backend: Name of the JSON backend, None for the default one.
+    """
+    decode = model_cls._get_plan().decode
+    for record in iter_records(fileobj, backend):
+        yield decode(record, validate)
+
+
+def write_jsonb(
+    fileobj: PathOrFile,
+    models: Iterable[BaseModel],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    backend: Optional[str] = None,
+) -> int:
+    """
+    Writes models as newline-delimited JSONB records.
+
+    Encoded records are collected until ``buffer_size`` bytes (characters for
+    text files) are pending and then written with a single call, so memory
+    stays bounded by the buffer.
+
+    :param fileobj: Path (``.gz`` paths are gzip'd) or open text/binary file.
+    :param models: Any iterable of models, e.g. a generator.
+    :param buffer_size: Amount of pending output that triggers a write.
+    :param backend: Name of the JSON backend, None for the default one.
+    :return: The number of records written.
+    """
+    if isinstance(fileobj, (str, os.PathLike)):
+        with open_ndjson(fileobj, "wb") as file:
+            return write_jsonb(file, models, buffer_size, backend)
+
+    if isinstance(fileobj, io.TextIOBase):
+        dumps, newline, empty = JSONBHandler.dumps, "\n", ""
+    else:
+        dumps, newline, empty = JSONBHandler.dumps_bytes, b"\n", b""
+
+    count = 0
+    pending = []
+    pending_size = 0
+    for model in models:
+        line = dumps(model._get_plan().encode(model), backend)
+        pending.append(line)
+        pending.append(newline)
+        pending_size += len(line) + 1
+        count += 1
+        if pending_size >= buffer_size:
+            fileobj.write(empty.join(pending))
+            pending.clear()
+            pending_size = 0
+    if pending:
+        fileobj.write(empty.join(pending))
+    return count
@@ -0,0 +1,320 @@
+"""
+Bulk encoding and decoding of model collections across a process pool.
+
+Inputs are split in chunks which are converted by worker processes, so
+converting millions of records uses every core instead of one. Results come
+back in input order, through iterators that keep a bounded number of chunks
+in flight:
+
+    with ParallelConverter() as converter:
+        for data in converter.encode(people):
+            output.write(data)
+        print(converter.throughput)
+
+Models travel as their JSON data, payloads as bytes, pickled once per chunk.
+Model classes must be importable by the worker processes.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from os import cpu_count
+from typing import Iterable, Iterator, List, Optional, Type
+
+from transmutate.base_model import BaseModel
+from transmutate.framing import decode_model, encode_model
+from transmutate.json_handler import JSONHandler
+from transmutate.jsonb_handler import JSONBHandler
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class Throughput:
+    """Records and payload bytes converted, and the time it took."""
+
+    records: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_sec(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.records:,} records in {self.seconds:.2f} s "
+            f"({self.records_per_sec:,.0f} records/s, "
+            f"{self.megabytes_per_sec:,.1f} MB/s)"
+        )
+
+
+def _encode_chunk(models: list, payload: str, backend: Optional[str]) -> List[bytes]:
+    return [encode_model(model, payload, backend) for model in models]
+
+
+def _encode_records_chunk(
+    records: list, payload: str, backend: Optional[str]
+) -> List[bytes]:
+    if payload == "jsonb":
+        return [JSONBHandler.dumps_bytes(data, backend) for _, data in records]
+    elif payload == "json":
+        return [JSONHandler.dumps(data, backend).encode("utf-8") for _, data in records]
+    # The data comes from valid instances, so it is not validated again
+    return [
+        encode_model(model_cls.from_dict(data, validate=False), payload, backend)
+        for model_cls, data in records
+    ]
+
+
+def _model_records(models: Iterable[BaseModel]) -> Iterator[tuple]:
+    # Instances are not pickled as such: the state of tracked models, with
+    # its cached outputs, would be sent along
+    for model in models:
+        model_cls = model.__class__
+        yield model_cls, model_cls._get_plan().encode(model)
+
+
+def _decode_chunk(
+    payloads: list,
+    model_cls: Type[BaseModel],
+    payload: str,
+    validate: bool,
+    backend: Optional[str],
+) -> list:
+    return [
+        decode_model(model_cls, data, payload, validate, backend) for data in payloads
+    ]
+
+
+def _convert_chunk(
+    payloads: list,
+    model_cls: Type[BaseModel],
+    source: str,
+    target: str,
+    validate: bool,
+    backend: Optional[str],
+) -> List[bytes]:
+    return [
+        encode_model(
+            decode_model(model_cls, data, source, validate, backend), target, backend
+        )
+        for data in payloads
+    ]
+
+
+def _iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _payload_bytes(data) -> bytes:
+    # memoryview slices, e.g. from FrameDecoder, cannot be pickled
+    return bytes(data) if isinstance(data, memoryview) else data
+
+
+class ParallelConverter:
+    """
+    Converts models in chunks on a process pool, preserving input order.
+
+    :param processes: Number of worker processes; None uses one per CPU and 1
+        converts in the current process, without a pool.
+    :param chunk_size: Records sent to a worker at once.
+    :param window: Maximum number of chunks in flight; by default twice the
+        number of processes. Memory use is bounded by ``window * chunk_size``
+        records whatever the input size.
+    :param executor: Executor to use instead of creating a process pool; it
+        is not shut down by ``close()``.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        window: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.processes = processes or cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.window = window or 2 * self.processes
+        self.throughput = Throughput()
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None and self.processes > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def _map_chunks(self, function, chunks: Iterator[list], *args) -> Iterator[list]:
+        executor = self._get_executor()
+        if executor is None:
+            for chunk in chunks:
+                yield function(chunk, *args)
+            return
+
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(function, chunk, *args))
+                if len(pending) >= self.window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # The consumer stopped early or a chunk failed
+            for future in pending:
+                future.cancel()
+
+    def encode(
+        self,
+        models: Iterable[BaseModel],
+        payload: str = "jsonb",
+        backend: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """
+        Lazily encodes models, in order.
+
+        :param payload: ``"jsonb"`` or ``"proto"``, see ``framing.encode_model``.
+        :return: Iterator over the encoded payloads.
+        """
+        throughput = self.throughput
+        function = _encode_chunk
+        if self._get_executor() is not None:
+            function = _encode_records_chunk
+            models = _model_records(models)
+        start = time.perf_counter()
+        for encoded in self._map_chunks(
+            function, _iter_chunks(models, self.chunk_size), payload, backend
+        ):
+            throughput.records += len(encoded)
+            throughput.bytes += sum(map(len, encoded))
+            throughput.seconds += time.perf_counter() - start
+            yield from encoded
+            start = time.perf_counter()
+
+    def _measured_chunks(self, payloads: Iterable, sizes: deque) -> Iterator[list]:
+        # Sizes are taken on the way in, payloads do not come back
+        if self._get_executor() is not None:
+            payloads = map(_payload_bytes, payloads)
+        for chunk in _iter_chunks(payloads, self.chunk_size):
+            sizes.append(sum(map(len, chunk)))
+            yield chunk
+
+    def decode(
+        self,
+        model_cls: Type[BaseModel],
+        payloads: Iterable,
+        payload: str = "jsonb",
+        validate: bool = True,
+        backend: Optional[str] = None,
+    ) -> Iterator[BaseModel]:
+        """
+        Lazily decodes payloads into models, in order.
+
+        :param payloads: Encoded records as bytes, str or memoryview objects.
+        :param payload: ``"jsonb"`` or ``"proto"``, see ``framing.decode_model``.
+        :return: Iterator over the decoded models.
+        """
+        throughput = self.throughput
+        sizes = deque()
+        start = time.perf_counter()
+        for decoded in self._map_chunks(
+            _decode_chunk,
+            self._measured_chunks(payloads, sizes),
+            model_cls,
+            payload,
+            validate,
+            backend,
+        ):
+            throughput.records += len(decoded)
+            throughput.bytes += sizes.popleft()
+            throughput.seconds += time.perf_counter() - start
+            yield from decoded
+            start = time.perf_counter()
+
+    def convert(
+        self,
+        model_cls: Type[BaseModel],
+        payloads: Iterable,
+        source: str = "jsonb",
+        target: str = "proto",
+        validate: bool = True,
+        backend: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """
+        Lazily converts payloads from one encoding to another, in order.
+
+        Records are decoded and re-encoded by the same worker, so no model
+        crosses process boundaries. Throughput counts the input bytes.
+
+        :param source: Encoding of ``payloads``, see ``framing.decode_model``.
+        :param target: Encoding of the results, see ``framing.encode_model``.
+        """
+        throughput = self.throughput
+        sizes = deque()
+        start = time.perf_counter()
+        for converted in self._map_chunks(
+            _convert_chunk,
+            self._measured_chunks(payloads, sizes),
+            model_cls,
+            source,
+            target,
+            validate,
+            backend,
+        ):
+            throughput.records += len(converted)
+            throughput.bytes += sizes.popleft()
+            throughput.seconds += time.perf_counter() - start
+            yield from converted
+            start = time.perf_counter()
+
+    def close(self) -> None:
+        """Shuts down the process pool created by the converter."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def encode_many(
+    models: Iterable[BaseModel],
+    payload: str = "jsonb",
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: Optional[str] = None,
+) -> List[bytes]:
+    """Encodes a collection of models across a process pool, see ParallelConverter."""
+    with ParallelConverter(processes, chunk_size) as converter:
+        return list(converter.encode(models, payload, backend))
+
+
+def decode_many(
+    model_cls: Type[BaseModel],
+    payloads: Iterable,
+    payload: str = "jsonb",
+    validate: bool = True,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: Optional[str] = None,
+) -> list:
+    """Decodes a collection of payloads across a process pool, see ParallelConverter."""
+    with ParallelConverter(processes, chunk_size) as converter:
+        return list(converter.decode(model_cls, payloads, payload, validate, backend))
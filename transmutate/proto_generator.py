@@ -1,6 +1,45 @@
+import hashlib
+import json
 import os
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
 from transmutate import Service
+from transmutate.Services import get_message_definition
+from transmutate.model_plan import is_model_type
+from transmutate.proto_handler import collect_messages
+
+# Content hashes of the files written by ProtoGenerator.build, per output_dir
+MANIFEST_FILE_NAME = ".proto_manifest.json"
+
+
+@dataclass
+class BuildReport:
+    written: List[str] = field(default_factory=list)  # Paths of rewritten files
+    skipped: List[str] = field(default_factory=list)  # Paths left untouched
+
+
+def _render_proto(generator: "ProtoGenerator") -> Tuple[str, str]:
+    # Runs in the worker processes of ProtoGenerator.build
+    return generator.proto_file_path, generator.generate_proto_content()
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(output_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE_NAME)) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(output_dir: str, manifest: Dict[str, str]):
+    with open(os.path.join(output_dir, MANIFEST_FILE_NAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True)
 
 
 class ProtoGenerator:
@@ -21,14 +60,77 @@ class ProtoGenerator:
         """
         Generates the proto file content and writes it to the specified output directory.
         """
-        proto_content = (
-            self._generate_header()
-            + self._generate_service()
-            + self._generate_messages()
-        )
+        proto_content = self.generate_proto_content()
         self._write_proto_file(proto_content)
         print(f"Proto file generated: {self.proto_file_path}")
 
+    def generate_proto_content(self) -> str:
+        """
+        Generates the complete proto file content without writing it.
+
+        :return: Proto file content as a string.
+        """
+        return "".join(
+            (
+                self._generate_header(),
+                self._generate_service(),
+                self._generate_messages(),
+            )
+        )
+
+    @staticmethod
+    def build(
+        generators: Iterable["ProtoGenerator"], processes: Optional[int] = None
+    ) -> BuildReport:
+        """
+        Generates the proto files of many generators, rewriting only changed ones.
+
+        Contents are rendered across a process pool. Their SHA-256 hashes are
+        compared with the manifest kept in every output directory, so files
+        whose content did not change are not written again (and keep their
+        modification time for downstream ``protoc`` steps).
+
+        :param generators: ProtoGenerator instances, e.g. one per package.
+            Their models must be importable by the worker processes.
+        :param processes: Number of worker processes; None uses one per CPU and
+            1 renders in the current process.
+        :return: A BuildReport listing the written and skipped paths.
+        """
+        generators = list(generators)
+        if processes == 1 or len(generators) < 2:
+            rendered = [_render_proto(generator) for generator in generators]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                rendered = list(executor.map(_render_proto, generators))
+
+        report = BuildReport()
+        manifests = {}
+        changed_dirs = set()
+        for generator, (proto_file_path, content) in zip(generators, rendered):
+            output_dir = generator.output_dir
+            if output_dir not in manifests:
+                manifests[output_dir] = _load_manifest(output_dir)
+            manifest = manifests[output_dir]
+            file_name = os.path.basename(proto_file_path)
+            content_hash = _content_hash(content)
+            if manifest.get(file_name) == content_hash and os.path.exists(
+                proto_file_path
+            ):
+                report.skipped.append(proto_file_path)
+                continue
+            generator._write_proto_file(content)
+            manifest[file_name] = content_hash
+            changed_dirs.add(output_dir)
+            report.written.append(proto_file_path)
+
+        for output_dir in changed_dirs:
+            _save_manifest(output_dir, manifests[output_dir])
+        print(
+            f"Proto files generated: {len(report.written)}, "
+            f"unchanged: {len(report.skipped)}"
+        )
+        return report
+
     def _generate_header(self) -> str:
         """
         Generates the header for the proto file.
@@ -49,7 +151,7 @@ package {self.service_name.lower()};
 
         :return: Service definition content as a string.
         """
-        service_content = f"service {self.service_name} {{\n"
+        service_content = [f"service {self.service_name} {{\n"]
 
         for service in self.services:
             request_message_name = (
@@ -71,43 +173,46 @@ package {self.service_name.lower()};
                 )  # Get the template directly from the enum
 
                 if rpc_definition:
-                    service_content += rpc_definition.format(
-                        method_name=method_name,
-                        request_message=request_message_name,
-                        response_message=response_message_name,
+                    service_content.append(
+                        rpc_definition.format(
+                            method_name=method_name,
+                            request_message=request_message_name,
+                            response_message=response_message_name,
+                        )
                     )
 
-        service_content += "}\n\n"
-        return service_content
+        service_content.append("}\n\n")
+        return "".join(service_content)
 
     def _generate_messages(self) -> str:
         """
-        Generates message definitions for requests and responses using the to_proto function.
+        Generates message definitions for requests and responses from the class schemas.
+
+        Nested messages are emitted before the messages using them, and every
+        message only once across all services.
 
         :return: Message definitions as a string.
         """
-        messages_content = "// Request and response messages\n\n"
+        messages_content = ["// Request and response messages\n\n"]
 
         unique_messages = set()
 
         for service in self.services:
-            if (
-                service.request_dataclass
-                and service.request_dataclass.__name__ not in unique_messages
-            ):
-                unique_messages.add(service.request_dataclass.__name__)
-                request_instance = service.request_dataclass()
-                messages_content += request_instance.to_proto() + "\n\n"
-
-            if (
-                service.response_dataclass
-                and service.response_dataclass.__name__ not in unique_messages
-            ):
-                unique_messages.add(service.response_dataclass.__name__)
-                response_instance = service.response_dataclass()
-                messages_content += response_instance.to_proto() + "\n\n"
-
-        return messages_content
+            for message_type in (service.request_dataclass, service.response_dataclass):
+                if not message_type or message_type.__name__ in unique_messages:
+                    continue
+                if not is_model_type(message_type):
+                    unique_messages.add(message_type.__name__)
+                    messages_content.append(get_message_definition(message_type))
+                    messages_content.append("\n\n")
+                    continue
+                for name, definition in collect_messages(message_type):
+                    if name not in unique_messages:
+                        unique_messages.add(name)
+                        messages_content.append(definition)
+                        messages_content.append("\n\n")
+
+        return "".join(messages_content)
 
     def _write_proto_file(self, content: str):
         """
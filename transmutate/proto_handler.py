@@ -1,58 +1,153 @@
-from typing import Optional
+from typing import List, Tuple, Union, get_args, get_origin
+
+from transmutate.base_model import ModelMeta
+from transmutate.model_plan import is_model_type, resolve_fields, unwrap_optional
+
+# Python types with a direct proto3 equivalent; anything else is sent as a string
+PROTO_TYPE_MAPPING = {
+    int: "int32",
+    float: "double",  # Python floats are 64-bit
+    str: "string",
+    bool: "bool",
+    list: "repeated",
+    dict: "map",
+    # Add more types as needed
+}
+
+
+def get_proto_type(field_type, nested_types: list, type_mapping=PROTO_TYPE_MAPPING):
+    """
+    Returns the proto3 type of a field type hint.
+
+    :param field_type: The type hint of the field.
+    :param nested_types: Model classes referenced by the type are appended here.
+    """
+    # Handle Optionals, lists, maps and nested messages
+    field_type, _ = unwrap_optional(field_type)
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+    if origin in (list, set, frozenset) and args:
+        inner_type = _element_type(args[0], nested_types, type_mapping)
+        return f"{type_mapping[list]} {inner_type}"
+    elif origin is dict and args:
+        key_type = _element_type(args[0], nested_types, type_mapping)
+        value_type = _element_type(args[1], nested_types, type_mapping)
+        return f"map<{key_type}, {value_type}>"
+    elif origin is Union:
+        return "string"
+    elif is_model_type(field_type):
+        nested_types.append(field_type)
+        return field_type.__name__
+
+    return type_mapping.get(field_type, "string")
+
+
+def _element_type(field_type, nested_types: list, type_mapping) -> str:
+    # proto3 has no repeated or map elements, e.g. List[List[int]]
+    proto_type = get_proto_type(field_type, nested_types, type_mapping)
+    if proto_type.startswith((type_mapping[list], type_mapping[dict])):
+        raise TypeError(
+            f"{field_type!r} cannot be an element of a repeated or map field in proto3"
+        )
+    return proto_type
+
+
+def compile_message(model_cls) -> Tuple[str, Tuple[type, ...]]:
+    """
+    Builds the ``message`` definition of a single class, without nested messages.
+
+    The result is cached on the class and recomputed only after a model class
+    was modified (see ``ModelMeta``).
+
+    :return: The definition and the model classes its fields reference.
+    """
+    cached = model_cls.__dict__.get("_transmutate_proto_message")
+    if cached is not None and cached[0] == ModelMeta.generation:
+        return cached[1], cached[2]
+
+    # Build a message name
+    message_name = model_cls.__name__
+    proto_lines = [f"message {message_name} {{"]
+    nested_types = []
+
+    # Same field order and numbering as the compiled model plans
+    fields = resolve_fields(model_cls)
+    for index, (field_name, field_type) in enumerate(fields.items(), start=1):
+        try:
+            proto_type = get_proto_type(field_type, nested_types)
+        except TypeError as error:
+            raise TypeError(f"{message_name}.{field_name}: {error}") from None
+        proto_lines.append(f"  {proto_type} {field_name} = {index};")
+
+    proto_lines.append("}")
+    definition = "\n".join(proto_lines)
+    nested_types = tuple(nested_types)
+    model_cls._transmutate_proto_message = (
+        ModelMeta.generation,
+        definition,
+        nested_types,
+    )
+    return definition, nested_types
+
+
+def collect_messages(model_cls) -> List[Tuple[str, str]]:
+    """
+    Returns the messages needed to describe a class, dependencies first.
+
+    Every message appears once, even when several fields or recursive
+    references point to it.
+
+    :return: (message name, definition) pairs ending with the class itself.
+    """
+    messages = []
+    processed_messages = set()
+
+    def visit(message_cls):
+        processed_messages.add(message_cls.__name__)
+        definition, nested_types = compile_message(message_cls)
+        for nested_type in nested_types:
+            if nested_type.__name__ not in processed_messages:
+                visit(nested_type)
+        messages.append((message_cls.__name__, definition))
+
+    visit(model_cls)
+    return messages
 
 
 class ProtoHandler:
     def __init__(self, dataclass_obj):
+        # Accepts a model instance or the model class itself
         self.dataclass_obj = dataclass_obj
         self.proto_definitions = []  # Store all message definitions
+        self.processed_messages = set()  # Names of messages already defined
 
     def generate_proto(self) -> str:
         # Clear any previous definitions to prevent duplicates
         self.proto_definitions.clear()
+        self.processed_messages.clear()
 
         # Start processing the root dataclass
-        self.process_dataclass(self.dataclass_obj.__class__)
+        if isinstance(self.dataclass_obj, type):
+            self.process_dataclass(self.dataclass_obj)
+        else:
+            self.process_dataclass(self.dataclass_obj.__class__)
 
         # Join all message definitions into a single proto string (excluding syntax)
         proto_content = "\n".join(self.proto_definitions)
         return proto_content
 
     def process_dataclass(self, dataclass_type) -> str:
-        # Build a message name
         message_name = dataclass_type.__name__
-        proto_lines = [f"message {message_name} {{"]
-
-        fields = dataclass_type.__annotations__
-        type_mapping = {
-            int: "int32",
-            float: "float",
-            str: "string",
-            bool: "bool",
-            list: "repeated",
-            dict: "map",
-            # Add more types as needed
-        }
-
-        for index, (field_name, field_type) in enumerate(fields.items(), start=1):
-            proto_type = self.get_proto_type(field_type, type_mapping)
-            proto_lines.append(f"  {proto_type} {field_name} = {index};")
-
-        proto_lines.append("}")
-        self.proto_definitions.append(
-            "\n".join(proto_lines)
-        )  # Add this message to definitions
-
+        for name, definition in collect_messages(dataclass_type):
+            if name not in self.processed_messages:
+                self.processed_messages.add(name)
+                self.proto_definitions.append(definition)
         return message_name
 
-    def get_proto_type(self, field_type, type_mapping):
-        # Handle lists and Optionals
-        if hasattr(field_type, "__origin__"):
-            origin = field_type.__origin__
-            args = field_type.__args__
-            if origin is list:
-                inner_type = args[0]
-                return f"{type_mapping[list]} {self.get_proto_type(inner_type, type_mapping)}"
-            elif origin is Optional:
-                return self.get_proto_type(args[0], type_mapping)
-
-        return type_mapping.get(field_type, "string")
+    def get_proto_type(self, field_type, type_mapping=PROTO_TYPE_MAPPING):
+        nested_types = []
+        proto_type = get_proto_type(field_type, nested_types, type_mapping)
+        for nested_type in nested_types:
+            if nested_type.__name__ not in self.processed_messages:
+                self.process_dataclass(nested_type)
+        return proto_type
@@ -0,0 +1,397 @@
+import struct
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, get_args, get_origin
+
+from transmutate.base_model import BaseModel
+from transmutate.model_plan import is_model_type, unwrap_optional
+from transmutate.proto_handler import PROTO_TYPE_MAPPING
+from transmutate.type_registry import get_type_codec
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+_UINT64_MASK = (1 << 64) - 1
+_DOUBLE = struct.Struct("<d")
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """Appends a base-128 varint; negatives use 64-bit two's complement."""
+    if value < 0:
+        value &= _UINT64_MASK
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def encode_varint(value: int) -> bytes:
+    buffer = bytearray()
+    write_varint(buffer, value)
+    return bytes(buffer)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    """
+    Reads a varint from ``data`` starting at ``pos``.
+
+    :return: The decoded value and the position just after it.
+    """
+    result = 0
+    shift = 0
+    try:
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result, pos
+            shift += 7
+            if shift >= 70:
+                raise ValueError("Malformed varint")
+    except IndexError:
+        raise ValueError("Truncated varint") from None
+
+
+def skip_field(data, pos: int, wire_type: int) -> int:
+    """Skips over the payload of an unknown field and returns the new position."""
+    if wire_type == WIRE_VARINT:
+        return read_varint(data, pos)[1]
+    elif wire_type == WIRE_FIXED64:
+        return pos + 8
+    elif wire_type == WIRE_LENGTH_DELIMITED:
+        length, pos = read_varint(data, pos)
+        return pos + length
+    elif wire_type == WIRE_FIXED32:
+        return pos + 4
+    raise ValueError(f"Unsupported wire type {wire_type}")
+
+
+def _write_int(buffer, value):
+    write_varint(buffer, value)
+
+
+def _read_int(data, pos):
+    value, pos = read_varint(data, pos)
+    if value > 0x7FFFFFFFFFFFFFFF:
+        value -= 1 << 64
+    return value, pos
+
+
+def _write_bool(buffer, value):
+    buffer.append(1 if value else 0)
+
+
+def _read_bool(data, pos):
+    value, pos = read_varint(data, pos)
+    return bool(value), pos
+
+
+def _write_double(buffer, value):
+    buffer += _DOUBLE.pack(value)
+
+
+def _read_double(data, pos):
+    return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+
+
+def _write_string(buffer, value):
+    encoded = (value if isinstance(value, str) else str(value)).encode("utf-8")
+    write_varint(buffer, len(encoded))
+    buffer += encoded
+
+
+def _read_string(data, pos):
+    length, pos = read_varint(data, pos)
+    end = pos + length
+    return str(data[pos:end], "utf-8"), end
+
+
+# proto type -> (wire type, value writer, value reader, zero value)
+SCALAR_CODECS = {
+    "int32": (WIRE_VARINT, _write_int, _read_int, 0),
+    "bool": (WIRE_VARINT, _write_bool, _read_bool, False),
+    "double": (WIRE_FIXED64, _write_double, _read_double, 0.0),
+    "string": (WIRE_LENGTH_DELIMITED, _write_string, _read_string, ""),
+}
+
+
+def _tag(number: int, wire_type: int) -> bytes:
+    return encode_varint((number << 3) | wire_type)
+
+
+def _value_codec(field_type: Any) -> Tuple[int, Callable, Callable, Any]:
+    """Returns the codec of a single (non-repeated) value of ``field_type``."""
+    field_type, _ = unwrap_optional(field_type)
+    if is_model_type(field_type):
+        return (
+            WIRE_LENGTH_DELIMITED,
+            _message_writer(field_type),
+            _message_reader(field_type),
+            None,
+        )
+    try:
+        proto_type = PROTO_TYPE_MAPPING.get(field_type)
+    except TypeError:
+        proto_type = None  # Unhashable type hints
+    if proto_type in SCALAR_CODECS:
+        return SCALAR_CODECS[proto_type]
+    codec = get_type_codec(field_type)
+    if codec is not None:
+        # Sent as a string holding the JSON encoding, which the model plan
+        # decodes; without a zero value, unset fields decode to None
+        return (
+            WIRE_LENGTH_DELIMITED,
+            _registered_writer(codec[0]),
+            _read_string,
+            None,
+        )
+    # Nested lists and maps, Unions and unregistered classes have no
+    # lossless encoding; writing their str() would corrupt the data
+    raise TypeError(f"No proto encoding for values of type {field_type!r}")
+
+
+def _registered_writer(encode):
+    def write_registered(buffer, value):
+        _write_string(buffer, encode(value))
+
+    return write_registered
+
+
+def _message_writer(model_cls):
+    def write_message(buffer, value):
+        if not isinstance(value, BaseModel):
+            # Plain dicts assigned to a model field
+            value = model_cls.from_dict(value, validate=False)
+        payload = value._get_plan().get_proto_codec().encode(value)
+        write_varint(buffer, len(payload))
+        buffer += payload
+
+    return write_message
+
+
+def _message_reader(model_cls):
+    # Nested messages are returned as field dictionaries; the model plan turns
+    # them into instances so validation settings apply to the whole graph
+    def read_message(data, pos):
+        length, pos = read_varint(data, pos)
+        end = pos + length
+        codec = model_cls._get_plan().get_proto_codec()
+        return codec.decode_fields(data[pos:end]), end
+
+    return read_message
+
+
+def _check_wire_type(name, wire_type, expected):
+    if wire_type != expected:
+        raise ValueError(f"Unexpected wire type {wire_type} for field '{name}'")
+
+
+# Annotations encoded as repeated fields; sets are decoded by the model plan
+_REPEATED_TYPES = (list, set, frozenset)
+
+
+def _build_field(name: str, number: int, field_type: Any):
+    """
+    Builds the writer and reader of one field.
+
+    Writers take ``(buffer, value)``; readers take ``(data, pos, wire_type, values)``
+    and store the decoded value in ``values``.
+    """
+    try:
+        return _compile_field(name, number, field_type)
+    except TypeError as error:
+        raise TypeError(f"Field '{name}': {error}") from None
+
+
+def _compile_field(name: str, number: int, field_type: Any):
+    inner_type, optional = unwrap_optional(field_type)
+    origin = get_origin(inner_type)
+    args = get_args(inner_type)
+
+    if origin in _REPEATED_TYPES or inner_type in _REPEATED_TYPES:
+        item_type = args[0] if args else str
+        wire_type, write_value, read_value, _ = _value_codec(item_type)
+        packed = wire_type != WIRE_LENGTH_DELIMITED
+        tag = _tag(number, WIRE_LENGTH_DELIMITED if packed else wire_type)
+
+        if packed:
+
+            def write(buffer, value):
+                if not value:
+                    return
+                payload = bytearray()
+                for item in value:
+                    write_value(payload, item)
+                buffer += tag
+                write_varint(buffer, len(payload))
+                buffer += payload
+
+        else:
+
+            def write(buffer, value):
+                if not value:
+                    return
+                for item in value:
+                    buffer += tag
+                    write_value(buffer, item)
+
+        def read(data, pos, received_wire_type, values):
+            items = values.get(name)
+            if items is None:
+                items = values[name] = []
+            if packed and received_wire_type == WIRE_LENGTH_DELIMITED:
+                length, pos = read_varint(data, pos)
+                end = pos + length
+                while pos < end:
+                    item, pos = read_value(data, pos)
+                    items.append(item)
+                return pos
+            _check_wire_type(name, received_wire_type, wire_type)
+            item, pos = read_value(data, pos)
+            items.append(item)
+            return pos
+
+        return write, read, list
+
+    if origin is dict or inner_type is dict:
+        key_type, value_type = args if args else (str, str)
+        key_wire, write_key, read_key, key_zero = _value_codec(key_type)
+        value_wire, write_entry_value, read_entry_value, value_zero = _value_codec(
+            value_type
+        )
+        tag = _tag(number, WIRE_LENGTH_DELIMITED)
+        key_tag = _tag(1, key_wire)
+        value_tag = _tag(2, value_wire)
+
+        def write(buffer, value):
+            if not value:
+                return
+            for key, item in value.items():
+                entry = bytearray(key_tag)
+                write_key(entry, key)
+                if item is not None:
+                    entry += value_tag
+                    write_entry_value(entry, item)
+                buffer += tag
+                write_varint(buffer, len(entry))
+                buffer += entry
+
+        def read(data, pos, received_wire_type, values):
+            _check_wire_type(name, received_wire_type, WIRE_LENGTH_DELIMITED)
+            entries = values.get(name)
+            if entries is None:
+                entries = values[name] = {}
+            length, pos = read_varint(data, pos)
+            end = pos + length
+            key, item = key_zero, value_zero
+            while pos < end:
+                entry_key, pos = read_varint(data, pos)
+                entry_number = entry_key >> 3
+                if entry_number == 1:
+                    key, pos = read_key(data, pos)
+                elif entry_number == 2:
+                    item, pos = read_entry_value(data, pos)
+                else:
+                    pos = skip_field(data, pos, entry_key & 7)
+            entries[key] = item
+            return end
+
+        return write, read, dict
+
+    wire_type, write_value, read_value, zero = _value_codec(inner_type)
+    tag = _tag(number, wire_type)
+    if optional or zero is None:
+        # Optional fields and messages are sent whenever they are set
+
+        def write(buffer, value):
+            if value is not None:
+                buffer += tag
+                write_value(buffer, value)
+
+    else:
+        # proto3 implicit presence: zero values are not sent
+
+        def write(buffer, value):
+            if value:
+                buffer += tag
+                write_value(buffer, value)
+
+    def read(data, pos, received_wire_type, values):
+        _check_wire_type(name, received_wire_type, wire_type)
+        values[name], pos = read_value(data, pos)
+        return pos
+
+    if optional:
+        return write, read, None
+    return write, read, lambda: zero
+
+
+class ProtoCodec:
+    """
+    proto3 binary wire format encoder/decoder compiled from a model plan.
+
+    Field numbers are the ones ``ProtoHandler`` assigns in the generated schema.
+
+    :param fields: ``(name, number, type hint)`` triples to use instead of the
+        fields of the plan, e.g. to read messages of another schema version.
+    """
+
+    def __init__(self, plan, fields: Optional[Iterable[Tuple[str, int, Any]]] = None):
+        self.plan = plan
+        if fields is None:
+            fields = [(field.name, field.number, field.type) for field in plan.fields]
+        self._writers = []
+        self._readers: Dict[int, Callable] = {}
+        self._zero_values = []
+        for name, number, field_type in fields:
+            write, read, zero_factory = _build_field(name, number, field_type)
+            self._writers.append((name, write))
+            self._readers[number] = read
+            self._zero_values.append((name, zero_factory))
+        self._writers = tuple(self._writers)
+        self._zero_values = tuple(self._zero_values)
+
+    def encode_into(self, buffer: bytearray, obj: Any) -> None:
+        """Appends the binary encoding of ``obj`` to ``buffer``."""
+        for name, write in self._writers:
+            write(buffer, getattr(obj, name, None))
+
+    def encode(self, obj: Any) -> bytes:
+        buffer = bytearray()
+        self.encode_into(buffer, obj)
+        return bytes(buffer)
+
+    def decode_fields(self, data) -> dict:
+        """
+        Parses a message into a dictionary of field values.
+
+        Unknown fields are skipped and fields absent from the payload get their
+        proto3 zero value, or None when the field is Optional.
+        """
+        readers = self._readers
+        values = {}
+        pos = 0
+        end = len(data)
+        while pos < end:
+            key, pos = read_varint(data, pos)
+            read = readers.get(key >> 3)
+            if read is None:
+                pos = skip_field(data, pos, key & 7)
+            else:
+                pos = read(data, pos, key & 7, values)
+        if pos != end:
+            raise ValueError("Truncated protobuf message")
+        for name, zero_factory in self._zero_values:
+            if name not in values:
+                values[name] = None if zero_factory is None else zero_factory()
+        return values
+
+    def decode(self, data, validate: bool = True) -> Any:
+        """
+        Builds a model instance from its binary encoding.
+
+        :param data: bytes, bytearray or memoryview holding one message.
+        :param validate: Run the model validators, as in ``from_dict``.
+        """
+        return self.plan.decode(self.decode_fields(memoryview(data)), validate)
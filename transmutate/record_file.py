@@ -0,0 +1,337 @@
+"""
+Indexed record files giving random access to large collections of models.
+
+Layout, integers little-endian::
+
+    header   b"TMRF", format version (1 byte), payload kind (1 byte), 2 zero bytes
+    records  varint length-delimited JSONB or proto binary payloads
+    index    offset of every record from the start of the file (uint64 each)
+    trailer  index offset (uint64), record count (uint64),
+             schema fingerprint (32 bytes), b"TMRF"
+
+The schema fingerprint is the SHA-256 hash of the model's proto schema, so
+it changes with the field names, types and numbers assigned by ProtoHandler.
+Readers memory-map the file and slice records out of it without copying.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import IO, Iterable, Iterator, List, Optional, Type, Union
+
+from transmutate.base_model import BaseModel
+from transmutate.framing import decode_model, encode_model, write_frame
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.proto_wire import read_varint
+from transmutate.schema_registry import SchemaRegistry, schema_fingerprint
+
+MAGIC = b"TMRF"
+FORMAT_VERSION = 1
+
+PAYLOAD_CODES = {"jsonb": 0, "proto": 1}
+
+_HEADER = struct.Struct("<4sBB2x")
+_TRAILER = struct.Struct("<QQ32s4s")
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+PathLike = Union[str, os.PathLike]
+
+
+def _payload_name(code: int) -> str:
+    for name, payload_code in PAYLOAD_CODES.items():
+        if payload_code == code:
+            return name
+    raise ValueError(f"Unknown record payload code {code}")
+
+
+def _offsets_array(data) -> array:
+    offsets = array("Q")
+    offsets.frombytes(data)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+def _read_trailer(data, size: int):
+    if size < _HEADER.size + _TRAILER.size:
+        raise ValueError("Not a record file: too short")
+    magic, version, payload_code = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a record file: bad magic")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported record file version {version}")
+    index_offset, count, fingerprint, magic = _TRAILER.unpack_from(
+        data, size - _TRAILER.size
+    )
+    if magic != MAGIC or index_offset + 8 * count + _TRAILER.size != size:
+        raise ValueError("Record file is truncated or was not closed")
+    return _payload_name(payload_code), index_offset, count, fingerprint
+
+
+class RecordFileWriter:
+    """
+    Writes models to a record file.
+
+    Encoded records are collected in memory and written ``buffer_size`` bytes
+    at a time; the index and trailer are written by ``close()``.
+
+    :param path: Path of the file.
+    :param model_cls: Class of the written models, fingerprinted in the file.
+    :param payload: ``"jsonb"`` or ``"proto"``.
+    :param append: Add records to an existing file written for the same model
+        and payload, instead of replacing it.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        model_cls: Type[BaseModel],
+        payload: str = "jsonb",
+        append: bool = False,
+        backend: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        if payload not in PAYLOAD_CODES:
+            raise ValueError(
+                f"Unknown payload '{payload}', expected one of {tuple(PAYLOAD_CODES)}"
+            )
+        self.model_cls = model_cls
+        self.payload = payload
+        self.backend = backend
+        self.buffer_size = buffer_size
+        self.fingerprint = schema_fingerprint(model_cls)
+        self._offsets = array("Q")
+        self._buffer = bytearray()
+
+        if append and os.path.exists(path) and os.path.getsize(path):
+            self._file: IO[bytes] = open(path, "r+b")
+            self._open_for_append()
+        else:
+            self._file = open(path, "wb")
+            self._file.write(
+                _HEADER.pack(MAGIC, FORMAT_VERSION, PAYLOAD_CODES[payload])
+            )
+            self._position = _HEADER.size
+
+    def _open_for_append(self) -> None:
+        size = os.fstat(self._file.fileno()).st_size
+        try:
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                payload, index_offset, count, fingerprint = _read_trailer(data, size)
+                self._offsets = _offsets_array(
+                    data[index_offset : index_offset + 8 * count]
+                )
+            if payload != self.payload or fingerprint != self.fingerprint:
+                raise ValueError(
+                    "Cannot append: the file was written with another payload or schema"
+                )
+        except ValueError:
+            self._file.close()
+            raise
+        # New records replace the index, which is written again on close
+        self._file.seek(index_offset)
+        self._file.truncate()
+        self._position = index_offset
+
+    def write(self, model: BaseModel) -> None:
+        """Appends one model."""
+        self.write_payload(encode_model(model, self.payload, self.backend))
+
+    def write_many(self, models: Iterable[BaseModel]) -> int:
+        """
+        Appends models in bulk.
+
+        :return: The number of models written.
+        """
+        payload = self.payload
+        backend = self.backend
+        count = 0
+        for model in models:
+            self.write_payload(encode_model(model, payload, backend))
+            count += 1
+        return count
+
+    def write_payload(self, data) -> None:
+        """Appends an already encoded record."""
+        buffer = self._buffer
+        self._offsets.append(self._position + len(buffer))
+        write_frame(buffer, data)
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            data, self._buffer = self._buffer, bytearray()
+            self._file.write(data)
+            self._position += len(data)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def close(self) -> None:
+        """Writes the index and trailer, completing the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.write(
+            _TRAILER.pack(self._position, len(self._offsets), self.fingerprint, MAGIC)
+        )
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_records(
+    path: PathLike,
+    model_cls: Type[BaseModel],
+    models: Iterable[BaseModel],
+    payload: str = "jsonb",
+    append: bool = False,
+    backend: Optional[str] = None,
+) -> int:
+    """
+    Writes models to a record file, see RecordFileWriter.
+
+    :return: The number of models written.
+    """
+    with RecordFileWriter(path, model_cls, payload, append, backend) as writer:
+        return writer.write_many(models)
+
+
+class RecordFileReader:
+    """
+    Random access to the records of a record file through a memory map.
+
+    ``reader[n]`` decodes record ``n`` and ``reader[start:stop]`` a range of
+    them; ``record_bytes`` and ``range_bytes`` return the encoded data as
+    ``memoryview`` slices of the map, without copying.
+
+    :param path: Path of the file.
+    :param model_cls: Class of the models to decode; its schema fingerprint
+        must match the one of the file unless ``check_schema`` is False.
+    :param registry: Schema registry used to translate records of another
+        recorded schema version into ``model_cls``.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        model_cls: Type[BaseModel],
+        validate: bool = True,
+        check_schema: bool = True,
+        backend: Optional[str] = None,
+        registry: Optional[SchemaRegistry] = None,
+    ):
+        self.model_cls = model_cls
+        self.validate = validate
+        self.backend = backend
+        self._translation = None
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.payload, self._index_offset, count, self.fingerprint = _read_trailer(
+                self._mmap, size
+            )
+            if check_schema and self.fingerprint != schema_fingerprint(model_cls):
+                if registry is None:
+                    raise ValueError(
+                        f"Record file schema does not match {model_cls.__name__}"
+                    )
+                self._translation = registry.translation(self.fingerprint, model_cls)
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._view = memoryview(self._mmap)
+        index = self._view[self._index_offset : self._index_offset + 8 * count]
+        # Read in place unless the byte order has to be swapped
+        self._offsets = (
+            index.cast("Q") if sys.byteorder == "little" else _offsets_array(index)
+        )
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _record_span(self, index: int):
+        pos = self._offsets[index]
+        length, start = read_varint(self._view, pos)
+        return start, start + length
+
+    def record_bytes(self, index: int) -> memoryview:
+        """Returns the encoded payload of record ``index``."""
+        start, stop = self._record_span(index)
+        return self._view[start:stop]
+
+    def range_bytes(self, start: int, stop: int) -> memoryview:
+        """
+        Returns the length-delimited frames of records ``start`` to ``stop``,
+        e.g. to ship them as is; ``framing.FrameDecoder`` parses them.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return self._view[0:0]
+        end = self._offsets[stop] if stop < len(self) else self._index_offset
+        return self._view[self._offsets[start] : end]
+
+    def _decode(self, index: int) -> BaseModel:
+        translation = self._translation
+        if translation is not None:
+            data = self.record_bytes(index)
+            if self.payload == "proto":
+                return translation.decode_proto(data, self.validate)
+            return translation.decode(
+                JSONBHandler.parse_jsonb(data, self.backend), self.validate
+            )
+        return decode_model(
+            self.model_cls,
+            self.record_bytes(index),
+            self.payload,
+            self.validate,
+            self.backend,
+        )
+
+    def iter_range(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[BaseModel]:
+        """Lazily decodes records ``start`` to ``stop``."""
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self._decode(index)
+
+    def __getitem__(self, key) -> Union[BaseModel, List[BaseModel]]:
+        if isinstance(key, slice):
+            return [self._decode(index) for index in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("record index out of range")
+        return self._decode(key)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        return self.iter_range()
+
+    def close(self) -> None:
+        """Unmaps the file; slices returned by the reader must be released first."""
+        if self._mmap.closed:
+            return
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,298 @@
+"""
+Schema versions and translation between them, for mixed-version decoding.
+
+A schema version is the proto definition of a model, as generated by
+``ProtoHandler``, identified by the SHA-256 fingerprint of that text. The
+registry keeps the versions that were written in the past and compiles, per
+(writer version, reader class) pair, a plan reading data of the writer
+version into the current class:
+
+    registry = SchemaRegistry()
+    registry.add(old_definition)
+    registry.register(Person, renames={"full_name": "name"})
+    person = registry.from_jsonb(Person, data, writer=old_fingerprint)
+
+Fields are matched by name, or by a former name listed in ``renames``. Fields
+the writer no longer has are ignored and new fields get their default.
+Nested models are decoded with their current plans.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+from transmutate.base_model import BaseModel
+from transmutate.jsonb_handler import JSONBHandler
+from transmutate.proto_wire import ProtoCodec
+
+_MESSAGE_PATTERN = re.compile(r"^message (\w+) \{$")
+_FIELD_PATTERN = re.compile(r"^\s+(.+) (\w+) = (\d+);$")
+
+
+def schema_fingerprint(model_cls: Type[BaseModel]) -> bytes:
+    """Returns the SHA-256 digest of the proto schema of a model class."""
+    return hashlib.sha256(model_cls.proto_schema().encode("utf-8")).digest()
+
+
+class SchemaField(NamedTuple):
+    name: str
+    number: int
+    type: str  # proto3 type, e.g. "repeated string"
+
+
+def parse_messages(definition: str) -> Dict[str, Tuple[SchemaField, ...]]:
+    """
+    Parses the messages of a proto definition generated by ``ProtoHandler``.
+
+    :return: Message name to fields mapping, in definition order.
+    """
+    messages = {}
+    fields = None
+    for line in definition.splitlines():
+        match = _MESSAGE_PATTERN.match(line)
+        if match:
+            fields = messages[match.group(1)] = []
+            continue
+        match = _FIELD_PATTERN.match(line)
+        if match and fields is not None:
+            proto_type, name, number = match.groups()
+            fields.append(SchemaField(name, int(number), proto_type))
+    return {name: tuple(fields) for name, fields in messages.items()}
+
+
+class Schema:
+    """
+    A version of a model schema, built from its proto definition.
+
+    The model message is the last of the definition, after the nested ones,
+    as in ``BaseModel.proto_schema()``.
+    """
+
+    def __init__(self, definition: str):
+        self.definition = definition
+        self.fingerprint = hashlib.sha256(definition.encode("utf-8")).digest()
+        self.messages = parse_messages(definition)
+        if not self.messages:
+            raise ValueError("No message found in schema definition")
+        self.name = list(self.messages)[-1]
+        self.fields = self.messages[self.name]
+
+    @classmethod
+    def from_model(cls, model_cls: Type[BaseModel]) -> "Schema":
+        return cls(model_cls.proto_schema())
+
+    def __repr__(self):
+        return f"Schema({self.name}, {self.fingerprint.hex()[:12]})"
+
+
+class TranslationPlan:
+    """
+    Decoding plan reading data of a writer schema into a reader model class.
+
+    Compiled once per pair by ``SchemaRegistry.translation``; decoding then
+    costs the same as ``from_dict`` on the reader class.
+
+    :param renames: Reader field name to the former names of the field.
+    :raises ValueError: When a field changed type, or when a required reader
+        field has neither a writer counterpart nor a default.
+    """
+
+    def __init__(
+        self,
+        writer: Schema,
+        model_cls: Type[BaseModel],
+        renames: Optional[Dict[str, Tuple[str, ...]]] = None,
+    ):
+        self.writer = writer
+        self.model_cls = model_cls
+        self.plan = model_cls._get_plan()
+        renames = renames or {}
+        writer_fields = {field.name: field for field in writer.fields}
+        reader_fields = {
+            field.name: field for field in Schema.from_model(model_cls).fields
+        }
+        field_types = {field.name: field.type for field in self.plan.fields}
+
+        decoders = []
+        defaults = []
+        proto_fields = []
+        # Writer field name -> reader field name
+        self.mapping: Dict[str, str] = {}
+        for name, decoder, default_factory in self.plan._decoders:
+            source = next(
+                (
+                    writer_fields[candidate]
+                    for candidate in (name,) + tuple(renames.get(name, ()))
+                    if candidate in writer_fields
+                ),
+                None,
+            )
+            if source is None:
+                if default_factory is None:
+                    raise ValueError(
+                        f"Field '{name}' of {model_cls.__name__} is missing from "
+                        f"schema {writer.fingerprint.hex()[:12]} and has no default"
+                    )
+                defaults.append((name, default_factory))
+                continue
+            reader_type = reader_fields[name].type
+            if source.type != reader_type:
+                raise ValueError(
+                    f"Field '{name}' of {model_cls.__name__} changed type "
+                    f"from {source.type} to {reader_type}"
+                )
+            self.mapping[source.name] = name
+            decoders.append((source.name, name, decoder, default_factory))
+            proto_fields.append((name, source.number, field_types[name]))
+
+        self._decoders = tuple(decoders)
+        self._defaults = tuple(defaults)
+        # Proto values are read straight into the reader field names
+        self._proto_decoders = tuple(
+            (name, name, decoder, default_factory)
+            for _, name, decoder, default_factory in decoders
+        )
+        self._proto_fields = tuple(proto_fields)
+        self._proto_codec = None
+
+    def _build(self, decoders, data: dict, validate: bool) -> BaseModel:
+        values = {}
+        for key, name, decoder, default_factory in decoders:
+            if key in data:
+                value = data[key]
+                values[name] = value if decoder is None else decoder(value, validate)
+            elif default_factory is not None:
+                values[name] = default_factory()
+            else:
+                raise ValueError(f"Missing required field '{key}'")
+        for name, default_factory in self._defaults:
+            values[name] = default_factory()
+        return self.plan.build(values, validate)
+
+    def decode(self, data: dict, validate: bool = True) -> BaseModel:
+        """Builds a reader instance from parsed data of the writer schema."""
+        return self._build(self._decoders, data, validate)
+
+    def decode_proto(self, data, validate: bool = True) -> BaseModel:
+        """Builds a reader instance from a proto binary message of the writer schema."""
+        if self._proto_codec is None:
+            self._proto_codec = ProtoCodec(self.plan, self._proto_fields)
+        values = self._proto_codec.decode_fields(memoryview(data))
+        return self._build(self._proto_decoders, values, validate)
+
+
+Writer = Union[Schema, bytes, str]
+
+
+class SchemaRegistry:
+    """
+    Known schema versions by fingerprint, and the translation plans between them.
+
+    ``register`` records the current schema of a model class along with the
+    former names of its renamed fields; ``add`` records historical versions,
+    e.g. definitions kept from earlier releases or read from a record file.
+    """
+
+    def __init__(self):
+        self._schemas: Dict[bytes, Schema] = {}
+        self._renames: Dict[type, Dict[str, Tuple[str, ...]]] = {}
+        self._translations: Dict[Tuple[bytes, type], TranslationPlan] = {}
+
+    def add(self, schema: Union[Schema, str]) -> Schema:
+        """
+        Records a schema version.
+
+        :param schema: A Schema, or a proto definition as generated by
+            ``ProtoHandler``.
+        :return: The recorded schema, whose fingerprint identifies it.
+        """
+        if isinstance(schema, str):
+            schema = Schema(schema)
+        return self._schemas.setdefault(schema.fingerprint, schema)
+
+    def register(
+        self,
+        model_cls: Type[BaseModel],
+        renames: Optional[Dict[str, Union[str, Iterable[str]]]] = None,
+    ) -> Schema:
+        """
+        Records the current schema of a model class.
+
+        :param renames: Field name to its former name, or former names from
+            the most recent, e.g. ``{"full_name": "name"}``.
+        :return: The current schema of the class.
+        """
+        if renames:
+            self._renames[model_cls] = {
+                name: (former,) if isinstance(former, str) else tuple(former)
+                for name, former in renames.items()
+            }
+            # Plans compiled with the previous renames are outdated
+            for key in [key for key in self._translations if key[1] is model_cls]:
+                del self._translations[key]
+        return self.add(Schema.from_model(model_cls))
+
+    def get(self, fingerprint: Union[bytes, str]) -> Schema:
+        """
+        Returns a recorded schema.
+
+        :param fingerprint: The digest, or its hexadecimal form.
+        """
+        if isinstance(fingerprint, str):
+            fingerprint = bytes.fromhex(fingerprint)
+        try:
+            return self._schemas[fingerprint]
+        except KeyError:
+            raise ValueError(
+                f"Unknown schema fingerprint {fingerprint.hex()[:12]}"
+            ) from None
+
+    def versions(self, name: str) -> List[Schema]:
+        """Returns the recorded versions of a message, in the order they were added."""
+        return [schema for schema in self._schemas.values() if schema.name == name]
+
+    def translation(
+        self, writer: Writer, model_cls: Type[BaseModel]
+    ) -> TranslationPlan:
+        """Returns the plan reading data of ``writer`` into ``model_cls``, compiled once."""
+        if not isinstance(writer, Schema):
+            writer = self.get(writer)
+        key = (writer.fingerprint, model_cls)
+        plan = self._translations.get(key)
+        if plan is None:
+            plan = self._translations[key] = TranslationPlan(
+                writer, model_cls, self._renames.get(model_cls)
+            )
+        return plan
+
+    def from_dict(
+        self,
+        model_cls: Type[BaseModel],
+        data: dict,
+        writer: Writer,
+        validate: bool = True,
+    ) -> BaseModel:
+        """Decodes parsed data written with the ``writer`` schema version."""
+        return self.translation(writer, model_cls).decode(data, validate)
+
+    def from_jsonb(
+        self,
+        model_cls: Type[BaseModel],
+        jsonb_data,
+        writer: Writer,
+        validate: bool = True,
+        backend: Optional[str] = None,
+    ) -> BaseModel:
+        """Decodes JSONB written with the ``writer`` schema version."""
+        data = JSONBHandler.parse_jsonb(jsonb_data, backend)
+        return self.translation(writer, model_cls).decode(data, validate)
+
+    def from_proto_bytes(
+        self,
+        model_cls: Type[BaseModel],
+        proto_data,
+        writer: Writer,
+        validate: bool = True,
+    ) -> BaseModel:
+        """Decodes a proto binary message written with the ``writer`` schema version."""
+        return self.translation(writer, model_cls).decode_proto(proto_data, validate)
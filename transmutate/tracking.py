@@ -0,0 +1,232 @@
+"""
+Opt-in change tracking of model instances.
+
+``class Account(BaseModel, track_changes=True)`` records every attribute
+assignment and deletion, which lets the model:
+
+* return its last ``to_json``/``to_jsonb``/``to_proto_bytes`` output as-is
+  while nothing changed,
+* re-encode only the changed fields once something did,
+* report the fields changed since ``mark_clean()`` with ``changes()`` or as
+  JSON Patch (RFC 6902) operations with ``json_patch()``.
+
+Changes are seen through attribute assignment only. Mutating a list, a dict
+or a nested model in place is not, and must be reported with
+``mark_changed(name)``.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from transmutate.json_backends import get_backend
+
+
+class ChangeState:
+    """Per-instance tracking state, created on the first change or encoding."""
+
+    __slots__ = ("clean_fields", "changed", "stale", "encoded", "outputs")
+
+    def __init__(self, attributes: Iterable[str]):
+        # Attributes set at the last clean point
+        self.clean_fields: FrozenSet[str] = frozenset(attributes)
+        # Attributes assigned or deleted since the last clean point
+        self.changed = set()
+        # Attributes assigned or deleted since ``encoded`` was built
+        self.stale = set()
+        # Last ModelPlan.encode result, updated field by field
+        self.encoded: Optional[dict] = None
+        # (format, backend) -> last serialized output
+        self.outputs: Dict[Any, Any] = {}
+
+    def record(self, name: str) -> None:
+        self.changed.add(name)
+        self.stale.add(name)
+        if self.outputs:
+            self.outputs.clear()
+
+
+def _escape_pointer(name: str) -> str:
+    return name.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape_pointer(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def encode_tracked(plan, obj) -> dict:
+    """``ModelPlan.encode`` of tracked models: only stale fields are re-encoded."""
+    state = obj._change_state()
+    encoded = state.encoded
+    if encoded is None:
+        encoded = state.encoded = plan.encode_all(obj)
+    elif state.stale:
+        attributes = plan.get_attributes(obj)
+        for name in state.stale:
+            if name in attributes:
+                encoded[name] = plan.encode_field(name, attributes[name])
+            else:
+                encoded.pop(name, None)
+    state.stale.clear()
+    # Callers own the returned dict, the cached one is kept up to date
+    return encoded.copy()
+
+
+class ChangeTracking:
+    """
+    Mixin placed before BaseModel in the bases of ``track_changes=True`` models.
+
+    Instances built by ``from_dict`` and the other decoders start clean.
+    Instances built by ``__init__`` start with every assigned field changed.
+    """
+
+    __slots__ = ("_transmutate_state",)
+
+    def _change_state(self) -> ChangeState:
+        try:
+            return self._transmutate_state
+        except AttributeError:
+            state = ChangeState(self._get_plan().get_attributes(self))
+            object.__setattr__(self, "_transmutate_state", state)
+            return state
+
+    def __setattr__(self, name, value):
+        state = self._change_state()
+        object.__setattr__(self, name, value)
+        state.record(name)
+
+    def __delattr__(self, name):
+        state = self._change_state()
+        object.__delattr__(self, name)
+        state.record(name)
+
+    # Copies and unpickled instances get a state of their own, created on
+    # first use, instead of sharing the original one
+
+    def __getstate__(self) -> dict:
+        return self._get_plan().get_attributes(self)
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    # Outputs are cached per backend name, as the encodings may differ
+
+    def to_json(self, backend: Optional[str] = None):
+        outputs = self._change_state().outputs
+        key = ("json", get_backend(backend).name)
+        if key not in outputs:
+            outputs[key] = super().to_json(backend)
+        return outputs[key]
+
+    def to_jsonb(self, backend: Optional[str] = None):
+        outputs = self._change_state().outputs
+        key = ("jsonb", get_backend(backend).name)
+        if key not in outputs:
+            outputs[key] = super().to_jsonb(backend)
+        return outputs[key]
+
+    def to_jsonb_bytes(self, backend: Optional[str] = None) -> bytes:
+        outputs = self._change_state().outputs
+        key = ("jsonb_bytes", get_backend(backend).name)
+        if key not in outputs:
+            outputs[key] = super().to_jsonb_bytes(backend)
+        return outputs[key]
+
+    def write_into(self, buffer: bytearray, backend: Optional[str] = None) -> int:
+        encoded = self.to_jsonb_bytes(backend)
+        buffer += encoded
+        return len(encoded)
+
+    def to_proto_bytes(self) -> bytes:
+        outputs = self._change_state().outputs
+        if "proto" not in outputs:
+            outputs["proto"] = super().to_proto_bytes()
+        return outputs["proto"]
+
+    def is_dirty(self) -> bool:
+        """Whether attributes changed since the last ``mark_clean()``."""
+        return bool(self._change_state().changed)
+
+    def mark_clean(self) -> None:
+        """Forgets the recorded changes, e.g. once they were shipped or stored."""
+        state = self._change_state()
+        state.changed.clear()
+        state.clean_fields = frozenset(self._get_plan().get_attributes(self))
+
+    def mark_changed(self, *names: str) -> None:
+        """
+        Reports attributes mutated in place, such as an appended list item.
+
+        :param names: Attribute names; all attributes when none are given.
+        """
+        state = self._change_state()
+        if not names:
+            names = tuple(self._get_plan().get_attributes(self))
+            state.encoded = None
+        for name in names:
+            state.record(name)
+
+    def changes(self) -> dict:
+        """
+        Returns the encoded values of the attributes changed since the last
+        ``mark_clean()``, in field order. Deleted attributes are left out.
+        """
+        changed = self._change_state().changed
+        if not changed:
+            return {}
+        encoded = self._get_plan().encode(self)
+        return {name: value for name, value in encoded.items() if name in changed}
+
+    def json_patch(self) -> List[dict]:
+        """
+        Returns the changes since the last ``mark_clean()`` as JSON Patch
+        operations applying to the JSON encoding of the model.
+        """
+        state = self._change_state()
+        if not state.changed:
+            return []
+        encoded = self._get_plan().encode(self)
+        operations = []
+        for name, value in encoded.items():
+            if name in state.changed:
+                operations.append(
+                    {
+                        "op": "replace" if name in state.clean_fields else "add",
+                        "path": "/" + _escape_pointer(name),
+                        "value": value,
+                    }
+                )
+        for name in sorted(state.changed.difference(encoded)):
+            if name in state.clean_fields:
+                operations.append({"op": "remove", "path": "/" + _escape_pointer(name)})
+        return operations
+
+    def apply_json_patch(self, operations: List[dict], validate: bool = True) -> None:
+        """
+        Applies top-level operations produced by ``json_patch()``.
+
+        Values are decoded like ``from_dict`` does, and the validators of the
+        patched fields are run afterwards.
+        """
+        decoders = {field.name: field.decoder for field in self._get_plan().fields}
+        patched = set()
+        for operation in operations:
+            op = operation["op"]
+            path = operation["path"]
+            if not path.startswith("/") or "/" in path[1:]:
+                raise ValueError(f"Unsupported JSON Patch path '{path}'")
+            name = _unescape_pointer(path[1:])
+            if op in ("add", "replace"):
+                value = operation["value"]
+                decoder = decoders.get(name)
+                if decoder is not None:
+                    value = decoder(value, validate)
+                setattr(self, name, value)
+            elif op == "remove":
+                delattr(self, name)
+            else:
+                raise ValueError(f"Unsupported JSON Patch operation '{op}'")
+            patched.add(name)
+        if validate:
+            for field_name, validation_method in self._validators:
+                if field_name in patched:
+                    validation_method(self)
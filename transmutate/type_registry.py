@@ -0,0 +1,128 @@
+"""
+Registry of JSON encoders and decoders for non JSON-native field types.
+
+Model plans resolve the codec of every field once, from its annotation, so
+encoding a value is a direct call instead of a chain of isinstance checks.
+Built-in codecs cover ``datetime``, ``date``, ``time``, ``Enum``, ``UUID``,
+``Decimal`` and ``bytes``; sets are handled by the plans like lists.
+"""
+
+import base64
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+Codec = Tuple[Callable[[Any], Any], Callable[[Any], Any]]
+
+# type -> (encode, decode or None)
+_codecs: Dict[type, Tuple[Callable[[Any], Any], Optional[Callable[[Any], Any]]]] = {}
+# base type -> factory building the codec of a subclass
+_codec_factories: Dict[type, Callable[[type], Codec]] = {}
+# Resolved codecs, including the types without one
+_resolved: Dict[type, Optional[Codec]] = {}
+
+
+def register_type(
+    value_type: type,
+    encode: Callable[[Any], Any],
+    decode: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Registers how to convert values of a type to and from JSON data.
+
+    The codec also applies to subclasses of ``value_type``. Plans compiled
+    before the registration keep the codecs they resolved, so register types
+    before using the models that hold them.
+
+    :param value_type: The type of the field values.
+    :param encode: Converts a value into JSON-compatible data.
+    :param decode: Converts parsed JSON data back into a value; by default
+        the annotated type is called with the data, e.g. ``UUID(data)``. The
+        proto binary format sends ``str()`` of the encoded value in a string
+        field, so decoders of non-string encodings must also accept text.
+    """
+    _codecs[value_type] = (encode, decode)
+    _resolved.clear()
+
+
+def register_type_factory(base_type: type, factory: Callable[[type], Codec]) -> None:
+    """
+    Registers a codec factory for a family of types, such as Enum subclasses.
+
+    :param factory: Called once with every annotated subclass of ``base_type``
+        and returning its ``(encode, decode)`` pair.
+    """
+    _codec_factories[base_type] = factory
+    _resolved.clear()
+
+
+def get_type_codec(value_type: Any) -> Optional[Codec]:
+    """
+    Returns the ``(encode, decode)`` pair of a type, or None when no codec
+    is registered for it or one of its base classes.
+    """
+    try:
+        return _resolved[value_type]
+    except KeyError:
+        pass
+    except TypeError:
+        return None  # Unhashable type hints
+
+    codec = None
+    if isinstance(value_type, type):
+        for klass in value_type.__mro__:
+            if klass in _codecs:
+                encode, decode = _codecs[klass]
+                codec = (encode, value_type if decode is None else decode)
+                break
+            if klass in _codec_factories:
+                codec = _codec_factories[klass](value_type)
+                break
+    _resolved[value_type] = codec
+    return codec
+
+
+def _decode_datetime(value: str) -> datetime:
+    if value.endswith("Z"):
+        # Not accepted by fromisoformat before Python 3.11
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _decode_decimal(value) -> Decimal:
+    # Floats are converted through their shortest repr, not their binary value
+    return Decimal(str(value) if isinstance(value, float) else value)
+
+
+def _encode_bytes(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+def _encode_enum(value: Enum) -> Any:
+    return value.value
+
+
+def _enum_codec(enum_cls) -> Codec:
+    def decode_enum(value):
+        try:
+            return enum_cls(value)
+        except ValueError:
+            if isinstance(value, str):
+                # Proto string fields hold the member value as text
+                for member in enum_cls:
+                    if str(member.value) == value:
+                        return member
+            raise
+
+    return _encode_enum, decode_enum
+
+
+register_type(datetime, datetime.isoformat, _decode_datetime)
+register_type(date, date.isoformat, date.fromisoformat)
+register_type(time, time.isoformat, time.fromisoformat)
+register_type(UUID, str)
+register_type(Decimal, str, _decode_decimal)
+register_type(bytes, _encode_bytes, base64.b64decode)
+register_type_factory(Enum, _enum_codec)